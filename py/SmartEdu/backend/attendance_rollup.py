@@ -0,0 +1,209 @@
+# backend/attendance_rollup.py
+# Daily per-teacher rollup of TeacherAttendance.
+#   python -m backend.attendance_rollup [--since YYYY-MM-DD]   # (re)build from the raw logs
+import argparse
+import os
+import time as clock
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import dialect_insert
+
+# A day counts as late when its first clock-in is after this
+LATE_AFTER = time.fromisoformat(os.environ.get("ATTENDANCE_LATE_AFTER", "07:30"))
+BACKFILL_CHUNK = 200000
+
+Daily = models.TeacherAttendanceDaily
+
+
+def _is_late(clock_in):
+    return clock_in.time() > LATE_AFTER
+
+
+# --- INCREMENTAL (called from apply_clock_ops on clock-out) ---
+
+def apply_closed_shifts(db: Session, shifts):
+    """
+    Fold closed shifts [(teacher_id, clock_in, clock_out), ...] into the daily
+    rollup with a single upsert. A shift counts for the day it started on.
+    Runs in the caller's transaction.
+    """
+    days = {}
+    for teacher_id, clock_in, clock_out in shifts:
+        key = (teacher_id, clock_in.date())
+        minutes = (clock_out - clock_in).total_seconds() / 60
+        row = days.get(key)
+        if row is None:
+            days[key] = {
+                "teacher_id": teacher_id, "day": key[1], "shifts": 1, "minutes_worked": minutes,
+                "first_clock_in": clock_in, "last_clock_out": clock_out, "is_late": _is_late(clock_in),
+            }
+        else:
+            row["shifts"] += 1
+            row["minutes_worked"] += minutes
+            if clock_in < row["first_clock_in"]:
+                row["first_clock_in"], row["is_late"] = clock_in, _is_late(clock_in)
+            row["last_clock_out"] = max(row["last_clock_out"], clock_out)
+    if not days:
+        return
+
+    bind = db.get_bind()
+    postgres = bind.dialect.name == "postgresql"
+    earliest, latest = (func.least, func.greatest) if postgres else (func.min, func.max)   # 2-arg min/max are scalar in SQLite
+
+    stmt = dialect_insert(bind)(Daily).values(list(days.values()))
+    new, old = stmt.excluded, Daily.__table__.c
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["teacher_id", "day"],
+        set_={
+            "shifts": old.shifts + new.shifts,
+            "minutes_worked": old.minutes_worked + new.minutes_worked,
+            "is_late": case((new.first_clock_in < old.first_clock_in, new.is_late), else_=old.is_late),
+            "first_clock_in": earliest(old.first_clock_in, new.first_clock_in),
+            "last_clock_out": latest(old.last_clock_out, new.last_clock_out),
+        }
+    ))
+
+
+# --- BACKFILL ---
+
+def backfill(conn, since=None):
+    """
+    Rebuild the rollup from the raw logs (from `since` on, or everything).
+    Reads closed shifts in chunks and aggregates each chunk with pandas
+    group-bys instead of looping over rows. Returns the number of daily rows.
+    """
+    import pandas as pd
+
+    log = models.TeacherAttendance
+    query = select(log.teacher_id, log.clock_in_time, log.clock_out_time).where(log.clock_out_time.is_not(None))
+    if since:
+        query = query.where(log.clock_in_time >= datetime.combine(since, time.min))
+
+    parts = []
+    for chunk in pd.read_sql(query, conn, chunksize=BACKFILL_CHUNK):
+        chunk["clock_in_time"] = pd.to_datetime(chunk["clock_in_time"])
+        chunk["clock_out_time"] = pd.to_datetime(chunk["clock_out_time"])
+        chunk["day"] = chunk["clock_in_time"].dt.normalize()
+        chunk["minutes"] = (chunk["clock_out_time"] - chunk["clock_in_time"]).dt.total_seconds() / 60
+        parts.append(chunk.groupby(["teacher_id", "day"]).agg(
+            shifts=("minutes", "size"), minutes_worked=("minutes", "sum"),
+            first_clock_in=("clock_in_time", "min"), last_clock_out=("clock_out_time", "max"),
+        ))
+
+    delete = Daily.__table__.delete()
+    if since:
+        delete = delete.where(Daily.day >= since)
+    conn.execute(delete)
+    if not parts:
+        return 0
+
+    # A teacher/day can straddle two chunks: combine the partial aggregates
+    df = pd.concat(parts).groupby(level=[0, 1]).agg(
+        {"shifts": "sum", "minutes_worked": "sum", "first_clock_in": "min", "last_clock_out": "max"}
+    ).reset_index()
+    late_cutoff = pd.Timedelta(hours=LATE_AFTER.hour, minutes=LATE_AFTER.minute, seconds=LATE_AFTER.second)
+    df["is_late"] = (df["first_clock_in"] - df["day"]) > late_cutoff
+
+    rows = [
+        {"teacher_id": int(t), "day": d, "shifts": int(n), "minutes_worked": float(m),
+         "first_clock_in": f, "last_clock_out": l, "is_late": bool(late)}
+        for t, d, n, m, f, l, late in zip(
+            df["teacher_id"], df["day"].dt.date, df["shifts"], df["minutes_worked"],
+            df["first_clock_in"].dt.to_pydatetime(), df["last_clock_out"].dt.to_pydatetime(), df["is_late"]
+        )
+    ]
+    for i in range(0, len(rows), BACKFILL_CHUNK):
+        conn.execute(Daily.__table__.insert(), rows[i:i + BACKFILL_CHUNK])
+    return len(rows)
+
+
+# --- RANGE QUERIES ---
+
+def hours_report(db: Session, start: date, end: date, by="month", teacher_id=None):
+    """
+    Hours worked, late days and missing clock-outs per teacher for
+    start..end (inclusive), per month or as one total. Reads the rollup;
+    missing clock-outs come from the open-shift partial index.
+    """
+    month = func.to_char(Daily.day, "YYYY-MM") if db.get_bind().dialect.name == "postgresql" else func.strftime("%Y-%m", Daily.day)
+    period = month if by == "month" else None
+
+    columns = [
+        Daily.teacher_id,
+        func.count().label("days_worked"),
+        func.sum(Daily.shifts).label("shifts"),
+        func.sum(Daily.minutes_worked).label("minutes"),
+        func.sum(case((Daily.is_late, 1), else_=0)).label("late_days"),
+    ]
+    group = [Daily.teacher_id]
+    if period is not None:
+        columns.append(period.label("period"))
+        group.append(period)
+    query = db.query(*columns).filter(Daily.day >= start, Daily.day <= end)
+    if teacher_id is not None:
+        query = query.filter(Daily.teacher_id == teacher_id)
+
+    report = {}
+    for r in query.group_by(*group):
+        report[(r.teacher_id, r.period if period is not None else None)] = {
+            "days_worked": r.days_worked, "shifts": r.shifts, "minutes": r.minutes or 0.0,
+            "late_days": r.late_days, "missing_clock_outs": 0,
+        }
+
+    # Shifts never clocked out (only days before today count as missing)
+    log = models.TeacherAttendance
+    cutoff = min(datetime.combine(end + timedelta(days=1), time.min), datetime.combine(date.today(), time.min))
+    open_query = db.query(log.teacher_id, log.clock_in_time).filter(
+        log.clock_out_time.is_(None),
+        log.clock_in_time >= datetime.combine(start, time.min),
+        log.clock_in_time < cutoff
+    )
+    if teacher_id is not None:
+        open_query = open_query.filter(log.teacher_id == teacher_id)
+    missing = defaultdict(int)
+    for tid, clock_in in open_query:
+        missing[(tid, clock_in.strftime("%Y-%m") if period is not None else None)] += 1
+    for key, count in missing.items():
+        report.setdefault(key, {"days_worked": 0, "shifts": 0, "minutes": 0.0, "late_days": 0, "missing_clock_outs": 0})
+        report[key]["missing_clock_outs"] = count
+
+    names = dict(db.query(models.User.id, models.User.full_name).filter(models.User.id.in_({tid for tid, _ in report})))
+    return [
+        {
+            "teacher_id": tid,
+            "name": names.get(tid),
+            "period": p,
+            "days_worked": row["days_worked"],
+            "shifts": row["shifts"],
+            "hours_worked": round(row["minutes"] / 60, 2),
+            "avg_hours_per_day": round(row["minutes"] / 60 / row["days_worked"], 2) if row["days_worked"] else 0.0,
+            "late_days": row["late_days"],
+            "missing_clock_outs": row["missing_clock_outs"],
+        }
+        for (tid, p), row in sorted(report.items(), key=lambda item: (item[0][1] or "", names.get(item[0][0]) or "", item[0][0]))
+    ]
+
+
+def main():
+    from .database import engine, make_engine
+
+    parser = argparse.ArgumentParser(description="Rebuild teacher_attendance_daily from teacher_attendance")
+    parser.add_argument("--since", type=date.fromisoformat, help="only rebuild days from this date (YYYY-MM-DD)")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / sqlite:///./school.db")
+    args = parser.parse_args()
+
+    db_engine = make_engine(args.database_url) if args.database_url else engine
+    models.Base.metadata.create_all(bind=db_engine, tables=[Daily.__table__])
+    started = clock.perf_counter()
+    with db_engine.begin() as conn:
+        count = backfill(conn, args.since)
+    print(f"✅ {count:,} daily rows in {clock.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
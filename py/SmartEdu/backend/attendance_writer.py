@@ -0,0 +1,235 @@
+# backend/attendance_writer.py
+import json
+import logging
+import os
+import queue
+import threading
+import time as clock
+from concurrent.futures import Future, InvalidStateError
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .attendance_rollup import apply_closed_shifts
+
+# Opt-in: group-commit clock-in/out writes from a single background writer
+WRITE_BEHIND = os.environ.get("ATTENDANCE_WRITE_BEHIND", "0") == "1"
+MAX_BATCH = 500
+MAX_WAIT_SECONDS = 0.005
+WRITE_TIMEOUT_SECONDS = 30     # caller gives up (HTTP 503) if its batch has not landed by then
+
+# Stored clock responses are replayed for this long, then deleted
+IDEMPOTENCY_TTL = timedelta(hours=int(os.environ.get("IDEMPOTENCY_TTL_HOURS", "24")))
+PRUNE_INTERVAL_SECONDS = 600
+_last_prune = 0.0
+
+log = logging.getLogger(__name__)
+
+
+class ClockError(Exception):
+    """A rejected clock-in/out (e.g. already clocked in); becomes an HTTP 400"""
+
+
+def _scoped_key(op):
+    """A client key only replays the same teacher's same action"""
+    return f"{op['teacher_id']}:{op['action']}:{op['key']}" if op["key"] else None
+
+
+def prune_idempotency_keys(db: Session, now=None, force=False):
+    """Delete expired keys (at most every PRUNE_INTERVAL_SECONDS unless forced); returns the count"""
+    global _last_prune
+    if not force and clock.monotonic() - _last_prune < PRUNE_INTERVAL_SECONDS:
+        return 0
+    _last_prune = clock.monotonic()
+    cutoff = (now or datetime.now()) - IDEMPOTENCY_TTL
+    return db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.created_at < cutoff)).rowcount
+
+
+def apply_clock_ops(db: Session, ops):
+    """
+    Apply clock operations in order inside the caller's transaction.
+    ops: [{"action": "in" | "out", "teacher_id", "at": datetime, "key": str | None}]
+    Returns one result dict or ClockError per op. The caller commits.
+    """
+    teacher_ids = {op["teacher_id"] for op in ops}
+    ops = [dict(op, key=_scoped_key(op)) for op in ops]
+    keys = {op["key"] for op in ops if op["key"]}
+
+    # One indexed lookup for the whole batch (uses ux_teacher_attendance_open_shift)
+    open_shifts = {
+        row.teacher_id: row
+        for row in db.query(models.TeacherAttendance).filter(
+            models.TeacherAttendance.teacher_id.in_(teacher_ids),
+            models.TeacherAttendance.clock_out_time.is_(None)
+        )
+    }
+    known_teachers = {tid for (tid,) in db.query(models.User.id).filter(models.User.id.in_(teacher_ids))}
+    replay = {}
+    if keys:
+        # Expired keys are not replayed; clear them now so the key can be stored again
+        now = datetime.now()
+        db.execute(delete(models.IdempotencyKey).where(
+            models.IdempotencyKey.key.in_(keys), models.IdempotencyKey.created_at < now - IDEMPOTENCY_TTL
+        ))
+        replay = {k.key: json.loads(k.response) for k in db.query(models.IdempotencyKey).filter(models.IdempotencyKey.key.in_(keys))}
+        prune_idempotency_keys(db, now)
+
+    results, new_rows, repeats, closed = [], [], [], []
+    first_with_key = {}
+    for op in ops:
+        if op["key"] in replay:
+            results.append(dict(replay[op["key"]], replayed=True))
+            continue
+        if op["key"] in first_with_key:
+            # Same key twice in one batch: answer with the first op's result
+            repeats.append((len(results), first_with_key[op["key"]]))
+            results.append(None)
+            continue
+        if op["key"]:
+            first_with_key[op["key"]] = len(results)
+
+        teacher_id = op["teacher_id"]
+        if teacher_id not in known_teachers:
+            results.append(ClockError("Teacher not found."))
+            continue
+        if op["action"] == "in":
+            if teacher_id in open_shifts:
+                results.append(ClockError("Already clocked in. Please clock out first."))
+                continue
+            row = models.TeacherAttendance(teacher_id=teacher_id, clock_in_time=op["at"])
+            db.add(row)
+            open_shifts[teacher_id] = row
+            new_rows.append((len(results), row, "Clocked in"))
+        else:
+            row = open_shifts.pop(teacher_id, None)
+            if row is None:
+                results.append(ClockError("You are not clocked in."))
+                continue
+            row.clock_out_time = op["at"]
+            closed.append((teacher_id, row.clock_in_time, op["at"]))
+            new_rows.append((len(results), row, "Clocked out"))
+        results.append(None)   # filled in after flush, once ids exist
+
+    db.flush()
+    # Hours rollup moves in the same transaction as the clock-out itself
+    apply_closed_shifts(db, closed)
+    for i, row, message in new_rows:
+        result = {
+            "message": f"{message} at {(row.clock_out_time or row.clock_in_time).strftime('%H:%M:%S')}",
+            "id": row.id,
+            "clock_in_time": row.clock_in_time.isoformat(),
+            "clock_out_time": row.clock_out_time.isoformat() if row.clock_out_time else None,
+        }
+        results[i] = result
+        key = ops[i]["key"]
+        if key:
+            db.add(models.IdempotencyKey(key=key, response=json.dumps(result)))
+
+    for i, first in repeats:
+        first_result = results[first]
+        results[i] = first_result if isinstance(first_result, ClockError) else dict(first_result, replayed=True)
+    return results
+
+
+def commit_clock_ops(db: Session, ops):
+    """
+    apply_clock_ops() + commit. Losing a race on a unique index (a second
+    open shift, or the same idempotency key from a concurrent retry) is
+    retried once against the committed state, where it turns into a
+    ClockError or a replay. A second IntegrityError propagates.
+    """
+    try:
+        results = apply_clock_ops(db, ops)
+        db.commit()
+        return results
+    except IntegrityError:
+        db.rollback()
+    results = apply_clock_ops(db, ops)
+    db.commit()
+    return results
+
+
+class GroupCommitWriter:
+    """
+    Single background thread that drains queued clock ops and commits them
+    in batches. Callers block on a Future, so they only get a response once
+    their row is durably committed.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.ops = 0
+
+    def submit(self, op):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((op, future))
+        return future
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < MAX_BATCH:
+                    batch.append(self._queue.get(timeout=MAX_WAIT_SECONDS))
+            except queue.Empty:
+                pass
+            # The only writer thread: whatever breaks (opening or closing the
+            # session included) fails this batch, never the thread itself
+            try:
+                self._commit(batch)
+            except Exception as e:
+                log.exception("Attendance writer batch of %d failed", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        try:
+                            future.set_exception(e)
+                        except InvalidStateError:      # cancelled meanwhile by a timed-out caller
+                            pass
+
+    def _commit(self, batch):
+        # Callers that timed out cancelled their Future: do not apply those ops
+        batch = [(op, future) for op, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        db = self.session_factory()
+        try:
+            try:
+                results = commit_clock_ops(db, [op for op, _ in batch])
+            except Exception:
+                db.rollback()
+                # One bad op must not fail the whole batch: retry each on its own
+                for op, future in batch:
+                    self._commit_one(db, op, future)
+                return
+        finally:
+            db.close()
+
+        self.batches += 1
+        self.ops += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _commit_one(self, db, op, future):
+        try:
+            result = commit_clock_ops(db, [op])[0]
+        except Exception as e:
+            db.rollback()
+            future.set_exception(e)
+            return
+        self.batches += 1
+        self.ops += 1
+        future.set_result(result)
@@ -0,0 +1,344 @@
+# backend/auth.py
+# Password hashing and signed session tokens.
+#   python -m backend.auth --rehash        # hash every password still stored in plaintext
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from fastapi import HTTPException
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _argon2 = PasswordHasher()
+except ImportError:
+    _argon2 = None
+
+try:
+    import bcrypt
+except ImportError:
+    bcrypt = None
+
+# --- CONFIG ---
+# Opt-in: every route except PUBLIC_PATHS needs `Authorization: Bearer <token>`
+AUTH_REQUIRED = os.environ.get("AUTH_REQUIRED", "0") == "1"
+TOKEN_TTL = int(os.environ.get("AUTH_TOKEN_TTL", "43200"))       # seconds (12 h)
+HASH_WORKERS = int(os.environ.get("AUTH_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_MAX_PENDING = int(os.environ.get("AUTH_HASH_MAX_PENDING", "64"))
+TOKEN_CACHE_SIZE = 1024
+
+# argon2id > bcrypt > stdlib scrypt, whichever is installed (override with AUTH_HASH_SCHEME)
+SCHEME = os.environ.get("AUTH_HASH_SCHEME") or ("argon2" if _argon2 else "bcrypt" if bcrypt else "scrypt")
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+
+# Without AUTH_SECRET tokens only survive until restart and only work on this worker
+SECRET = (os.environ.get("AUTH_SECRET") or secrets.token_hex(32)).encode()
+
+# /metrics stays open for the Prometheus scraper (counters only); the
+# slow-query log shows raw SQL and needs a token like everything else
+PUBLIC_PATHS = {"/", "/users/login", "/docs", "/openapi.json", "/metrics"}
+
+log = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Too many password hashes queued; becomes an HTTP 503"""
+
+
+class TokenError(Exception):
+    """Missing, malformed, tampered or expired token; becomes an HTTP 401"""
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+# --- PASSWORD HASHING ---
+
+def hash_password(password):
+    """Salted slow hash in the configured scheme (CPU bound: call through hash_pool)"""
+    if SCHEME == "argon2":
+        return _argon2.hash(password)
+    if SCHEME == "bcrypt":
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=32)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(("$argon2", "$2a$", "$2b$", "$2y$", "scrypt$"))
+
+
+def needs_rehash(stored):
+    """Plaintext, or hashed with another scheme / weaker parameters than today's"""
+    if not is_hashed(stored):
+        return True
+    if SCHEME == "argon2":
+        return not stored.startswith("$argon2") or _argon2.check_needs_rehash(stored)
+    if SCHEME == "bcrypt":
+        return not stored.startswith("$2")
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+def verify_password(stored, password):
+    """
+    False for a wrong password, and also for a stored hash that can't be
+    checked (malformed, or its library isn't installed): that is logged and
+    refused like a failed login, never raised into the request.
+    """
+    if not stored:
+        return False
+    if stored.startswith("$argon2"):
+        if _argon2 is None:
+            return _unverifiable("argon2", "argon2-cffi is not installed")
+        try:
+            return _argon2.verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    if stored.startswith("$2"):
+        if bcrypt is None:
+            return _unverifiable("bcrypt", "bcrypt is not installed")
+        try:
+            return bcrypt.checkpw(password.encode(), stored.encode())
+        except ValueError:
+            return _unverifiable("bcrypt", "malformed hash")
+    if stored.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, digest = stored.split("$")
+            expected = _unb64(digest)
+            actual = hashlib.scrypt(password.encode(), salt=_unb64(salt), n=int(n), r=int(r), p=int(p), dklen=len(expected))
+        except ValueError:       # wrong field count, bad base64 or bad parameters
+            return _unverifiable("scrypt", "malformed hash")
+        return hmac.compare_digest(actual, expected)
+    # Legacy plaintext row from before hashing; login upgrades it
+    return hmac.compare_digest(stored.encode(), password.encode())
+
+
+def _unverifiable(scheme, reason):
+    log.error("Login refused: stored %s password hash can't be checked (%s)", scheme, reason)
+    return False
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    """Checked against for unknown usernames so they take as long as wrong passwords"""
+    return hash_password(secrets.token_hex(8))
+
+
+def _verify_stored(stored, password):
+    # Runs on the hash pool, so the one-off dummy hash is never built on the event loop
+    return verify_password(stored or _dummy_hash(), password)
+
+
+class HashPool:
+    """
+    Password hashing on a few dedicated threads (the KDFs release the GIL),
+    never on the event loop or the request threadpool. At most `max_pending`
+    jobs queue up; past that submit() raises Overloaded so a login storm is
+    shed with 503s instead of piling up. map() is for batch jobs: it waits
+    for a free slot instead.
+    """
+
+    def __init__(self, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _start(self, fn, *args):
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise Overloaded("Too many logins in progress, try again shortly.")
+        return self._start(fn, *args)
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def map(self, fn, items):
+        """fn(item) for every item, in order, blocking (CLI / maintenance use)"""
+        futures = []
+        for item in items:
+            self._slots.acquire()
+            futures.append(self._start(fn, item))
+        return [future.result() for future in futures]
+
+
+hash_pool = HashPool()
+
+
+def overloaded_error(e):
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+async def check_login(stored, password):
+    """
+    (ok, upgraded_hash) for a stored hash (None for an unknown user).
+    upgraded_hash is set when a correct password was stored in plaintext or
+    an older scheme, and should be saved.
+    """
+    ok = await hash_pool.run(_verify_stored, stored, password)
+    if not ok or stored is None:
+        return False, None
+    if needs_rehash(stored):
+        return True, await hash_pool.run(hash_password, password)
+    return True, None
+
+
+# --- TOKENS ---
+
+_HEADER = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def issue_token(user, ttl=TOKEN_TTL):
+    """HS256 JWT carrying everything the routes need, so checking it needs no DB lookup"""
+    now = int(time.time())
+    claims = {"sub": user.id, "name": user.full_name, "role": user.role, "iat": now, "exp": now + ttl}
+    signing_input = f"{_HEADER}.{_b64(json.dumps(claims, separators=(',', ':')).encode())}"
+    signature = hmac.new(SECRET, signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64(signature)}"
+
+
+def login_response(user):
+    return {
+        "message": "Login successful",
+        "user_id": user.id,
+        "full_name": user.full_name,
+        "role": user.role,
+        "access_token": issue_token(user),
+        "token_type": "bearer",
+        "expires_in": TOKEN_TTL,
+    }
+
+
+class TokenVerifier:
+    """
+    Stateless HMAC check of a token, fronted by a small LRU of tokens that
+    already passed, so a client's repeat requests skip the signature and
+    JSON work until the token expires.
+    """
+
+    def __init__(self, size=TOKEN_CACHE_SIZE):
+        self.size = size
+        self._cache = OrderedDict()     # token -> claims
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def verify(self, token):
+        if not token:
+            raise TokenError("Not authenticated")
+        now = time.time()
+        with self._lock:
+            claims = self._cache.get(token)
+            if claims is not None:
+                if claims["exp"] > now:
+                    self._cache.move_to_end(token)
+                    self.stats["hits"] += 1
+                    return claims
+                del self._cache[token]
+            self.stats["misses"] += 1
+
+        try:
+            header, payload, signature = token.split(".")
+            expected = hmac.new(SECRET, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+            if header != _HEADER or not hmac.compare_digest(_unb64(signature), expected):
+                raise TokenError("Invalid token")
+            claims = json.loads(_unb64(payload))
+        except (ValueError, TypeError):
+            raise TokenError("Invalid token")
+        if claims.get("exp", 0) <= now:
+            raise TokenError("Token expired")
+
+        with self._lock:
+            self._cache[token] = claims
+            if len(self._cache) > self.size:
+                self._cache.popitem(last=False)
+        return claims
+
+
+token_verifier = TokenVerifier()
+
+
+def _bearer(headers):
+    value = headers.get("authorization") or ""
+    scheme, _, token = value.partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else None
+
+
+def current_user(request: Request):
+    """Route dependency: the verified token claims ({"sub", "name", "role", ...})"""
+    claims = getattr(request.state, "user", None)
+    if claims is not None:
+        return claims
+    try:
+        return token_verifier.verify(_bearer(request.headers))
+    except TokenError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+
+class AuthMiddleware:
+    """Pure ASGI: rejects requests without a valid bearer token (AUTH_REQUIRED=1)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            return await self.app(scope, receive, send)
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        try:
+            claims = token_verifier.verify(_bearer(headers))
+        except TokenError as e:
+            response = JSONResponse({"detail": str(e)}, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+            return await response(scope, receive, send)
+        scope.setdefault("state", {})["user"] = claims
+        await self.app(scope, receive, send)
+
+
+def main():
+    from sqlalchemy.orm import Session
+    from . import models
+    from .database import engine, make_engine
+
+    parser = argparse.ArgumentParser(description="Password maintenance")
+    parser.add_argument("--rehash", action="store_true", help="hash every password still stored in plaintext")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / sqlite:///./school.db")
+    args = parser.parse_args()
+    if not args.rehash:
+        parser.error("nothing to do (try --rehash)")
+
+    db_engine = make_engine(args.database_url) if args.database_url else engine
+    with Session(db_engine) as db:
+        pending = [u for u in db.query(models.User) if not is_hashed(u.password_hash)]
+        # No password at all can never log in: leave it empty rather than hashing ""
+        users = [u for u in pending if u.password_hash]
+        # One salted hash per user (shared passwords must not share a hash), in parallel on the pool
+        for u, hashed in zip(users, hash_pool.map(hash_password, [u.password_hash for u in users])):
+            u.password_hash = hashed
+        db.commit()
+    print(f"✅ {len(users)} plaintext passwords hashed with {SCHEME}")
+    if len(pending) > len(users):
+        print(f"   ⚠️  {len(pending) - len(users)} users have no password and stay unable to log in")
+
+
+if __name__ == "__main__":
+    main()
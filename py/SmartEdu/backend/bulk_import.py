@@ -0,0 +1,122 @@
+# backend/bulk_import.py
+import csv
+import json
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+from .grade_summary import apply_grade_summary_rows
+from .grade_stats import grade_stats
+from .response_cache import response_cache
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+# What a single bad line can raise (UnicodeDecodeError and JSONDecodeError are ValueErrors)
+LINE_ERRORS = (ValueError, csv.Error)
+
+
+async def iter_lines(stream):
+    """Split an async byte stream into raw byte lines without buffering the whole body"""
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
+
+
+def decode_line(raw):
+    """Strict UTF-8 (a leading BOM is dropped); decoded per line so a bad one only fails its own row"""
+    return raw.decode("utf-8-sig")
+
+
+def parse_header(raw):
+    return [h.strip() for h in next(csv.reader([decode_line(raw)]))]
+
+
+def parse_line(raw, fmt, header):
+    """One CSV / NDJSON line -> dict (empty CSV cells are dropped so schema defaults apply)"""
+    line = decode_line(raw)
+    if fmt == "ndjson":
+        row = json.loads(line)
+        if not isinstance(row, dict):
+            raise ValueError("Each NDJSON line must be an object")
+        return row
+    values = next(csv.reader([line]))
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    return {k: v for k, v in zip(header, values) if v != ""}
+
+
+def describe_error(exc):
+    if isinstance(exc, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors())
+    return str(exc)
+
+
+class GradeImporter:
+    """Validates rows one by one and writes them CHUNK_SIZE at a time, one transaction per chunk"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.pending = []      # (line number, GradeCreate)
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_no, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line_no, "error": message})
+
+    def add_row(self, line_no, row):
+        try:
+            self.pending.append((line_no, schemas.GradeCreate(**row)))
+        except (ValidationError, TypeError) as e:
+            self.add_error(line_no, describe_error(e))
+
+    @property
+    def chunk_ready(self):
+        return len(self.pending) >= CHUNK_SIZE
+
+    def flush(self, db: Session = None):
+        """Insert the pending chunk with a single executemany and commit"""
+        if not self.pending:
+            return
+        chunk, self.pending = self.pending, []
+        # The async route passes a fresh threadpool session for every chunk
+        self.db = db or self.db
+
+        student_ids = {g.student_id for _, g in chunk}
+        class_by_student = dict(
+            self.db.query(models.Student.id, models.Student.class_name).filter(models.Student.id.in_(student_ids))
+        )
+
+        rows = []
+        for line_no, g in chunk:
+            if g.student_id not in class_by_student:
+                self.add_error(line_no, f"student_id {g.student_id} does not exist")
+                continue
+            rows.append({"student_id": g.student_id, "subject": g.subject, "score": g.score, "term": g.term})
+
+        if rows:
+            self.db.execute(insert(models.Grade), rows)
+            apply_grade_summary_rows(self.db, rows, class_by_student)
+        self.db.commit()
+        self.inserted += len(rows)
+        if rows:
+            grade_stats.invalidate({r["term"] for r in rows})
+            response_cache.invalidate("grades")
+
+    def report(self):
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
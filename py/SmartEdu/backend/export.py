@@ -0,0 +1,209 @@
+# backend/export.py
+# Columnar exports for analysts (Parquet or Arrow IPC / Feather v2):
+#   python -m backend.export grades --out grades.parquet
+#   python -m backend.export student_attendance --format arrow --out - > marks.arrow
+#   python -m backend.export --all --out-dir exports/
+# Rows come off one server-side cursor in row-group sized chunks, so memory
+# stays flat however big the table is. Both files load straight into pandas:
+#   pd.read_parquet("grades.parquet"), pd.read_feather("marks.arrow")
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String, Time, select
+
+from . import models
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+ROW_GROUP_ROWS = 100_000       # rows per Parquet row group / Arrow record batch
+MAX_ROW_GROUP_ROWS = 1_000_000
+
+TABLES = {
+    "grades": models.Grade.__table__,
+    "student_attendance": models.StudentAttendance.__table__,
+    "teacher_attendance": models.TeacherAttendance.__table__,
+    "schedules": models.Schedule.__table__,
+}
+
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """pyarrow is not installed"""
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ExportUnavailable("Columnar export needs pyarrow (pip install pyarrow)")
+
+
+# --- SCHEMA ---
+
+def _arrow_type(column):
+    for sql_type, arrow_type in (
+        (Boolean, pa.bool_), (Integer, pa.int64), (Float, pa.float64),
+        (DateTime, lambda: pa.timestamp("us")), (Date, pa.date32), (Time, lambda: pa.time64("us")),
+        (String, pa.string),
+    ):
+        if isinstance(column.type, sql_type):
+            return arrow_type()
+    raise TypeError(f"no Arrow type for {column.table.name}.{column.name} ({column.type})")
+
+
+def arrow_schema(table):
+    """Fixed from the model, so every chunk (and an empty export) has the same schema"""
+    _require_pyarrow()
+    return pa.schema([pa.field(c.name, _arrow_type(c), nullable=not c.primary_key) for c in table.columns],
+                     metadata={"table": table.name})
+
+
+# --- READ ---
+
+def iter_batches(conn, table_name, after_id=0, rows=ROW_GROUP_ROWS):
+    """
+    One server-side streamed SELECT ordered by id, yielded as Arrow record
+    batches of up to `rows` rows. Only one chunk is held at a time.
+    `after_id` resumes an export (or pulls only the rows added since).
+    """
+    table = TABLES[table_name]
+    schema = arrow_schema(table)
+    query = select(table).where(table.c.id > after_id).order_by(table.c.id)
+    result = conn.execution_options(stream_results=True, yield_per=rows).execute(query)
+    for chunk in result.partitions():
+        columns = zip(*chunk)
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+        )
+
+
+# --- WRITE ---
+
+class _ChunkSink:
+    """Write-only file object that collects what the writer produced since the last take()"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_file_chunks(conn, table_name, fmt="parquet", after_id=0, rows=ROW_GROUP_ROWS, progress=None):
+    """
+    Yield the export file piece by piece: each chunk of rows becomes one
+    Parquet row group / Arrow record batch and is handed on as soon as it
+    is encoded. Nothing needs to seek, so it can go to a pipe or a
+    StreamingResponse. `progress(rows_so_far)` is called after each chunk.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    schema = arrow_schema(TABLES[table_name])
+    sink = _ChunkSink()
+    target = pa.PythonFile(sink, mode="w")
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(target, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(target, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    count = 0
+    for batch in iter_batches(conn, table_name, after_id, rows):
+        if fmt == "parquet":
+            writer.write_batch(batch, row_group_size=rows)
+        else:
+            writer.write_batch(batch)
+        count += batch.num_rows
+        if progress:
+            progress(count)
+        data = sink.take()
+        if data:
+            yield data
+    writer.close()
+    yield sink.take()
+
+
+def write(conn, table_name, out, fmt="parquet", after_id=0, rows=ROW_GROUP_ROWS):
+    """Write one table to the binary file object `out`; returns the row count"""
+    count = 0
+
+    def progress(done):
+        nonlocal count
+        count = done
+
+    for data in iter_file_chunks(conn, table_name, fmt, after_id, rows, progress):
+        out.write(data)
+    return count
+
+
+def filename(table_name, fmt, after_id=0):
+    suffix = f"-after-{after_id}" if after_id else ""
+    return f"{table_name}{suffix}.{FORMATS[fmt][1]}"
+
+
+def main():
+    from .database import engine, make_engine
+
+    parser = argparse.ArgumentParser(description="Export tables as Parquet or Arrow IPC (Feather v2)")
+    parser.add_argument("table", nargs="?", choices=list(TABLES))
+    parser.add_argument("--all", action="store_true", help="every exportable table, into --out-dir")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--out", help="file, or - for stdout (default: <table>.<format>)")
+    parser.add_argument("--out-dir", default=".", help="directory for --all / the default file name")
+    parser.add_argument("--after-id", type=int, default=0, help="only rows with id > this")
+    parser.add_argument("--rows", type=int, default=ROW_GROUP_ROWS, help="rows per row group / record batch")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / sqlite:///./school.db")
+    args = parser.parse_args()
+    if not args.all and not args.table:
+        parser.error("give a table or --all")
+    if args.all and args.out:
+        parser.error("--out exports a single table; use --out-dir with --all")
+    try:
+        _require_pyarrow()
+    except ExportUnavailable as e:
+        parser.error(str(e))
+
+    db_engine = make_engine(args.database_url) if args.database_url else engine
+    os.makedirs(args.out_dir, exist_ok=True)
+    with db_engine.connect() as conn:
+        for table_name in (TABLES if args.all else [args.table]):
+            started = time.perf_counter()
+            if args.out == "-":
+                count, shown = write(conn, table_name, sys.stdout.buffer, args.format, args.after_id, args.rows), "stdout"
+            else:
+                shown = args.out or os.path.join(args.out_dir, filename(table_name, args.format, args.after_id))
+                with open(shown, "wb") as out:
+                    count = write(conn, table_name, out, args.format, args.after_id, args.rows)
+            print(f"✅ {table_name}: {count:,} rows -> {shown} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# backend/grade_stats.py
+# Per-term grade distributions, percentiles and class / cohort ranks.
+# A term's grades are pulled once as columns and ranked with NumPy for every
+# class at once; results are cached per (class, term) until a grade write
+# for that term invalidates them.
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .grade_summary import PASS_MARK
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_EDGES = np.arange(0, 101, 10)      # 0-9, 10-19, ... 90-100
+DEFAULT_TTL = 600        # seconds; grade writes from outside the API (seed_data) are picked up after this
+MAX_TERMS = 4            # term snapshots kept in memory (~30 MB each at 50k students x 10 subjects)
+MAX_CLASSES = 512        # (class, term) results kept
+
+
+def cohort_of(class_name):
+    """The form a class belongs to: "5 A" -> "5" (the whole class name if it has no space)"""
+    return (class_name or "").split(" ", 1)[0]
+
+
+def _ranks(groups, values):
+    """
+    Competition rank (1 = best, ties share the better rank), group size and
+    percentile rank (share of the group below, ties counted half) of every
+    value within its group. One lexsort for all groups.
+    """
+    n = len(values)
+    rank, size, percentile = np.empty(n, np.int64), np.empty(n, np.int64), np.empty(n)
+    if n == 0:
+        return rank, size, percentile
+    order = np.lexsort((-values, groups))
+    g, v = groups[order], values[order]
+    idx = np.arange(n)
+
+    group_change = g[1:] != g[:-1]
+    run_change = group_change | (v[1:] != v[:-1])
+    starts_group, ends_group = np.r_[True, group_change], np.r_[group_change, True]
+    starts_run, ends_run = np.r_[True, run_change], np.r_[run_change, True]
+
+    group_start = np.maximum.accumulate(np.where(starts_group, idx, 0))
+    run_start = np.maximum.accumulate(np.where(starts_run, idx, 0))
+    group_end = np.minimum.accumulate(np.where(ends_group, idx, n)[::-1])[::-1]
+    run_end = np.minimum.accumulate(np.where(ends_run, idx, n)[::-1])[::-1]
+
+    group_size = group_end - group_start + 1
+    below = group_end - run_end
+    ties = run_end - run_start + 1
+    rank[order] = run_start - group_start + 1
+    size[order] = group_size
+    percentile[order] = 100.0 * (below + 0.5 * ties) / group_size
+    return rank, size, percentile
+
+
+def _describe(matrix):
+    """count / mean / std / min / percentiles / max / pass_rate / histogram per column (NaN = no grade)"""
+    stats = []
+    with np.errstate(all="ignore"):
+        counts = np.sum(~np.isnan(matrix), axis=0)
+        means = np.nanmean(matrix, axis=0) if len(matrix) else np.full(matrix.shape[1], np.nan)
+        stds = np.nanstd(matrix, axis=0) if len(matrix) else np.full(matrix.shape[1], np.nan)
+    for j in range(matrix.shape[1]):
+        column = matrix[:, j]
+        column = column[~np.isnan(column)]
+        if not len(column):
+            stats.append({"count": 0})
+            continue
+        cuts = np.percentile(column, PERCENTILES)
+        hist, _ = np.histogram(np.clip(column, 0, 100), bins=HISTOGRAM_EDGES)
+        stats.append({
+            "count": int(counts[j]),
+            "mean": round(float(means[j]), 1),
+            "std": round(float(stds[j]), 1),
+            "min": round(float(column.min()), 1),
+            **{f"p{p}": round(float(c), 1) for p, c in zip(PERCENTILES, cuts)},
+            "max": round(float(column.max()), 1),
+            "pass_rate": round(float(np.mean(column >= PASS_MARK)) * 100, 1),
+            "histogram": hist.tolist(),
+        })
+    return stats
+
+
+class TermGrades:
+    """
+    One term's grades as a student x subject matrix of mean scores (a student
+    with several grades for a subject counts their mean), with every cell and
+    every student average ranked within its class and within its cohort.
+    """
+
+    def __init__(self, term, student_ids, subject_idx, subjects, scores, class_of):
+        """
+        student_ids / subject_idx / scores: one entry per grade row (from the
+        columnar pull); subjects: names for subject_idx; class_of: student_id -> class
+        """
+        self.term = term
+        self.built_at = time.monotonic()
+        self.student_ids, student_idx = np.unique(student_ids, return_inverse=True)
+        self.subjects = np.array(subjects, dtype=object)
+        n_students, n_subjects = len(self.student_ids), len(self.subjects)
+
+        classes = {}
+        self.class_idx = np.fromiter((classes.setdefault(class_of.get(sid), len(classes)) for sid in self.student_ids.tolist()),
+                                     np.int64, n_students)
+        self.classes = np.array(list(classes), dtype=object)
+        cohorts = {}
+        class_cohort = np.fromiter((cohorts.setdefault(cohort_of(c), len(cohorts)) for c in classes), np.int64, len(classes))
+        self.cohorts = np.array(list(cohorts), dtype=object)
+        self.cohort_idx = class_cohort[self.class_idx]
+
+        # --- student x subject means (NaN = no grade) ---
+        cell = student_idx * n_subjects + subject_idx
+        totals = np.bincount(cell, weights=scores, minlength=n_students * n_subjects)
+        counts = np.bincount(cell, minlength=n_students * n_subjects)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.matrix = (totals / counts).reshape(n_students, n_subjects)
+            self.average = np.bincount(student_idx, weights=scores, minlength=n_students) / np.bincount(student_idx, minlength=n_students)
+
+        # --- ranks of every graded cell, within class and within cohort ---
+        rows, cols = np.nonzero(~np.isnan(self.matrix))
+        values = self.matrix[rows, cols]
+        self.cell_rows, self.cell_cols = rows, cols
+        self.class_rank, self.class_size, _ = _ranks(self.class_idx[rows] * n_subjects + cols, values)
+        self.cohort_rank, self.cohort_size, self.cohort_percentile = _ranks(self.cohort_idx[rows] * n_subjects + cols, values)
+
+        # ... and of every student's overall average
+        self.avg_class_rank, self.avg_class_size, _ = _ranks(self.class_idx, self.average)
+        self.avg_cohort_rank, self.avg_cohort_size, self.avg_cohort_percentile = _ranks(self.cohort_idx, self.average)
+
+    def class_report(self, class_name, names):
+        """Distribution + per-student ranks for one class; `names`: student_id -> full name"""
+        found = np.nonzero(self.classes == class_name)[0]
+        if not len(found):
+            return None
+        c = found[0]
+        members = np.nonzero(self.class_idx == c)[0]
+        cohort = self.cohort_idx[members[0]]
+        cohort_members = np.nonzero(self.cohort_idx == cohort)[0]
+        subjects = [str(s) for s in self.subjects]
+
+        class_stats = _describe(self.matrix[members])
+        cohort_stats = _describe(self.matrix[cohort_members])
+        distribution = []
+        for j, subject in enumerate(subjects):
+            if not class_stats[j]["count"]:
+                continue
+            cohort_row = cohort_stats[j]
+            distribution.append(dict(class_stats[j], subject=subject, cohort={
+                "count": cohort_row["count"], "mean": cohort_row["mean"], "p50": cohort_row["p50"],
+            }))
+
+        # Cells of this class's students, in matrix order
+        in_class = self.class_idx[self.cell_rows] == c
+        cell_rows, cell_cols = self.cell_rows[in_class], self.cell_cols[in_class]
+        class_rank, cohort_rank = self.class_rank[in_class], self.cohort_rank[in_class]
+        percentile, cohort_size = self.cohort_percentile[in_class], self.cohort_size[in_class]
+        by_student = {}
+        for k in range(len(cell_rows)):
+            by_student.setdefault(cell_rows[k], {})[subjects[cell_cols[k]]] = {
+                "score": round(float(self.matrix[cell_rows[k], cell_cols[k]]), 1),
+                "class_rank": int(class_rank[k]),
+                "cohort_rank": int(cohort_rank[k]),
+                "cohort_size": int(cohort_size[k]),
+                "percentile": round(float(percentile[k]), 1),
+            }
+
+        students = []
+        for i in members:
+            sid = int(self.student_ids[i])
+            students.append({
+                "student_id": sid,
+                "name": names.get(sid),
+                "average": round(float(self.average[i]), 1),
+                "class_rank": int(self.avg_class_rank[i]),
+                "cohort_rank": int(self.avg_cohort_rank[i]),
+                "percentile": round(float(self.avg_cohort_percentile[i]), 1),
+                "subjects": by_student.get(i, {}),
+            })
+        students.sort(key=lambda s: (s["class_rank"], s["student_id"]))
+
+        return {
+            "class_name": class_name,
+            "term": self.term,
+            "cohort": str(self.cohorts[cohort]),
+            "class_size": len(members),
+            "cohort_size": len(cohort_members),
+            "histogram_edges": HISTOGRAM_EDGES.tolist(),
+            "subjects": sorted(distribution, key=lambda d: d["subject"]),
+            "students": students,
+        }
+
+
+def _fetch_tuples(conn, stmt):
+    """Plain DBAPI tuples: skips building a Row per grade, the slow part at 500k rows"""
+    result = conn.execute(stmt)
+    try:
+        return result.cursor.fetchall()
+    finally:
+        result.close()
+
+
+def term_exists(db: Session, term):
+    """Whether `term` is one of /grades/terms (any grade recorded for it)"""
+    return db.query(exists().where(models.Grade.term == term)).scalar()
+
+
+def load_term(db: Session, term):
+    """
+    Columnar pull of one term's grades into a TermGrades: one numeric
+    (student_id, score) range scan of ix_grades_term_covering per subject,
+    no students join and no ORM objects; the student -> class map is a
+    second, much smaller query.
+    """
+    conn = db.connection()
+    G = models.Grade
+    subjects = conn.execute(select(G.subject).where(G.term == term, G.subject.isnot(None)).distinct().order_by(G.subject)).scalars().all()
+    columns = []
+    for subject in subjects:
+        rows = _fetch_tuples(conn, select(G.student_id, G.score).where(G.term == term, G.subject == subject, G.score.isnot(None)))
+        columns.append(np.array(rows, dtype=float).reshape(-1, 2))
+    class_of = dict(conn.execute(select(models.Student.id, models.Student.class_name)).all())
+
+    if not columns:
+        columns = [np.empty((0, 2))]
+    pulled = np.concatenate(columns)
+    subject_idx = np.repeat(np.arange(len(columns)), [len(c) for c in columns])
+    return TermGrades(term, pulled[:, 0].astype(np.int64), subject_idx, subjects, pulled[:, 1], class_of)
+
+
+class GradeStatsCache:
+    """
+    Two-level cache: a few whole-term TermGrades snapshots, and the JSON-ready
+    report per (class, term). A grade write bumps its term's generation and
+    drops both levels for that term; a report computed while a write landed
+    is returned but not stored. Unknown terms and classes are never cached, so
+    they can't push real terms out, and each term builds under its own lock.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_terms=MAX_TERMS, max_classes=MAX_CLASSES):
+        self.ttl = ttl
+        self.max_terms = max_terms
+        self.max_classes = max_classes
+        self._terms = OrderedDict()      # term -> TermGrades
+        self._reports = OrderedDict()    # (class_name, term) -> (built_at, report)
+        self._generation = {}            # term -> bumped on every invalidation
+        self._epoch = 0                  # bumped when everything is invalidated
+        self._lock = threading.Lock()
+        self._build_locks = {}           # term -> Lock, only for terms that have grades
+        self.stats = {"hits": 0, "misses": 0, "term_builds": 0, "invalidations": 0}
+
+    def report(self, db: Session, class_name, term):
+        now = time.monotonic()
+        key = (class_name, term)
+        with self._lock:
+            entry = self._reports.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._reports.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+            generation = self._generation_of(term)
+
+        grades = self._term(db, term, generation)
+        if grades is None:
+            return None
+        names = dict(db.query(models.Student.id, models.Student.full_name).filter(models.Student.class_name == class_name))
+        report = grades.class_report(class_name, names)
+        if report is None:
+            return None
+
+        with self._lock:
+            if self._generation_of(term) == generation:
+                self._reports[key] = (grades.built_at, report)
+                self._reports.move_to_end(key)
+                while len(self._reports) > self.max_classes:
+                    self._reports.popitem(last=False)
+        return report
+
+    def _term(self, db, term, generation):
+        """
+        Snapshot for `term`, built once even when several classes ask at the
+        same time (None when the term has no grades)
+        """
+        grades = self._cached_term(term)
+        if grades is not None:
+            return grades
+        if not term_exists(db, term):
+            return None
+        with self._lock:
+            build_lock = self._build_locks.setdefault(term, threading.Lock())
+        with build_lock:
+            grades = self._cached_term(term)
+            if grades is not None:
+                return grades
+            grades = load_term(db, term)
+            with self._lock:
+                self.stats["term_builds"] += 1
+                if self._generation_of(term) == generation:
+                    self._terms[term] = grades
+                    while len(self._terms) > self.max_terms:
+                        self._terms.popitem(last=False)
+            return grades
+
+    def _cached_term(self, term):
+        with self._lock:
+            grades = self._terms.get(term)
+            if grades is not None and time.monotonic() - grades.built_at < self.ttl:
+                self._terms.move_to_end(term)
+                return grades
+            return None
+
+    def _generation_of(self, term):
+        return self._epoch, self._generation.get(term, 0)
+
+    # --- INVALIDATION (called by the grade write paths) ---
+
+    def invalidate(self, terms=None):
+        """Drop the given terms (every term when None)"""
+        with self._lock:
+            if terms is None:
+                self._epoch += 1
+                self._terms.clear()
+                self._reports.clear()
+            else:
+                terms = set(terms)
+                for term in terms:
+                    self._generation[term] = self._generation.get(term, 0) + 1
+                    self._terms.pop(term, None)
+                for key in [k for k in self._reports if k[1] in terms]:
+                    del self._reports[key]
+            self.stats["invalidations"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, terms=list(self._terms), reports=len(self._reports), ttl=self.ttl)
+
+
+# Shared instance used by the routers
+grade_stats = GradeStatsCache()
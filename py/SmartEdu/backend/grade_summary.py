@@ -0,0 +1,69 @@
+# backend/grade_summary.py
+from sqlalchemy import String, bindparam, case, func, literal, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import dialect_insert
+from .risk_scores import apply_grade_summaries
+
+PASS_MARK = 40
+
+
+def split_subjects(value):
+    """'Math,Science,Math' -> ['Math', 'Science'] (order kept, no duplicates)"""
+    if not value:
+        return []
+    return list(dict.fromkeys(value.split(",")))
+
+
+def apply_grade_summary_rows(db: Session, rows, class_by_student):
+    """
+    Fold new grade rows ({"student_id", "subject", "score"}) into
+    student_grade_summaries, then rescore those students' risk rows (caller
+    commits). The counters move with SQL-side increments (one upsert for the
+    batch) and failed subjects are appended by a conditional UPDATE, so two
+    concurrent writes for the same student both land on any backend.
+    """
+    G = models.StudentGradeSummary
+    totals, failed = {}, {}
+    for r in rows:
+        sid = r["student_id"]
+        row = totals.setdefault(sid, {
+            "student_id": sid, "class_name": class_by_student[sid],
+            "grade_count": 0, "score_total": 0.0, "failed_count": 0, "failed_subjects": "",
+        })
+        row["grade_count"] += 1
+        row["score_total"] += r["score"]
+        if r["score"] < PASS_MARK:
+            row["failed_count"] += 1
+            failed[(sid, r["subject"])] = None
+    if not totals:
+        return
+
+    bind = db.get_bind()
+    stmt = dialect_insert(bind)(G).values(list(totals.values()))
+    new, old = stmt.excluded, G.__table__.c
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["student_id"],
+        set_={
+            "grade_count": old.grade_count + new.grade_count,
+            "score_total": old.score_total + new.score_total,
+            "failed_count": old.failed_count + new.failed_count,
+        }
+    ))
+
+    if failed:
+        position = func.strpos if bind.dialect.name == "postgresql" else func.instr
+        subject = bindparam("subject", type_=String)
+        listed = position(literal(",") + old.failed_subjects + ",", literal(",") + subject + ",") > 0
+        db.execute(
+            update(G.__table__).where(old.student_id == bindparam("sid")).values(failed_subjects=case(
+                (old.failed_subjects == "", subject),
+                (listed, old.failed_subjects),
+                else_=old.failed_subjects + "," + subject,
+            )),
+            [{"sid": sid, "subject": subj} for sid, subj in failed],
+        )
+
+    summaries = db.query(G).filter(G.student_id.in_(totals)).populate_existing().all()
+    apply_grade_summaries(db, summaries)
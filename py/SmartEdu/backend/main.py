@@ -1,18 +1,59 @@
 from fastapi import FastAPI
-from .database import engine, Base
-from .routers import users, attendance, grades, schedule
+from fastapi.responses import PlainTextResponse
+from .database import engine, Base, add_missing_columns, create_missing_indexes, ASYNC_DB
+from .routers import leaves, export
+if ASYNC_DB:
+    from .routers.aio import users, attendance, grades, schedule
+else:
+    from .routers import users, attendance, grades, schedule
+from .response_cache import response_cache
+from .grade_stats import grade_stats
+from . import metrics, auth
 
 # Create Tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
+create_missing_indexes()
 
 app = FastAPI()
 
+# Cache for reference-data GETs (/users/teachers, /students/all, /schedule/master)
+app.middleware("http")(response_cache.middleware)
+
+# Bearer-token check (AUTH_REQUIRED=1). Outside the cache, so cached
+# responses are never served to an unauthenticated client.
+if auth.AUTH_REQUIRED:
+    app.add_middleware(auth.AuthMiddleware)
+
+# Request / SQL / pool metrics (METRICS_ENABLED=1). Added last so it is the
+# outermost layer and also times responses served from the cache.
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include the routers
 app.include_router(users.router)
 app.include_router(attendance.router)
 app.include_router(grades.router)
 app.include_router(schedule.router)
+app.include_router(leaves.router)
+app.include_router(export.router)
 
 @app.get("/")
 def read_root():
-    return {"message": "System Online"}
\ No newline at end of file
+    return {"message": "System Online"}
+
+@app.get("/cache/stats")
+def cache_stats():
+    return dict(response_cache.snapshot(), grade_stats=grade_stats.snapshot())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus text exposition format"""
+    if not metrics.METRICS_ENABLED:
+        return PlainTextResponse("# metrics disabled, set METRICS_ENABLED=1\n", status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/slow-queries")
+def slow_queries():
+    """Most recent statements slower than SLOW_QUERY_MS"""
+    return list(metrics.slow_query_samples)
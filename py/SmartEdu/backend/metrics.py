@@ -0,0 +1,169 @@
+# backend/metrics.py
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+
+from .response_cache import CACHED_PATHS
+
+# Off by default: with METRICS_ENABLED unset no middleware, engine listener or
+# pool wrapper is installed, so requests run exactly the uninstrumented path
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_SAMPLES = 50
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+
+class Histogram:
+    """Prometheus-style histogram keyed by a tuple of label values"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}       # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {series[-1]}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-2]}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# --- REGISTRY ---
+
+REQUEST_SECONDS = Histogram("edusmart_http_request_duration_seconds", "Request latency by route",
+                            ("method", "route", "status"))
+REQUEST_SQL_STATEMENTS = Histogram("edusmart_http_request_sql_statements", "SQL statements executed per request",
+                                   ("method", "route"), COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram("edusmart_http_request_sql_seconds", "Time spent in SQL per request",
+                                ("method", "route"))
+SQL_STATEMENT_SECONDS = Histogram("edusmart_sql_statement_duration_seconds", "Duration of single SQL statements")
+POOL_WAIT_SECONDS = Histogram("edusmart_db_pool_wait_seconds", "Time spent waiting for a pooled connection")
+SLOW_QUERIES = Counter("edusmart_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS")
+REGISTRY = [REQUEST_SECONDS, REQUEST_SQL_STATEMENTS, REQUEST_SQL_SECONDS, SQL_STATEMENT_SECONDS, POOL_WAIT_SECONDS, SLOW_QUERIES]
+
+slow_query_samples = deque(maxlen=SLOW_QUERY_SAMPLES)
+
+# [statements, sql seconds, path] for the request running in this context.
+# Sync handlers run in the threadpool with a copy of the context, which still
+# points at the same list, so their queries are attributed to the request.
+_request_sql = ContextVar("request_sql", default=None)
+
+
+def record_query(statement, seconds):
+    """Called by the engine listeners in database.py after every statement"""
+    SQL_STATEMENT_SECONDS.observe(seconds)
+    current = _request_sql.get()
+    if current is not None:
+        current[0] += 1
+        current[1] += seconds
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        slow_query_samples.append({
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "ms": round(seconds * 1000, 2),
+            "path": current[2] if current is not None else None,
+            "statement": statement[:1000],
+        })
+
+
+def record_pool_wait(seconds):
+    POOL_WAIT_SECONDS.observe(seconds)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- ASGI MIDDLEWARE ---
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request and files it under its route template
+    (/grades/student/{student_id}, not the raw path) so label cardinality stays fixed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _route_label(self, scope):
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        # Response cache hits are answered before routing; their paths have no parameters
+        return scope["path"] if scope["path"] in CACHED_PATHS else "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = [0, 0.0, scope["path"]]
+        token = _request_sql.set(stats)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_sql.reset(token)
+            route = self._route_label(scope)
+            REQUEST_SECONDS.observe(elapsed, (scope["method"], route, str(status[0])))
+            REQUEST_SQL_STATEMENTS.observe(stats[0], (scope["method"], route))
+            REQUEST_SQL_SECONDS.observe(stats[1], (scope["method"], route))
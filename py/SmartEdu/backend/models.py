@@ -1,9 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, Time, Date
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, Time, Date, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 # 👇 CRITICAL CHANGE: We import Base from database.py instead of creating it here
-from .database import Base
+from .database import Base, RELATIONSHIP_LAZY
 
 # --- TABLE DEFINITIONS ---
 
@@ -22,22 +22,22 @@ class User(Base):
     phone_number = Column(String, nullable=True)
     
     # Relationships
-    schedules = relationship("Schedule", back_populates="teacher")
-    availabilities = relationship("TeacherAvailability", back_populates="teacher")
-    attendance_logs = relationship("TeacherAttendance", back_populates="teacher")
+    schedules = relationship("Schedule", back_populates="teacher", lazy=RELATIONSHIP_LAZY)
+    availabilities = relationship("TeacherAvailability", back_populates="teacher", lazy=RELATIONSHIP_LAZY)
+    attendance_logs = relationship("TeacherAttendance", back_populates="teacher", lazy=RELATIONSHIP_LAZY)
 
-    leaves_requested = relationship("LeaveRequest", foreign_keys="[LeaveRequest.teacher_id]", back_populates="teacher")
-    substitute_assignments = relationship("LeaveRequest", foreign_keys="[LeaveRequest.substitute_teacher_id]", back_populates="substitute")
+    leaves_requested = relationship("LeaveRequest", foreign_keys="[LeaveRequest.teacher_id]", back_populates="teacher", lazy=RELATIONSHIP_LAZY)
+    substitute_assignments = relationship("LeaveRequest", foreign_keys="[LeaveRequest.substitute_teacher_id]", back_populates="substitute", lazy=RELATIONSHIP_LAZY)
 
 class Student(Base):
     __tablename__ = "students"
 
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String)
-    class_name = Column(String)
+    class_name = Column(String, index=True)
     
-    grades = relationship("Grade", back_populates="student")
-    attendance = relationship("StudentAttendance", back_populates="student")
+    grades = relationship("Grade", back_populates="student", lazy=RELATIONSHIP_LAZY)
+    attendance = relationship("StudentAttendance", back_populates="student", lazy=RELATIONSHIP_LAZY)
 
 # --- MODULE B: SCHEDULING ---
 
@@ -51,8 +51,19 @@ class Schedule(Base):
     end_time = Column(Time)
     subject = Column(String)
     room = Column(String)
+    class_name = Column(String, nullable=True, index=True)   # NULL for slots added without one
+
+    teacher = relationship("User", back_populates="schedules", lazy=RELATIONSHIP_LAZY)
+
+class TeacherSubject(Base):
+    """
+    Subjects a teacher is qualified to teach: what the timetable solver may
+    give them. Kept apart from `schedules`, which a generated timetable replaces.
+    """
+    __tablename__ = "teacher_subjects"
 
-    teacher = relationship("User", back_populates="schedules")
+    teacher_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    subject = Column(String, primary_key=True)
 
 class TeacherAvailability(Base):
     __tablename__ = "teacher_availability"
@@ -64,7 +75,7 @@ class TeacherAvailability(Base):
     end_time = Column(Time)
     status = Column(String)
 
-    teacher = relationship("User", back_populates="availabilities")
+    teacher = relationship("User", back_populates="availabilities", lazy=RELATIONSHIP_LAZY)
 
 # --- MODULE A: LEAVES ---
 
@@ -83,8 +94,26 @@ class LeaveRequest(Base):
     reason = Column(String)
     status = Column(String, default="PENDING")
 
-    teacher = relationship("User", foreign_keys=[teacher_id], back_populates="leaves_requested")
-    substitute = relationship("User", foreign_keys=[substitute_teacher_id], back_populates="substitute_assignments")
+    teacher = relationship("User", foreign_keys=[teacher_id], back_populates="leaves_requested", lazy=RELATIONSHIP_LAZY)
+    substitute = relationship("User", foreign_keys=[substitute_teacher_id], back_populates="substitute_assignments", lazy=RELATIONSHIP_LAZY)
+    covers = relationship("SubstituteAssignment", back_populates="leave", lazy=RELATIONSHIP_LAZY)
+
+class SubstituteAssignment(Base):
+    """
+    One covered class for one leave day.
+    Filled in by the batch planner (/leave/plan-substitutes).
+    """
+    __tablename__ = "substitute_assignments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    leave_id = Column(Integer, ForeignKey("leave_requests.id"), index=True)
+    schedule_id = Column(Integer, ForeignKey("schedules.id"))
+    substitute_teacher_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    date = Column(Date, index=True)
+
+    leave = relationship("LeaveRequest", back_populates="covers", lazy=RELATIONSHIP_LAZY)
+    schedule = relationship("Schedule", lazy=RELATIONSHIP_LAZY)
+    substitute = relationship("User", lazy=RELATIONSHIP_LAZY)
 
 # --- MODULE C & D: ATTENDANCE ---
 
@@ -96,7 +125,49 @@ class TeacherAttendance(Base):
     clock_in_time = Column(DateTime, default=datetime.now)
     clock_out_time = Column(DateTime, nullable=True)
 
-    teacher = relationship("User", back_populates="attendance_logs")
+    teacher = relationship("User", back_populates="attendance_logs", lazy=RELATIONSHIP_LAZY)
+
+    __table_args__ = (
+        # Partial index: only open shifts, so "am I clocked in?" stays a tiny lookup.
+        # Unique, so two racing clock-ins cannot both open a shift.
+        Index("ux_teacher_attendance_open_shift", "teacher_id", unique=True,
+              sqlite_where=text("clock_out_time IS NULL"), postgresql_where=text("clock_out_time IS NULL")),
+        Index("ix_teacher_attendance_teacher_clock_in", "teacher_id", "clock_in_time"),
+    )
+
+class TeacherAttendanceDaily(Base):
+    """
+    One row per teacher per day, folded in as each shift is clocked out
+    (see attendance_rollup.py). Hours reports read this instead of raw logs.
+    """
+    __tablename__ = "teacher_attendance_daily"
+
+    teacher_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    shifts = Column(Integer, default=0)
+    minutes_worked = Column(Float, default=0.0)
+    first_clock_in = Column(DateTime)
+    last_clock_out = Column(DateTime)
+    is_late = Column(Boolean, default=False)     # first clock-in after LATE_AFTER
+
+    __table_args__ = (
+        Index("ix_teacher_attendance_daily_day", "day"),
+    )
+
+class IdempotencyKey(Base):
+    """
+    Stored response for a retried clock-in/out, so a double tap or retry is
+    not applied twice. Kept for IDEMPOTENCY_TTL (see attendance_writer.py).
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)   # "<teacher_id>:<in|out>:<client key>"
+    response = Column(String)      # JSON body returned the first time
+    created_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
 
 class StudentAttendance(Base):
     __tablename__ = "student_attendance"
@@ -106,7 +177,12 @@ class StudentAttendance(Base):
     date = Column(Date)
     is_present = Column(Boolean, default=False)
 
-    student = relationship("Student", back_populates="attendance")
+    student = relationship("Student", back_populates="attendance", lazy=RELATIONSHIP_LAZY)
+
+    __table_args__ = (
+        # One mark per student per day; roll-call upserts conflict on it
+        Index("ux_student_attendance_student_date", "student_id", "date", unique=True),
+    )
 
 # --- MODULE E: GRADES ---
 
@@ -119,4 +195,47 @@ class Grade(Base):
     score = Column(Float)
     term = Column(String)
 
-    student = relationship("Student", back_populates="grades")
\ No newline at end of file
+    student = relationship("Student", back_populates="grades", lazy=RELATIONSHIP_LAZY)
+
+    __table_args__ = (
+        Index("ix_grades_student_subject", "student_id", "subject"),
+        # Covers the per-term columnar pull of grade_stats (no table lookups)
+        Index("ix_grades_term_covering", "term", "subject", "student_id", "score"),
+    )
+
+class StudentGradeSummary(Base):
+    """
+    Running per-student totals, updated on every /grades/add.
+    Lets class analytics read one row per student instead of rescanning grades.
+    """
+    __tablename__ = "student_grade_summaries"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    class_name = Column(String, index=True)
+    grade_count = Column(Integer, default=0)
+    score_total = Column(Float, default=0.0)
+    failed_count = Column(Integer, default=0)
+    failed_subjects = Column(String, default="")   # comma separated, no duplicates
+
+class StudentRiskScore(Base):
+    """
+    Stored at-risk score per student (0 = fine, 100 = highest risk), folded
+    in by the grade and roll-call writes (see risk_scores.py) so the
+    "top N at risk" lists are an index range scan.
+    """
+    __tablename__ = "student_risk_scores"
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    class_name = Column(String)
+    score = Column(Float, default=0.0)
+    grade_average = Column(Float, nullable=True)    # None until the first grade
+    failed_subjects = Column(Integer, default=0)
+    days_recorded = Column(Integer, default=0)
+    days_absent = Column(Integer, default=0)
+    reasons = Column(String, default="")            # "; " separated, worst first
+    updated_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_student_risk_class_score", "class_name", "score"),
+        Index("ix_student_risk_score", "score"),
+    )
@@ -0,0 +1,39 @@
+# backend/pagination.py
+from fastapi import HTTPException, Response
+
+DEFAULT_PAGE_SIZE = 200     # when the client sends no ?limit=
+MAX_PAGE_SIZE = 1000
+
+
+def keyset_page(query, model, response: Response, after_id=0, limit=None, fields=None, allowed=(), search=None):
+    """
+    Keyset (cursor) pagination on `model.id` with optional column projection.
+
+    - after_id: return rows with id > after_id (the previous page's X-Next-Cursor)
+    - limit:    page size, DEFAULT_PAGE_SIZE when None; follow X-Next-Cursor for more
+    - fields:   "id,full_name" -> only those columns are selected and returned
+    - search:   case-insensitive substring match on model.full_name
+    """
+    columns = list(allowed)
+    if fields:
+        columns = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in columns if f not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        if "id" not in columns:
+            columns.insert(0, "id")    # Needed for the cursor
+
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    query = query.with_entities(*[getattr(model, c) for c in columns]).filter(model.id > after_id)
+    if search:
+        query = query.filter(model.full_name.ilike(f"%{search}%"))
+    query = query.order_by(model.id).limit(limit)
+
+    rows = [dict(zip(columns, row)) for row in query.all()]
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+    return rows
@@ -0,0 +1,252 @@
+# backend/report_cards.py
+# Whole-school report cards:
+#   python -m backend.report_cards --out cards/            # one file per student
+#   python -m backend.report_cards --zip cards.zip         # or --zip - to stream to stdout
+import argparse
+import csv
+import html
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import groupby
+
+from sqlalchemy import func, select
+
+from . import models
+from .grade_summary import PASS_MARK
+
+BATCH_SIZE = 200          # students per pool task
+STREAM_ROWS = 5000        # rows fetched per round trip
+
+
+# --- QUERY ---
+
+def _grades_query(class_name=None):
+    query = (
+        select(models.Student.id, models.Student.full_name, models.Student.class_name,
+               models.Grade.subject, models.Grade.score, models.Grade.term)
+        .join(models.Grade, models.Grade.student_id == models.Student.id)
+        .order_by(models.Student.id, models.Grade.term, models.Grade.subject)
+    )
+    if class_name:
+        query = query.where(models.Student.class_name == class_name)
+    return query
+
+
+def count_students(conn, class_name=None):
+    query = select(func.count(func.distinct(models.Grade.student_id)))
+    if class_name:
+        query = query.join(models.Student, models.Student.id == models.Grade.student_id) \
+            .where(models.Student.class_name == class_name)
+    return conn.scalar(query)
+
+
+def iter_students(conn, class_name=None):
+    """
+    One ordered, server-side streamed query for every grade; yields
+    (student_id, full_name, class_name, [(subject, score, term), ...]) per student.
+    Only one student's rows are held at a time.
+    """
+    result = conn.execution_options(stream_results=True, yield_per=STREAM_ROWS).execute(_grades_query(class_name))
+    for (sid, name, cls), rows in groupby(result, key=lambda r: (r[0], r[1], r[2])):
+        yield sid, name, cls, [(r[3], r[4], r[5]) for r in rows]
+
+
+# --- RENDERING (runs in the worker processes) ---
+
+def card_path(sid, name, cls, fmt):
+    slug = lambda s: re.sub(r"[^A-Za-z0-9]+", "_", s or "").strip("_") or "unknown"
+    return f"{slug(cls)}/{sid}_{slug(name)}.{fmt}"
+
+
+def render_html(sid, name, cls, grades):
+    terms = {}
+    for subject, score, term in grades:
+        terms.setdefault(term, []).append((subject, score))
+
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>Report Card - {html.escape(name)}</title>",
+        "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+        "td,th{border:1px solid #ccc;padding:4px 10px}.fail{color:#c00}</style></head><body>",
+        f"<h1>{html.escape(name)}</h1><p>Student #{sid} &middot; Class {html.escape(cls or '')}</p>",
+    ]
+    for term, rows in terms.items():
+        average = sum(score for _, score in rows) / len(rows)
+        parts.append(f"<h2>{html.escape(term or '')}</h2><table><tr><th>Subject</th><th>Score</th><th>Status</th></tr>")
+        for subject, score in rows:
+            status = "PASS" if score >= PASS_MARK else "FAIL"
+            parts.append(f"<tr class='{status.lower()}'><td>{html.escape(subject)}</td><td>{score:g}</td><td>{status}</td></tr>")
+        parts.append(f"</table><p>Average: <b>{average:.1f}</b></p>")
+    overall = sum(score for _, score, _ in grades) / len(grades)
+    failing = sorted({subject for subject, score, _ in grades if score < PASS_MARK})
+    parts.append(f"<p>Overall average: <b>{overall:.1f}</b></p>")
+    if failing:
+        parts.append(f"<p class='fail'>Intervention needed: {html.escape(', '.join(failing))}</p>")
+    parts.append("</body></html>")
+    return "".join(parts).encode()
+
+
+def render_csv(sid, name, cls, grades):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["student_id", "full_name", "class_name", "term", "subject", "score", "status"])
+    for subject, score, term in grades:
+        writer.writerow([sid, name, cls, term, subject, score, "PASS" if score >= PASS_MARK else "FAIL"])
+    return buf.getvalue().encode()
+
+
+RENDERERS = {"html": render_html, "csv": render_csv}
+
+
+def render_batch(batch, fmt):
+    """[(sid, name, cls, grades), ...] -> [(path, bytes), ...]"""
+    render = RENDERERS[fmt]
+    return [(card_path(sid, name, cls, fmt), render(sid, name, cls, grades)) for sid, name, cls, grades in batch]
+
+
+# --- OUTPUT ---
+
+class DirectoryWriter:
+    def __init__(self, root):
+        self.root = root
+
+    def write(self, path, data):
+        full = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+class ZipWriter:
+    """Entries are written as they arrive, so the archive can go to a pipe or stdout"""
+
+    def __init__(self, target):
+        self.zf = zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, path, data):
+        self.zf.writestr(path, data)
+
+    def close(self):
+        self.zf.close()
+
+
+# --- PIPELINE ---
+
+def _batches(students, size):
+    batch = []
+    for student in students:
+        batch.append(student)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(conn, writer, fmt="html", class_name=None, workers=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Stream students from `conn`, render them in a process pool and hand the
+    files to `writer`. At most 2 batches per worker are in flight, so memory
+    stays bounded however big the school is. Returns the number of cards.
+    """
+    total = count_students(conn, class_name)
+    done = 0
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def drain(block_until):
+            nonlocal pending, done
+            finished, pending = wait(pending, return_when=block_until)
+            for future in finished:
+                files = future.result()
+                for path, data in files:
+                    writer.write(path, data)
+                done += len(files)
+                if progress:
+                    progress(done, total)
+
+        for batch in _batches(iter_students(conn, class_name), batch_size):
+            if len(pending) >= max_pending:
+                drain(FIRST_COMPLETED)
+            pending.add(pool.submit(render_batch, batch, fmt))
+        while pending:
+            drain(FIRST_COMPLETED)
+    return done
+
+
+def iter_zip_chunks(conn, fmt="html", class_name=None):
+    """
+    Render in-process and yield a zip archive chunk by chunk
+    (for a StreamingResponse; the batch job above uses the process pool).
+    """
+    chunks = []
+
+    class Sink:
+        def write(self, data):
+            chunks.append(bytes(data))
+            return len(data)
+
+        def flush(self):
+            pass
+
+    writer = ZipWriter(Sink())
+    render = RENDERERS[fmt]
+    for sid, name, cls, grades in iter_students(conn, class_name):
+        writer.write(card_path(sid, name, cls, fmt), render(sid, name, cls, grades))
+        if chunks:
+            yield b"".join(chunks)
+            chunks.clear()
+    writer.close()
+    yield b"".join(chunks)
+
+
+def _print_progress(started):
+    def progress(done, total):
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        print(f"\r{done}/{total} report cards ({rate:,.0f}/s)", end="", file=sys.stderr, flush=True)
+    return progress
+
+
+def main():
+    from .database import engine, make_engine
+
+    parser = argparse.ArgumentParser(description="Generate report cards for every student")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="directory, one file per student under <class>/")
+    target.add_argument("--zip", help="zip file, or - to stream to stdout")
+    parser.add_argument("--format", choices=list(RENDERERS), default="html")
+    parser.add_argument("--class", dest="class_name", help="only this class")
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / sqlite:///./school.db")
+    args = parser.parse_args()
+
+    if args.out:
+        writer = DirectoryWriter(args.out)
+    else:
+        writer = ZipWriter(sys.stdout.buffer if args.zip == "-" else args.zip)
+
+    db_engine = make_engine(args.database_url) if args.database_url else engine
+    started = time.perf_counter()
+    try:
+        with db_engine.connect() as conn:
+            count = generate(conn, writer, args.format, args.class_name, args.workers, args.batch_size,
+                             progress=_print_progress(started))
+    finally:
+        writer.close()
+    print(f"\n✅ {count} report cards in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
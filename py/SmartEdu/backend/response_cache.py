@@ -0,0 +1,130 @@
+# backend/response_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# GET paths whose responses are cached -> the tag the write routes invalidate
+CACHED_PATHS = {
+    "/users/teachers": "users",
+    "/students/all": "students",
+    "/students/classes": "students",
+    "/schedule/master": "schedule",
+    "/schedule/master/grid": "schedule",
+    "/grades/terms": "grades",
+}
+
+DEFAULT_TTL = 300        # seconds
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ResponseCache:
+    """
+    In-process LRU + TTL cache of serialized GET responses.
+    Entries carry a strong ETag so clients can revalidate with If-None-Match
+    and get a bodiless 304 without touching the DB or the serializer.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (expires_at, tag, etag, body, headers)
+        self._generation = {}           # tag -> bumped on every invalidation
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0, "evictions": 0}
+
+    # --- LOOKUP / STORE ---
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, tag, generation, body, headers):
+        """Store unless the tag was invalidated while the response was being built"""
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        with self._lock:
+            if self._generation.get(tag, 0) != generation:
+                return etag
+            self._entries[key] = (time.monotonic() + self.ttl, tag, etag, body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return etag
+
+    def generation(self, tag):
+        with self._lock:
+            return self._generation.get(tag, 0)
+
+    # --- INVALIDATION (called by the write routes) ---
+
+    def invalidate(self, tag):
+        with self._lock:
+            self._generation[tag] = self._generation.get(tag, 0) + 1
+            for key in [k for k, e in self._entries.items() if e[1] == tag]:
+                del self._entries[key]
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), ttl=self.ttl, max_entries=self.max_entries)
+
+    # --- HTTP MIDDLEWARE ---
+
+    async def middleware(self, request, call_next):
+        # Imported here: metrics (and through it database) import CACHED_PATHS,
+        # and the DB layer must load without the web stack (CLI, benchmarks)
+        from fastapi import Response
+
+        tag = CACHED_PATHS.get(request.url.path)
+        if request.method != "GET" or tag is None:
+            return await call_next(request)
+
+        key = (request.url.path, str(request.query_params))
+        entry = self.get(key)
+        if entry is not None:
+            _, _, etag, body, headers = entry
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                self._count("not_modified")
+                return Response(status_code=304, headers={"ETag": etag, "X-Cache": "HIT"})
+            self._count("hits")
+            return Response(content=body, media_type="application/json", headers=dict(headers, ETag=etag, **{"X-Cache": "HIT"}))
+
+        self._count("misses")
+        generation = self.generation(tag)
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {k: v for k, v in response.headers.items() if k.lower().startswith("x-")}
+        etag = self.put(key, tag, generation, body, headers)
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "X-Cache": "MISS"})
+        return Response(content=body, media_type="application/json", headers=dict(headers, ETag=etag, **{"X-Cache": "MISS"}))
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+# Shared instance used by main.py and the write routes
+response_cache = ResponseCache()
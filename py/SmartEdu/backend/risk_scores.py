@@ -0,0 +1,192 @@
+# backend/risk_scores.py
+# Stored per-student at-risk scores from grades + attendance.
+#   python -m backend.risk_scores        # (re)build every score from the summaries and raw marks
+import argparse
+import time as clock
+from datetime import datetime
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+Risk = models.StudentRiskScore
+
+# Each factor goes 0..1 and is weighted into a 0-100 score
+FAIL_WEIGHT, AVERAGE_WEIGHT, ABSENCE_WEIGHT = 40, 25, 35
+FAILS_FOR_MAX = 3            # failing this many subjects maxes the factor
+AVERAGE_OK, AVERAGE_LOW = 60, 30   # average >= OK scores 0, <= LOW scores 1
+ABSENCE_OK, ABSENCE_HIGH = 0.05, 0.25
+MIN_DAYS = 10                # fewer recorded days scale the absence factor down
+REBUILD_CHUNK = 20000
+
+
+def _clamp(x):
+    return min(1.0, max(0.0, x))
+
+
+def score_student(grade_average, failed_subjects, days_recorded, days_absent):
+    """(score, reasons) for one student's inputs; reasons are worst first"""
+    factors = []
+    if failed_subjects:
+        factors.append((FAIL_WEIGHT * _clamp(failed_subjects / FAILS_FOR_MAX),
+                        f"failing {failed_subjects} subject{'s' if failed_subjects != 1 else ''}"))
+    if grade_average is not None and grade_average < AVERAGE_OK:
+        factors.append((AVERAGE_WEIGHT * _clamp((AVERAGE_OK - grade_average) / (AVERAGE_OK - AVERAGE_LOW)),
+                        f"average {grade_average:.1f}"))
+    if days_recorded and days_absent:
+        rate = days_absent / days_recorded
+        confidence = min(1.0, days_recorded / MIN_DAYS)
+        weight = ABSENCE_WEIGHT * _clamp((rate - ABSENCE_OK) / (ABSENCE_HIGH - ABSENCE_OK)) * confidence
+        if weight > 0:
+            factors.append((weight, f"absent {rate:.0%} of {days_recorded} days"))
+    factors.sort(key=lambda f: f[0], reverse=True)
+    return round(sum(w for w, _ in factors), 1), "; ".join(reason for _, reason in factors)
+
+
+def _rescore(risk):
+    risk.score, risk.reasons = score_student(risk.grade_average, risk.failed_subjects, risk.days_recorded, risk.days_absent)
+    risk.updated_at = datetime.now()
+
+
+def _count_subjects(failed_subjects):
+    return len([s for s in (failed_subjects or "").split(",") if s])
+
+
+def _rows_for(db: Session, student_ids, class_by_student=None):
+    """Risk rows for these students, creating the missing ones (one query each way)"""
+    risks = {r.student_id: r for r in db.query(Risk).filter(Risk.student_id.in_(student_ids))}
+    missing = set(student_ids) - set(risks)
+    if missing:
+        classes = dict(class_by_student or {})
+        unknown = [sid for sid in missing if sid not in classes]
+        if unknown:
+            classes.update(db.query(models.Student.id, models.Student.class_name).filter(models.Student.id.in_(unknown)))
+        for sid in missing:
+            risk = Risk(student_id=sid, class_name=classes.get(sid), score=0.0, grade_average=None,
+                        failed_subjects=0, days_recorded=0, days_absent=0, reasons="")
+            db.add(risk)
+            risks[sid] = risk
+    return risks
+
+
+# --- INCREMENTAL (called from the grade and roll-call writes, caller commits) ---
+
+def apply_grade_summaries(db: Session, summaries):
+    """Copy freshly updated StudentGradeSummary rows into the risk rows and rescore them"""
+    if not summaries:
+        return
+    risks = _rows_for(db, {s.student_id for s in summaries}, {s.student_id: s.class_name for s in summaries})
+    for s in summaries:
+        risk = risks[s.student_id]
+        risk.grade_average = s.score_total / s.grade_count if s.grade_count else None
+        risk.failed_subjects = _count_subjects(s.failed_subjects)
+        _rescore(risk)
+
+
+def apply_attendance_marks(db: Session, previous, marks):
+    """
+    Fold one day's roll-call marks ({student_id: is_present}) into the
+    attendance counters. `previous` holds the marks the upsert overwrote,
+    so a corrected roll call moves the counts instead of double counting.
+    """
+    if not marks:
+        return
+    risks = _rows_for(db, marks.keys())
+    for sid, present in marks.items():
+        risk = risks[sid]
+        if sid in previous:
+            risk.days_absent += (not present) - (not previous[sid])
+        else:
+            risk.days_recorded += 1
+            risk.days_absent += not present
+        _rescore(risk)
+
+
+# --- REBUILD ---
+
+def rebuild(conn):
+    """
+    Recompute every score from student_grade_summaries and the raw
+    student_attendance marks (one aggregate query), replacing the table.
+    Returns the number of scored students.
+    """
+    A, G = models.StudentAttendance, models.StudentGradeSummary
+    attendance = (
+        select(A.student_id, func.count().label("days_recorded"),
+               func.sum(case((A.is_present, 0), else_=1)).label("days_absent"))
+        .group_by(A.student_id)
+        .subquery()
+    )
+    rows = conn.execute(
+        select(models.Student.id, models.Student.class_name, G.grade_count, G.score_total, G.failed_subjects,
+               attendance.c.days_recorded, attendance.c.days_absent)
+        .outerjoin(G, G.student_id == models.Student.id)
+        .outerjoin(attendance, attendance.c.student_id == models.Student.id)
+        .where((G.student_id.is_not(None)) | (attendance.c.student_id.is_not(None)))
+    )
+
+    conn.execute(Risk.__table__.delete())
+    now = datetime.now()
+    batch, count = [], 0
+    for sid, class_name, grade_count, score_total, failed, days_recorded, days_absent in rows:
+        grade_average = score_total / grade_count if grade_count else None
+        failed_subjects = _count_subjects(failed)
+        days_recorded, days_absent = days_recorded or 0, days_absent or 0
+        score, reasons = score_student(grade_average, failed_subjects, days_recorded, days_absent)
+        batch.append({
+            "student_id": sid, "class_name": class_name, "score": score, "grade_average": grade_average,
+            "failed_subjects": failed_subjects, "days_recorded": days_recorded, "days_absent": days_absent,
+            "reasons": reasons, "updated_at": now,
+        })
+        if len(batch) >= REBUILD_CHUNK:
+            conn.execute(Risk.__table__.insert(), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.execute(Risk.__table__.insert(), batch)
+        count += len(batch)
+    return count
+
+
+# --- READS ---
+
+def top_at_risk(db: Session, class_name=None, limit=10, min_score=0.0):
+    """Highest scores first, for one class or the whole school (index range scan + LIMIT)"""
+    query = db.query(Risk, models.Student.full_name).join(models.Student, models.Student.id == Risk.student_id)
+    if class_name:
+        query = query.filter(Risk.class_name == class_name)
+    rows = query.filter(Risk.score > 0, Risk.score >= min_score).order_by(Risk.score.desc()).limit(limit).all()
+    return [
+        {
+            "student_id": r.student_id,
+            "name": name,
+            "class_name": r.class_name,
+            "score": r.score,
+            "grade_average": round(r.grade_average, 1) if r.grade_average is not None else None,
+            "failed_subjects": r.failed_subjects,
+            "attendance_rate": round(1 - r.days_absent / r.days_recorded, 3) if r.days_recorded else None,
+            "days_absent": r.days_absent,
+            "reasons": r.reasons.split("; ") if r.reasons else [],
+        }
+        for r, name in rows
+    ]
+
+
+def main():
+    from .database import engine, make_engine
+
+    parser = argparse.ArgumentParser(description="Rebuild student_risk_scores from grade summaries and attendance")
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / sqlite:///./school.db")
+    args = parser.parse_args()
+
+    db_engine = make_engine(args.database_url) if args.database_url else engine
+    models.Base.metadata.create_all(bind=db_engine, tables=[Risk.__table__])
+    started = clock.perf_counter()
+    with db_engine.begin() as conn:
+        count = rebuild(conn)
+    print(f"✅ {count:,} students scored in {clock.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
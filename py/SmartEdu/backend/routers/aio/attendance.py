@@ -0,0 +1,70 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Header
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
+from ... import models, schemas
+from ...database import get_async_db, run_in_session
+from ...attendance_writer import WRITE_BEHIND, WRITE_TIMEOUT_SECONDS, ClockError, commit_clock_ops
+from .. import attendance as sync_attendance
+from ..attendance import writer
+
+# Async twin of routers/attendance.py (enabled with ASYNC_DB=1)
+router = APIRouter(tags=["Attendance"])
+
+async def _clock(action, teacher_id, key, db: AsyncSession):
+    op = {"action": action, "teacher_id": teacher_id, "at": datetime.now(), "key": key}
+
+    if WRITE_BEHIND:
+        # Awaiting the writer's Future does not hold a thread; a timeout cancels it
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(writer.submit(op)), timeout=WRITE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise sync_attendance.writer_busy_error()
+    else:
+        try:
+            result = (await db.run_sync(lambda s: commit_clock_ops(s, [op])))[0]
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail=sync_attendance.CLOCK_CONFLICT)
+
+    if isinstance(result, ClockError):
+        raise HTTPException(status_code=400, detail=str(result))
+    return result
+
+@router.post("/attendance/clock-in")
+async def clock_in(request: schemas.ClockInRequest, idempotency_key: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    return await _clock("in", request.teacher_id, request.idempotency_key or idempotency_key, db)
+
+@router.post("/attendance/clock-out")
+async def clock_out(request: schemas.ClockOutRequest, idempotency_key: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)):
+    return await _clock("out", request.teacher_id, request.idempotency_key or idempotency_key, db)
+
+@router.get("/attendance/view/{teacher_id}")
+async def view_attendance(teacher_id: int, db: AsyncSession = Depends(get_async_db)):
+    logs = await db.scalars(
+        select(models.TeacherAttendance)
+        .where(models.TeacherAttendance.teacher_id == teacher_id)
+        .order_by(models.TeacherAttendance.clock_in_time.desc())
+    )
+    return [{"id": l.id, "clock_in_time": l.clock_in_time, "clock_out_time": l.clock_out_time} for l in logs]
+
+@router.post("/attendance/roll-call")
+async def record_roll_call(req: schemas.RollCallRequest):
+    # Up to MAX_ROLL_CALL upserts plus risk-score updates
+    return await run_in_session(lambda s: sync_attendance.record_roll_call(req, db=s))
+
+@router.get("/attendance/roll-call/{class_name}")
+async def view_roll_call(class_name: str, date: str = None, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: sync_attendance.view_roll_call(class_name, date, db=s))
+
+@router.get("/attendance/hours")
+async def attendance_hours(start: str, end: str, by: str = "month", teacher_id: int = None):
+    return await run_in_session(lambda s: sync_attendance.attendance_hours(start, end, by, teacher_id, db=s))
+
+@router.post("/attendance/rollup/rebuild")
+async def rebuild_attendance_rollup(since: str = None):
+    # Re-folds the raw logs with pandas
+    return await run_in_session(lambda s: sync_attendance.rebuild_attendance_rollup(since, db=s))
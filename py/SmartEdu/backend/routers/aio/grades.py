@@ -0,0 +1,122 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models, schemas
+from ...database import get_async_db, run_in_session
+from ...bulk_import import GradeImporter, LINE_ERRORS, iter_lines, parse_header, parse_line, describe_error
+from ...grade_summary import apply_grade_summary_rows
+from ...grade_stats import grade_stats
+from ...pagination import keyset_page
+from ...response_cache import response_cache
+from .. import grades as sync_grades
+
+# Async twin of routers/grades.py (enabled with ASYNC_DB=1).
+# Small indexed reads reuse the sync bodies through run_sync(), which runs
+# them on the event-loop thread. Rebuilds, analytics and bulk inserts go
+# through run_in_session() instead: a sync session on the threadpool, so
+# they do not stall other requests while they work.
+router = APIRouter(tags=["Grades"])
+
+@router.post("/students/add")
+async def add_student(student: schemas.StudentCreate, db: AsyncSession = Depends(get_async_db)):
+    new_student = models.Student(full_name=student.full_name, class_name=student.class_name)
+    db.add(new_student)
+    await db.commit()
+    response_cache.invalidate("students")
+    return {"message": "Student added", "id": new_student.id}
+
+@router.get("/students/all")
+async def get_all_students(response: Response, class_name: str = None, q: str = None, after_id: int = 0, limit: int = None,
+                           fields: str = None, db: AsyncSession = Depends(get_async_db)):
+    def page(s):
+        query = s.query(models.Student)
+        if class_name:
+            query = query.filter(models.Student.class_name == class_name)
+        return keyset_page(query, models.Student, response, after_id, limit, fields, allowed=("id", "full_name", "class_name"), search=q)
+    return await db.run_sync(page)
+
+@router.get("/students/classes")
+async def get_classes(db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(models.Student.class_name).distinct().order_by(models.Student.class_name))).all()
+
+@router.get("/students/at-risk")
+async def get_students_at_risk(class_name: str = None, limit: int = 10, min_score: float = 0.0, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: sync_grades.get_students_at_risk(class_name, limit, min_score, db=s))
+
+@router.post("/students/at-risk/rebuild")
+async def rebuild_risk_scores():
+    return await run_in_session(lambda s: sync_grades.rebuild_risk_scores(db=s))
+
+@router.post("/grades/add")
+async def add_grade(grade: schemas.GradeCreate, db: AsyncSession = Depends(get_async_db)):
+    student = await db.get(models.Student, grade.student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    new_grade = models.Grade(student_id=grade.student_id, subject=grade.subject, score=grade.score, term=grade.term)
+    db.add(new_grade)
+    row = {"student_id": student.id, "subject": grade.subject, "score": grade.score}
+    await db.run_sync(lambda s: apply_grade_summary_rows(s, [row], {student.id: student.class_name}))
+    await db.commit()
+    grade_stats.invalidate({grade.term})
+    response_cache.invalidate("grades")
+    return {"message": "Grade added", "id": new_grade.id}
+
+@router.post("/grades/bulk")
+async def bulk_import_grades(request: Request, format: str = None):
+    fmt = format or ("ndjson" if "json" in request.headers.get("content-type", "") else "csv")
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+
+    importer = GradeImporter(None)
+    header = None
+    line_no = 0
+    async for line in iter_lines(request.stream()):
+        line_no += 1
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            try:
+                header = parse_header(line)
+            except LINE_ERRORS as e:
+                raise HTTPException(status_code=400, detail=f"Unreadable CSV header: {describe_error(e)}")
+            continue
+        try:
+            importer.add_row(line_no, parse_line(line, fmt, header))
+        except LINE_ERRORS as e:
+            importer.add_error(line_no, describe_error(e))
+        if importer.chunk_ready:
+            await run_in_session(importer.flush)
+
+    await run_in_session(importer.flush)
+    return importer.report()
+
+@router.get("/grades/student/{student_id}")
+async def get_student_report(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    grades = (await db.scalars(
+        select(models.Grade).where(models.Grade.student_id == student_id).order_by(models.Grade.subject)
+    )).all()
+    if not grades:
+        raise HTTPException(status_code=404, detail="No grades found for this student")
+    return [{"subject": g.subject, "score": g.score, "term": g.term} for g in grades]
+
+@router.get("/grades/analytics/{class_name}")
+async def get_class_analytics(class_name: str, use_summary: bool = False):
+    return await run_in_session(lambda s: sync_grades.get_class_analytics(class_name, use_summary, db=s))
+
+@router.get("/grades/terms")
+async def get_terms(db: AsyncSession = Depends(get_async_db)):
+    terms = await db.scalars(select(models.Grade.term).distinct().order_by(models.Grade.term))
+    return [t for t in terms if t]
+
+@router.get("/grades/analytics/{class_name}/distribution")
+async def get_grade_distribution(class_name: str, term: str):
+    # Ranking a whole term is CPU bound
+    return await run_in_session(lambda s: sync_grades.get_grade_distribution(class_name, term, db=s))
+
+@router.post("/grades/summary/rebuild")
+async def rebuild_grade_summaries():
+    return await run_in_session(lambda s: sync_grades.rebuild_grade_summaries(db=s))
+
+# Streams from its own sync connection, so the sync handler is reused as is
+router.get("/grades/report-cards")(sync_grades.download_report_cards)
@@ -0,0 +1,124 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models, schemas
+from ...database import get_async_db, run_in_session
+from ...substitute_index import busy_index
+from ...schedule_conflicts import audit
+from ...response_cache import response_cache
+from .. import schedule as sync_schedule
+from .. import users as sync_users
+
+# Async twin of routers/schedule.py (enabled with ASYNC_DB=1)
+router = APIRouter(tags=["Schedule"])
+
+# Check-then-insert on /schedule/add must not interleave across awaits
+_booking_lock = asyncio.Lock()
+
+@router.post("/schedule/add")
+async def add_class_slot(schedule: schemas.ScheduleCreate, db: AsyncSession = Depends(get_async_db)):
+    start, end = sync_schedule.parse_slot_times(schedule)
+    await db.run_sync(sync_users.get_teacher, schedule.teacher_id)
+    async with _booking_lock:
+        if not busy_index.loaded:
+            await run_in_session(busy_index.ensure_loaded)
+        conflicts = busy_index.find(schedule.day_of_week, start, end, schedule.teacher_id, schedule.room)
+        if conflicts:
+            raise sync_schedule.conflict_error(conflicts)
+
+        new_slot = models.Schedule(
+            teacher_id=schedule.teacher_id,
+            day_of_week=schedule.day_of_week,
+            start_time=start,
+            end_time=end,
+            subject=schedule.subject,
+            room=schedule.room,
+            class_name=schedule.class_name
+        )
+        db.add(new_slot)
+        await db.commit()
+
+        busy_index.add_schedule(new_slot)
+    response_cache.invalidate("schedule")
+    return {"message": "Class slot added", "id": new_slot.id}
+
+@router.get("/schedule/conflicts")
+async def audit_conflicts():
+    return await run_in_session(audit)
+
+@router.get("/schedule/view/{teacher_id}")
+async def view_schedule(teacher_id: int, db: AsyncSession = Depends(get_async_db)):
+    slots = await db.scalars(select(models.Schedule).where(models.Schedule.teacher_id == teacher_id))
+    return [
+        {"id": s.id, "day": s.day_of_week, "start": str(s.start_time), "end": str(s.end_time), "subject": s.subject,
+         "room": s.room, "class_name": s.class_name}
+        for s in slots
+    ]
+
+@router.get("/schedule/class/{class_name}")
+async def view_class_timetable(class_name: str, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: sync_schedule.view_class_timetable(class_name, db=s))
+
+@router.post("/availability/set")
+async def set_availability(avail: schemas.AvailabilityCreate, db: AsyncSession = Depends(get_async_db)):
+    # Same 400s as /schedule/add: a bad or inverted range must not reach the indexes
+    start, end = sync_schedule.parse_slot_times(avail)
+    await db.run_sync(sync_users.get_teacher, avail.teacher_id)
+    new_avail = models.TeacherAvailability(
+        teacher_id=avail.teacher_id,
+        day_of_week=avail.day_of_week,
+        start_time=start,
+        end_time=end,
+        status=avail.status
+    )
+    db.add(new_avail)
+    await db.commit()
+
+    busy_index.add_availability(new_avail)
+    return {"message": "Availability updated", "id": new_avail.id}
+
+@router.get("/schedule/master")
+async def get_master_schedule(db: AsyncSession = Depends(get_async_db)):
+    # Explicit join: lazy-loading s.teacher is not possible on an AsyncSession
+    rows = await db.execute(
+        select(models.Schedule, models.User.full_name)
+        .outerjoin(models.User, models.User.id == models.Schedule.teacher_id)
+    )
+    return [
+        {
+            "id": s.id,
+            "day": s.day_of_week,
+            "start": str(s.start_time),
+            "end": str(s.end_time),
+            "teacher": teacher or "Unassigned",
+            "subject": s.subject,
+            "room": s.room,
+            "class_name": s.class_name
+        }
+        for s, teacher in rows
+    ]
+
+@router.get("/schedule/master/grid")
+async def get_master_grid():
+    return await run_in_session(lambda s: sync_schedule.get_master_grid(db=s))
+
+@router.post("/schedule/generate")
+async def generate_timetable(req: schemas.TimetableRequest):
+    # Loading the problem, the search and the apply are all heavy: keep them off the event loop
+    solver = await run_in_session(lambda s: sync_schedule.build_timetable_solver(req, s))
+    result = await run_in_threadpool(solver.solve, time_limit=req.time_limit)
+    result["applied"] = await run_in_session(lambda s: sync_schedule.apply_timetable(s, result["lessons"], solver.teacher_subjects)) if req.apply else None
+    return result
+
+@router.post("/ai/recommend-substitute")
+async def recommend_substitute(req: schemas.SubstitutionRequest):
+    if not busy_index.loaded:
+        await run_in_session(busy_index.ensure_loaded)
+    if req.limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1.")
+    try:
+        return busy_index.recommend(req.day_of_week, req.start_time, req.end_time, req.subject_needed, req.limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM.")
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import models, schemas
+from ...database import get_async_db
+from ...substitute_index import busy_index
+from ...pagination import keyset_page
+from ...response_cache import response_cache
+from ... import auth
+from .. import users as sync_users
+
+# Async twin of routers/users.py (enabled with ASYNC_DB=1)
+router = APIRouter(tags=["Users"])
+
+@router.post("/users/register")
+async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.scalar(select(models.User.id).where(models.User.username == user.username))
+    if existing:
+        raise HTTPException(status_code=400, detail="Username already taken")
+
+    try:
+        password_hash = await auth.hash_pool.run(auth.hash_password, user.password)
+    except auth.Overloaded as e:
+        raise auth.overloaded_error(e)
+
+    new_user = models.User(
+        username=user.username,
+        password_hash=password_hash,
+        full_name=user.full_name,
+        role=user.role,
+        phone_number=user.phone_number
+    )
+    db.add(new_user)
+    await db.commit()
+
+    busy_index.add_teacher(new_user)
+    response_cache.invalidate("users")
+    return {"message": "User created", "id": new_user.id}
+
+@router.get("/users/teachers")
+async def get_all_teachers(response: Response, role: str = "teacher", q: str = None, after_id: int = 0, limit: int = None,
+                           fields: str = None, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: keyset_page(
+        s.query(models.User).filter(models.User.role == role), models.User, response,
+        after_id, limit, fields, allowed=("id", "full_name", "username", "phone_number", "role"), search=q
+    ))
+
+@router.get("/users/{teacher_id}/subjects")
+async def get_teacher_subjects(teacher_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: sync_users.get_teacher_subjects(teacher_id, db=s))
+
+@router.put("/users/{teacher_id}/subjects")
+async def set_teacher_subjects(teacher_id: int, update: schemas.TeacherSubjectsUpdate, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(lambda s: sync_users.set_teacher_subjects(teacher_id, update, db=s))
+
+@router.post("/users/login")
+async def login(request: schemas.LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(models.User).where(models.User.username == request.username))
+    try:
+        ok, upgraded = await auth.check_login(user.password_hash if user else None, request.password)
+    except auth.Overloaded as e:
+        raise auth.overloaded_error(e)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid Username or Password")
+
+    result = auth.login_response(user)
+    if upgraded:
+        user.password_hash = upgraded
+        await db.commit()
+    return result
+
+@router.get("/users/me")
+async def who_am_i(claims: dict = Depends(auth.current_user)):
+    return {"user_id": claims["sub"], "full_name": claims["name"], "role": claims["role"], "expires_at": claims["exp"]}
@@ -1,22 +1,166 @@
-from fastapi import APIRouter, Depends, HTTPException
+from concurrent.futures import TimeoutError as FutureTimeout
+from fastapi import APIRouter, Depends, HTTPException, Header
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, SessionLocal, dialect_insert
+from ..attendance_writer import WRITE_BEHIND, WRITE_TIMEOUT_SECONDS, ClockError, GroupCommitWriter, commit_clock_ops
+from ..attendance_rollup import backfill, hours_report
+from ..risk_scores import apply_attendance_marks
 
 router = APIRouter(tags=["Attendance"])
 
+# Only used when ATTENDANCE_WRITE_BEHIND=1
+writer = GroupCommitWriter(SessionLocal)
+
+# Still losing the open-shift / idempotency-key race after one retry
+CLOCK_CONFLICT = "Another clock-in/out for this teacher is in progress. Please try again."
+
+def writer_busy_error():
+    # Retrying with the same idempotency key is safe if the write did land after all
+    return HTTPException(status_code=503, detail="Attendance writer is busy. Please try again.",
+                         headers={"Retry-After": "1"})
+
+def _clock(action, teacher_id, key, db: Session):
+    op = {"action": action, "teacher_id": teacher_id, "at": datetime.now(), "key": key}
+
+    if WRITE_BEHIND:
+        # Batched with other requests into one commit; still waits for it to land
+        future = writer.submit(op)
+        try:
+            result = future.result(timeout=WRITE_TIMEOUT_SECONDS)
+        except FutureTimeout:
+            future.cancel()
+            raise writer_busy_error()
+    else:
+        try:
+            result = commit_clock_ops(db, [op])[0]
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=CLOCK_CONFLICT)
+
+    if isinstance(result, ClockError):
+        raise HTTPException(status_code=400, detail=str(result))
+    return result
+
 @router.post("/attendance/clock-in")
-def clock_in(request: schemas.ClockInRequest, db: Session = Depends(get_db)):
-    # ... (Copy logic from main.py) ...
-    pass
+def clock_in(request: schemas.ClockInRequest, idempotency_key: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _clock("in", request.teacher_id, request.idempotency_key or idempotency_key, db)
 
 @router.post("/attendance/clock-out")
-def clock_out(request: schemas.ClockOutRequest, db: Session = Depends(get_db)):
-    # ... (Copy logic from main.py) ...
-    pass
+def clock_out(request: schemas.ClockOutRequest, idempotency_key: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    return _clock("out", request.teacher_id, request.idempotency_key or idempotency_key, db)
 
 @router.get("/attendance/view/{teacher_id}")
 def view_attendance(teacher_id: int, db: Session = Depends(get_db)):
-    # ... (Copy logic from main.py) ...
-    pass
\ No newline at end of file
+    logs = (
+        db.query(models.TeacherAttendance)
+        .filter(models.TeacherAttendance.teacher_id == teacher_id)
+        .order_by(models.TeacherAttendance.clock_in_time.desc())
+        .all()
+    )
+    return [{"id": l.id, "clock_in_time": l.clock_in_time, "clock_out_time": l.clock_out_time} for l in logs]
+
+# --- HOURS REPORTS (from the teacher_attendance_daily rollup) ---
+
+@router.get("/attendance/hours")
+def attendance_hours(start: str, end: str, by: str = "month", teacher_id: int = None, db: Session = Depends(get_db)):
+    """Hours worked, late days and missing clock-outs per teacher, per month (by=month) or in total (by=total)"""
+    if by not in ("month", "total"):
+        raise HTTPException(status_code=400, detail="by must be 'month' or 'total'")
+    start_day, end_day = _parse_day(start), _parse_day(end)
+    if end_day < start_day:
+        raise HTTPException(status_code=400, detail="end is before start")
+    return hours_report(db, start_day, end_day, by, teacher_id)
+
+@router.post("/attendance/rollup/rebuild")
+def rebuild_attendance_rollup(since: str = None, db: Session = Depends(get_db)):
+    """Recompute the daily rollup from raw logs (all history, or from `since`)"""
+    count = backfill(db.connection(), _parse_day(since) if since else None)
+    db.commit()
+    return {"message": "Rollup rebuilt", "rows": count}
+
+# --- STUDENT ROLL CALL ---
+
+MAX_ROLL_CALL = 2000     # entries per request
+
+def _parse_day(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date. Use YYYY-MM-DD.")
+
+def upsert_student_attendance(db: Session, day, marks):
+    """
+    One INSERT ... ON CONFLICT (student_id, date) DO UPDATE for the whole class,
+    then fold the changes into the students' risk scores (caller commits)
+    """
+    # Marks being overwritten, so a corrected roll call is not counted twice
+    previous = dict(db.query(models.StudentAttendance.student_id, models.StudentAttendance.is_present).filter(
+        models.StudentAttendance.date == day,
+        models.StudentAttendance.student_id.in_(marks.keys())
+    ))
+    stmt = dialect_insert(db.get_bind())(models.StudentAttendance).values([
+        {"student_id": student_id, "date": day, "is_present": present} for student_id, present in marks.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["student_id", "date"],
+        set_={"is_present": stmt.excluded.is_present}
+    ))
+    apply_attendance_marks(db, previous, marks)
+
+@router.post("/attendance/roll-call")
+def record_roll_call(req: schemas.RollCallRequest, db: Session = Depends(get_db)):
+    """Save a whole class's present/absent marks for one day; re-submitting overwrites them"""
+    day = _parse_day(req.date)
+    if not req.entries:
+        raise HTTPException(status_code=400, detail="No entries to record")
+    if len(req.entries) > MAX_ROLL_CALL:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ROLL_CALL} entries per roll call")
+
+    marks = {e.student_id: e.is_present for e in req.entries}
+    enrolled = {
+        student_id for (student_id,) in db.query(models.Student.id).filter(
+            models.Student.class_name == req.class_name,
+            models.Student.id.in_(marks.keys())
+        )
+    }
+    unknown = sorted(set(marks) - enrolled)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not in class {req.class_name}: {', '.join(map(str, unknown))}")
+
+    upsert_student_attendance(db, day, marks)
+    db.commit()
+
+    present = sum(marks.values())
+    return {
+        "message": "Roll call saved",
+        "class_name": req.class_name,
+        "date": day.isoformat(),
+        "recorded": len(marks),
+        "present": present,
+        "absent": len(marks) - present,
+    }
+
+@router.get("/attendance/roll-call/{class_name}")
+def view_roll_call(class_name: str, date: str = None, db: Session = Depends(get_db)):
+    """Every student in the class with their mark for the day (null = not taken yet)"""
+    day = _parse_day(date) if date else datetime.now().date()
+    rows = (
+        db.query(models.Student.id, models.Student.full_name, models.StudentAttendance.is_present)
+        .outerjoin(models.StudentAttendance, and_(
+            models.StudentAttendance.student_id == models.Student.id,
+            models.StudentAttendance.date == day
+        ))
+        .filter(models.Student.class_name == class_name)
+        .order_by(models.Student.full_name, models.Student.id)
+        .all()
+    )
+    return {
+        "class_name": class_name,
+        "date": day.isoformat(),
+        "students": [{"student_id": r.id, "full_name": r.full_name, "is_present": r.is_present} for r in rows],
+    }
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from ..database import engine
+from ..export import (TABLES, FORMATS, ROW_GROUP_ROWS, MAX_ROW_GROUP_ROWS, ExportUnavailable,
+                      arrow_schema, filename, iter_file_chunks)
+
+# Streams from its own sync connection (like /grades/report-cards), so there
+# is no aio twin: the same router is mounted with ASYNC_DB on or off.
+router = APIRouter(tags=["Export"])
+
+@router.get("/export/{table}")
+def export_table(table: str, format: str = "parquet", after_id: int = 0, rows: int = ROW_GROUP_ROWS):
+    """
+    Whole table as Parquet or Arrow IPC (Feather v2), one row group per
+    `rows` rows, streamed while the cursor is read. `after_id` returns only
+    the rows added since a previous export.
+    """
+    if table not in TABLES:
+        raise HTTPException(status_code=404, detail=f"table must be one of: {', '.join(TABLES)}")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+    if not 1 <= rows <= MAX_ROW_GROUP_ROWS:
+        raise HTTPException(status_code=400, detail=f"rows must be between 1 and {MAX_ROW_GROUP_ROWS}")
+    try:
+        arrow_schema(TABLES[table])
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    def stream():
+        # Own connection: it has to outlive the handler while the body streams
+        with engine.connect() as conn:
+            yield from iter_file_chunks(conn, table, format, after_id, rows)
+
+    return StreamingResponse(stream(), media_type=FORMATS[format][0],
+                             headers={"Content-Disposition": f'attachment; filename="{filename(table, format, after_id)}"'})
@@ -1,31 +1,229 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, case
 from sqlalchemy.orm import Session
 from .. import models, schemas
-from ..database import get_db
+from ..database import get_db, engine
+from ..bulk_import import GradeImporter, LINE_ERRORS, iter_lines, parse_header, parse_line, describe_error
+from ..grade_summary import PASS_MARK, split_subjects, apply_grade_summary_rows
+from ..grade_stats import grade_stats
+from ..risk_scores import top_at_risk, rebuild as rebuild_risk
+from ..pagination import keyset_page
+from ..response_cache import response_cache
+from ..report_cards import RENDERERS, iter_zip_chunks
 
 router = APIRouter(tags=["Grades"])
 
 @router.post("/students/add")
 def add_student(student: schemas.StudentCreate, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+    new_student = models.Student(full_name=student.full_name, class_name=student.class_name)
+    db.add(new_student)
+    db.commit()
+    db.refresh(new_student)
+    response_cache.invalidate("students")
+    return {"message": "Student added", "id": new_student.id}
 
 @router.get("/students/all")
-def get_all_students(db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+def get_all_students(response: Response, class_name: str = None, q: str = None, after_id: int = 0, limit: int = None,
+                     fields: str = None, db: Session = Depends(get_db)):
+    """Optional ?class_name= filter, ?q= name search, ?after_id=&limit= keyset paging (one page by default) and ?fields=id,full_name projection"""
+    query = db.query(models.Student)
+    if class_name:
+        query = query.filter(models.Student.class_name == class_name)
+    return keyset_page(query, models.Student, response, after_id, limit, fields, allowed=("id", "full_name", "class_name"), search=q)
+
+@router.get("/students/classes")
+def get_classes(db: Session = Depends(get_db)):
+    """Distinct class names, sorted"""
+    return [c for (c,) in db.query(models.Student.class_name).distinct().order_by(models.Student.class_name)]
+
+MAX_AT_RISK = 500
+
+@router.get("/students/at-risk")
+def get_students_at_risk(class_name: str = None, limit: int = 10, min_score: float = 0.0, db: Session = Depends(get_db)):
+    """Highest stored risk scores (failing subjects, low average, absences), for one class or the whole school"""
+    if not 1 <= limit <= MAX_AT_RISK:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_AT_RISK}")
+    return top_at_risk(db, class_name, limit, min_score)
+
+@router.post("/students/at-risk/rebuild")
+def rebuild_risk_scores(db: Session = Depends(get_db)):
+    """Recompute every risk score from the grade summaries and attendance marks"""
+    count = rebuild_risk(db.connection())
+    db.commit()
+    return {"message": "Risk scores rebuilt", "students": count}
 
 @router.post("/grades/add")
 def add_grade(grade: schemas.GradeCreate, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+    student = db.get(models.Student, grade.student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    new_grade = models.Grade(student_id=grade.student_id, subject=grade.subject, score=grade.score, term=grade.term)
+    db.add(new_grade)
+    apply_grade_summary_rows(db, [{"student_id": student.id, "subject": grade.subject, "score": grade.score}], {student.id: student.class_name})
+    db.commit()
+    db.refresh(new_grade)
+    grade_stats.invalidate({grade.term})
+    response_cache.invalidate("grades")
+    return {"message": "Grade added", "id": new_grade.id}
+
+@router.post("/grades/bulk")
+async def bulk_import_grades(request: Request, format: str = None, db: Session = Depends(get_db)):
+    """
+    Stream a CSV (header: student_id,subject,score,term) or NDJSON body.
+    Rows are validated against GradeCreate and inserted in chunked transactions;
+    bad rows are reported by line number and skipped.
+    """
+    fmt = format or ("ndjson" if "json" in request.headers.get("content-type", "") else "csv")
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+
+    importer = GradeImporter(db)
+    header = None
+    line_no = 0
+    async for line in iter_lines(request.stream()):
+        line_no += 1
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            try:
+                header = parse_header(line)
+            except LINE_ERRORS as e:
+                raise HTTPException(status_code=400, detail=f"Unreadable CSV header: {describe_error(e)}")
+            continue
+        try:
+            importer.add_row(line_no, parse_line(line, fmt, header))
+        except LINE_ERRORS as e:
+            importer.add_error(line_no, describe_error(e))
+        if importer.chunk_ready:
+            # DB work stays off the event loop
+            await run_in_threadpool(importer.flush)
+
+    await run_in_threadpool(importer.flush)
+    return importer.report()
 
 @router.get("/grades/student/{student_id}")
 def get_student_report(student_id: int, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+    grades = db.query(models.Grade).filter(models.Grade.student_id == student_id).order_by(models.Grade.subject).all()
+    if not grades:
+        raise HTTPException(status_code=404, detail="No grades found for this student")
+    return [{"subject": g.subject, "score": g.score, "term": g.term} for g in grades]
 
 @router.get("/grades/analytics/{class_name}")
-def get_class_analytics(class_name: str, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
\ No newline at end of file
+def get_class_analytics(class_name: str, use_summary: bool = False, db: Session = Depends(get_db)):
+    """
+    Per-student average / failed_count / failed_subjects for one class, best first.
+    use_summary=true reads the incrementally maintained summary table instead of grades.
+    """
+    if use_summary:
+        return _analytics_from_summary(db, class_name)
+
+    failed = models.Grade.score < PASS_MARK
+    rows = (
+        db.query(
+            models.Student.id,
+            models.Student.full_name,
+            func.avg(models.Grade.score).label("average"),
+            func.sum(case((failed, 1), else_=0)).label("failed_count"),
+            func.aggregate_strings(case((failed, models.Grade.subject)), ",").label("failed_subjects"),
+        )
+        .join(models.Grade, models.Grade.student_id == models.Student.id)
+        .filter(models.Student.class_name == class_name)
+        .group_by(models.Student.id, models.Student.full_name)
+        .order_by(func.avg(models.Grade.score).desc())
+        .all()
+    )
+    return [
+        {
+            "student_id": r.id,
+            "name": r.full_name,
+            "average": round(r.average, 1),
+            "failed_count": r.failed_count,
+            "failed_subjects": split_subjects(r.failed_subjects),
+        }
+        for r in rows
+    ]
+
+@router.get("/grades/terms")
+def get_terms(db: Session = Depends(get_db)):
+    """Distinct grade terms, sorted"""
+    return [t for (t,) in db.query(models.Grade.term).distinct().order_by(models.Grade.term) if t]
+
+@router.get("/grades/analytics/{class_name}/distribution")
+def get_grade_distribution(class_name: str, term: str, db: Session = Depends(get_db)):
+    """
+    Per-subject histogram, quartiles / percentiles and pass rate for one class
+    and term (next to the cohort's), plus every student's rank and percentile
+    per subject and overall, within the class and within the cohort (form).
+    """
+    report = grade_stats.report(db, class_name, term)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"No {term} grades found for {class_name}")
+    return report
+
+@router.post("/grades/summary/rebuild")
+def rebuild_grade_summaries(db: Session = Depends(get_db)):
+    """One-off backfill of student_grade_summaries from existing grades"""
+    db.query(models.StudentGradeSummary).delete(synchronize_session=False)
+    failed = models.Grade.score < PASS_MARK
+    rows = (
+        db.query(
+            models.Student.id,
+            models.Student.class_name,
+            func.count(models.Grade.id),
+            func.sum(models.Grade.score),
+            func.sum(case((failed, 1), else_=0)),
+            func.aggregate_strings(case((failed, models.Grade.subject)), ","),
+        )
+        .join(models.Grade, models.Grade.student_id == models.Student.id)
+        .group_by(models.Student.id, models.Student.class_name)
+        .all()
+    )
+    db.add_all([
+        models.StudentGradeSummary(
+            student_id=sid, class_name=class_name, grade_count=count, score_total=total,
+            failed_count=failed_count, failed_subjects=",".join(split_subjects(subjects))
+        )
+        for sid, class_name, count, total, failed_count, subjects in rows
+    ])
+    db.commit()
+    return {"message": "Summaries rebuilt", "students": len(rows)}
+
+# --- SUMMARY HELPERS ---
+
+def _analytics_from_summary(db: Session, class_name: str):
+    rows = (
+        db.query(models.StudentGradeSummary, models.Student.full_name)
+        .join(models.Student, models.Student.id == models.StudentGradeSummary.student_id)
+        .filter(models.StudentGradeSummary.class_name == class_name, models.StudentGradeSummary.grade_count > 0)
+        .all()
+    )
+    results = [
+        {
+            "student_id": summary.student_id,
+            "name": name,
+            "average": round(summary.score_total / summary.grade_count, 1),
+            "failed_count": summary.failed_count,
+            "failed_subjects": split_subjects(summary.failed_subjects),
+        }
+        for summary, name in rows
+    ]
+    results.sort(key=lambda r: r["average"], reverse=True)
+    return results
+
+@router.get("/grades/report-cards")
+def download_report_cards(class_name: str = None, format: str = "html"):
+    """Zip of report cards (one file per student), streamed while the grades query is read"""
+    if format not in RENDERERS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(RENDERERS)}")
+
+    def stream():
+        # Own connection: it has to outlive the handler while the body streams
+        with engine.connect() as conn:
+            yield from iter_zip_chunks(conn, format, class_name)
+
+    filename = f"report-cards-{class_name or 'all'}.zip".replace(" ", "_")
+    return StreamingResponse(stream(), media_type="application/zip",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
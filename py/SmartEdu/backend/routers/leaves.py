@@ -0,0 +1,99 @@
+from collections import Counter
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from datetime import date
+from .. import models, schemas
+from ..database import get_db
+from ..substitute_index import busy_index
+from ..substitute_planner import plan_substitutes
+
+router = APIRouter(tags=["Leaves"])
+
+@router.post("/leave/plan-substitutes")
+def plan_day_substitutes(req: schemas.SubstitutePlanRequest, db: Session = Depends(get_db)):
+    """Cover every class of every APPROVED leave on `date` in one go"""
+    try:
+        leave_date = date.fromisoformat(req.date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date. Use YYYY-MM-DD.")
+    day = leave_date.strftime("%A")
+
+    leaves = db.query(models.LeaveRequest).filter(
+        models.LeaveRequest.date == leave_date,
+        models.LeaveRequest.status == "APPROVED"
+    ).all()
+    if not leaves:
+        return {"date": req.date, "assigned": [], "unfilled": []}
+
+    leave_by_teacher = {l.teacher_id: l for l in leaves}
+    slots = db.query(models.Schedule).filter(
+        models.Schedule.day_of_week == day,
+        models.Schedule.teacher_id.in_(leave_by_teacher.keys())
+    ).all()
+
+    # Everyone who is not absent today is a candidate
+    busy_index.ensure_loaded(db)
+    candidates = {
+        teacher_id: {
+            "subjects": busy_index.subjects.get(teacher_id, set()),
+            "load_minutes": busy_index.load_minutes.get((day, teacher_id), 0),
+        }
+        for teacher_id in busy_index.teachers
+        if teacher_id not in leave_by_teacher
+    }
+
+    assignment, unfilled = plan_substitutes(
+        [{"id": s.id, "subject": s.subject, "start": s.start_time, "end": s.end_time} for s in slots],
+        candidates,
+        lambda teacher_id, start, end: busy_index.is_free(day, teacher_id, start, end)
+    )
+
+    # --- WRITE BACK (single transaction) ---
+    leave_ids = [l.id for l in leaves]
+    db.query(models.SubstituteAssignment).filter(
+        models.SubstituteAssignment.leave_id.in_(leave_ids)
+    ).delete(synchronize_session=False)
+
+    covers_by_leave = {l.id: Counter() for l in leaves}
+    assigned = []
+    for s in slots:
+        leave = leave_by_teacher[s.teacher_id]
+        sub_id = assignment.get(s.id)
+        db.add(models.SubstituteAssignment(leave_id=leave.id, schedule_id=s.id, substitute_teacher_id=sub_id, date=leave_date))
+        if sub_id is not None:
+            covers_by_leave[leave.id][sub_id] += 1
+            assigned.append({
+                "schedule_id": s.id,
+                "absent_teacher_id": s.teacher_id,
+                "substitute_teacher_id": sub_id,
+                "substitute_name": busy_index.teachers[sub_id]["name"],
+                "subject": s.subject,
+                "start": str(s.start_time),
+                "end": str(s.end_time),
+                "room": s.room,
+            })
+
+    # The leave's own substitute is whoever covers most of that teacher's classes
+    for leave in leaves:
+        top = covers_by_leave[leave.id].most_common(1)
+        leave.substitute_teacher_id = top[0][0] if top else None
+
+    db.commit()
+    return {"date": req.date, "assigned": assigned, "unfilled": unfilled}
+
+@router.delete("/leave/substitutes/{leave_date}")
+def clear_day_substitutes(leave_date: str, db: Session = Depends(get_db)):
+    """Drop the cover planned for one day (e.g. before /schedule/generate?apply replaces the timetable)"""
+    try:
+        day = date.fromisoformat(leave_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date. Use YYYY-MM-DD.")
+    cleared = db.query(models.SubstituteAssignment).filter(
+        models.SubstituteAssignment.date == day
+    ).delete(synchronize_session=False)
+    db.query(models.LeaveRequest).filter(
+        models.LeaveRequest.date == day,
+        models.LeaveRequest.substitute_teacher_id.is_not(None)
+    ).update({models.LeaveRequest.substitute_teacher_id: None}, synchronize_session=False)
+    db.commit()
+    return {"date": leave_date, "cleared": cleared}
@@ -1,32 +1,213 @@
+import threading
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+from datetime import datetime, time
 from .. import models, schemas
 from ..database import get_db
+from ..substitute_index import busy_index
+from ..schedule_conflicts import audit
+from ..response_cache import response_cache
+from ..timetable import build_grid
+from ..timetable_solver import TimetableSolver, ScheduleInUse, problem_from_db, replace_schedule
+from .users import get_teacher
 
 router = APIRouter(tags=["Schedule"])
 
+MAX_SOLVE_SECONDS = 120
+
+# Check-then-insert on /schedule/add must not interleave
+_booking_lock = threading.Lock()
+
+# Last built master grid, keyed by schedule version
+_grid_cache = {"version": None, "grid": None}
+_grid_lock = threading.Lock()
+
+def schedule_version(db: Session):
+    """Cheap fingerprint of the schedules table (rows are only ever inserted; /schedule/generate resets the cache itself)"""
+    count, max_id = db.query(func.count(models.Schedule.id), func.max(models.Schedule.id)).one()
+    return f"{count}-{max_id or 0}"
+
+def parse_slot_times(slot):
+    try:
+        start, end = time.fromisoformat(slot.start_time), time.fromisoformat(slot.end_time)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM.")
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time.")
+    return start, end
+
+def conflict_error(conflicts):
+    return HTTPException(status_code=409, detail={
+        "message": "Teacher or room is already booked at this time.",
+        "conflicts": conflicts,
+    })
+
 @router.post("/schedule/add")
 def add_class_slot(schedule: schemas.ScheduleCreate, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+    start, end = parse_slot_times(schedule)
+    # 404 here rather than a FOREIGN KEY failure (500) at commit
+    get_teacher(db, schedule.teacher_id)
+    with _booking_lock:
+        # Per-teacher / per-room interval trees: no table scan per insert
+        busy_index.ensure_loaded(db)
+        conflicts = busy_index.find(schedule.day_of_week, start, end, schedule.teacher_id, schedule.room)
+        if conflicts:
+            raise conflict_error(conflicts)
+
+        new_slot = models.Schedule(
+            teacher_id=schedule.teacher_id,
+            day_of_week=schedule.day_of_week,
+            start_time=start,
+            end_time=end,
+            subject=schedule.subject,
+            room=schedule.room,
+            class_name=schedule.class_name
+        )
+        db.add(new_slot)
+        db.commit()
+        db.refresh(new_slot)
+
+        # Keep the in-memory index in sync without a rebuild
+        busy_index.add_schedule(new_slot)
+    response_cache.invalidate("schedule")
+    return {"message": "Class slot added", "id": new_slot.id}
+
+@router.get("/schedule/conflicts")
+def audit_conflicts(db: Session = Depends(get_db)):
+    """Every teacher, room and BUSY-availability clash in the current timetable"""
+    return audit(db)
 
 @router.get("/schedule/view/{teacher_id}")
 def view_schedule(teacher_id: int, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+    slots = db.query(models.Schedule).filter(models.Schedule.teacher_id == teacher_id).all()
+    return [
+        {"id": s.id, "day": s.day_of_week, "start": str(s.start_time), "end": str(s.end_time), "subject": s.subject,
+         "room": s.room, "class_name": s.class_name}
+        for s in slots
+    ]
+
+@router.get("/schedule/class/{class_name}")
+def view_class_timetable(class_name: str, db: Session = Depends(get_db)):
+    """One class's week, bucketed by (period, day) like the master grid"""
+    rows = (
+        db.query(models.Schedule.day_of_week, models.Schedule.start_time, models.User.full_name,
+                 models.Schedule.subject, models.Schedule.room)
+        .outerjoin(models.User, models.User.id == models.Schedule.teacher_id)
+        .filter(models.Schedule.class_name == class_name)
+        .order_by(models.Schedule.start_time, models.Schedule.id)
+        .all()
+    )
+    return dict(build_grid(rows), class_name=class_name)
 
 @router.post("/availability/set")
 def set_availability(avail: schemas.AvailabilityCreate, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+    # Same 400s as /schedule/add: a bad or inverted range must not reach the indexes
+    start, end = parse_slot_times(avail)
+    get_teacher(db, avail.teacher_id)
+    new_avail = models.TeacherAvailability(
+        teacher_id=avail.teacher_id,
+        day_of_week=avail.day_of_week,
+        start_time=start,
+        end_time=end,
+        status=avail.status
+    )
+    db.add(new_avail)
+    db.commit()
+    db.refresh(new_avail)
+
+    busy_index.add_availability(new_avail)
+    return {"message": "Availability updated", "id": new_avail.id}
 
 @router.get("/schedule/master")
 def get_master_schedule(db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+    # Teacher names come in the same SELECT (LEFT OUTER JOIN), not one lazy load per slot
+    slots = db.query(models.Schedule).options(
+        joinedload(models.Schedule.teacher).load_only(models.User.full_name)
+    ).all()
+    return [
+        {
+            "id": s.id,
+            "day": s.day_of_week,
+            "start": str(s.start_time),
+            "end": str(s.end_time),
+            "teacher": s.teacher.full_name if s.teacher else "Unassigned",
+            "subject": s.subject,
+            "room": s.room,
+            "class_name": s.class_name
+        }
+        for s in slots
+    ]
+
+@router.get("/schedule/master/grid")
+def get_master_grid(db: Session = Depends(get_db)):
+    """Master timetable pre-bucketed by (period, day), rebuilt only when the schedule changes"""
+    version = schedule_version(db)
+    with _grid_lock:
+        if _grid_cache["version"] == version:
+            return _grid_cache["grid"]
+
+    rows = (
+        db.query(models.Schedule.day_of_week, models.Schedule.start_time, models.User.full_name,
+                 models.Schedule.subject, models.Schedule.room)
+        .outerjoin(models.User, models.User.id == models.Schedule.teacher_id)
+        .order_by(models.Schedule.start_time, models.Schedule.id)
+        .all()
+    )
+    grid = dict(build_grid(rows), version=version)
+    with _grid_lock:
+        _grid_cache.update(version=version, grid=grid)
+    return grid
+
+def build_timetable_solver(req: schemas.TimetableRequest, db: Session):
+    if not 0 < req.time_limit <= MAX_SOLVE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"time_limit must be between 0 and {MAX_SOLVE_SECONDS} seconds.")
+    problem = problem_from_db(db)
+    classes = req.classes or problem["classes"]
+    teacher_subjects = req.teacher_subjects or problem["teacher_subjects"]
+    if not classes:
+        raise HTTPException(status_code=400, detail="No classes to timetable. Pass `classes` or add graded students first.")
+    if not teacher_subjects:
+        raise HTTPException(status_code=400, detail="No teacher subjects known. Pass `teacher_subjects`.")
+    known = {tid for (tid,) in db.query(models.User.id).filter(models.User.id.in_(teacher_subjects))}
+    unknown = sorted(set(teacher_subjects) - known)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown teacher ids: {unknown[:20]}")
+    return TimetableSolver(
+        problem["slots"], classes, teacher_subjects, problem["unavailable"],
+        subject_rooms=req.subject_rooms, home_rooms=req.home_rooms,
+        max_load=req.max_periods_per_teacher, seed=req.seed,
+    )
+
+def apply_timetable(db: Session, lessons, teacher_subjects=None):
+    try:
+        count = replace_schedule(db, lessons, teacher_subjects)
+    except ScheduleInUse as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    db.commit()
+
+    # Rows were deleted as well as inserted: rebuild the in-memory index from scratch
+    busy_index.load(db)
+    with _grid_lock:
+        _grid_cache.update(version=None, grid=None)
+    response_cache.invalidate("schedule")
+    return count
+
+@router.post("/schedule/generate")
+def generate_timetable(req: schemas.TimetableRequest, db: Session = Depends(get_db)):
+    """Clash-free timetable from the constraint solver; `apply` replaces the current one"""
+    solver = build_timetable_solver(req, db)
+    result = solver.solve(time_limit=req.time_limit)
+    result["applied"] = apply_timetable(db, result["lessons"], solver.teacher_subjects) if req.apply else None
+    return result
 
 @router.post("/ai/recommend-substitute")
 def recommend_substitute(req: schemas.SubstitutionRequest, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
\ No newline at end of file
+    # Built once from `schedules` + BUSY availability, then answered from memory
+    busy_index.ensure_loaded(db)
+    if req.limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1.")
+    try:
+        return busy_index.recommend(req.day_of_week, req.start_time, req.end_time, req.subject_needed, req.limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid time format. Use HH:MM.")
@@ -1,24 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 # Adjust these imports to match your folder structure
 from .. import models, schemas
 from ..database import get_db
+from ..substitute_index import busy_index
+from ..pagination import keyset_page
+from ..timetable_solver import save_teacher_subjects
+from ..response_cache import response_cache
+from .. import auth
 
 router = APIRouter(tags=["Users"])
 
 # MOVED FROM MAIN.PY
 @router.post("/users/register")
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    # ... (Copy the logic body from main.py exactly as is) ...
-    # But ensure you refer to models.User, not just User if you imported it differently
-    pass 
+async def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    """Like login: the hash is awaited on the hash pool, DB work stays off the event loop"""
+    existing = await run_in_threadpool(lambda: db.query(models.User.id).filter(models.User.username == user.username).first())
+    if existing:
+        raise HTTPException(status_code=400, detail="Username already taken")
+
+    try:
+        password_hash = await auth.hash_pool.run(auth.hash_password, user.password)
+    except auth.Overloaded as e:
+        raise auth.overloaded_error(e)
+
+    new_user = models.User(
+        username=user.username,
+        password_hash=password_hash,
+        full_name=user.full_name,
+        role=user.role,
+        phone_number=user.phone_number
+    )
+    db.add(new_user)
+
+    def save():
+        db.commit()
+        db.refresh(new_user)
+    await run_in_threadpool(save)
+
+    # New teachers are immediately available as substitutes
+    busy_index.add_teacher(new_user)
+    response_cache.invalidate("users")
+    return {"message": "User created", "id": new_user.id}
 
 @router.get("/users/teachers")
-def get_all_teachers(db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
+def get_all_teachers(response: Response, role: str = "teacher", q: str = None, after_id: int = 0, limit: int = None,
+                     fields: str = None, db: Session = Depends(get_db)):
+    """Same paging / search / projection options as /students/all; ?role=admin lists admins"""
+    query = db.query(models.User).filter(models.User.role == role)
+    return keyset_page(query, models.User, response, after_id, limit, fields,
+                       allowed=("id", "full_name", "username", "phone_number", "role"), search=q)
+
+def get_teacher(db: Session, teacher_id: int):
+    teacher = db.get(models.User, teacher_id)
+    if teacher is None or teacher.role != "teacher":
+        raise HTTPException(status_code=404, detail="Teacher not found")
+    return teacher
+
+@router.get("/users/{teacher_id}/subjects")
+def get_teacher_subjects(teacher_id: int, db: Session = Depends(get_db)):
+    """What the timetable generator may give this teacher"""
+    get_teacher(db, teacher_id)
+    rows = db.query(models.TeacherSubject.subject).filter(models.TeacherSubject.teacher_id == teacher_id)
+    return sorted(subject for (subject,) in rows)
+
+@router.put("/users/{teacher_id}/subjects")
+def set_teacher_subjects(teacher_id: int, update: schemas.TeacherSubjectsUpdate, db: Session = Depends(get_db)):
+    get_teacher(db, teacher_id)
+    save_teacher_subjects(db, {teacher_id: update.subjects})
+    db.commit()
+    return {"message": "Subjects saved", "subjects": sorted(set(update.subjects))}
 
 @router.post("/users/login")
-def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
-    # ... (Copy logic) ...
-    pass
\ No newline at end of file
+async def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
+    """Password check runs on the bounded hash pool; DB work stays off the event loop"""
+    user = await run_in_threadpool(lambda: db.query(models.User).filter(models.User.username == request.username).first())
+    try:
+        ok, upgraded = await auth.check_login(user.password_hash if user else None, request.password)
+    except auth.Overloaded as e:
+        raise auth.overloaded_error(e)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid Username or Password")
+
+    result = auth.login_response(user)
+    if upgraded:
+        # Plaintext / outdated hash: replace it now that we know the password
+        user.password_hash = upgraded
+        await run_in_threadpool(db.commit)
+    return result
+
+@router.get("/users/me")
+def who_am_i(claims: dict = Depends(auth.current_user)):
+    """Identity from the bearer token alone, no DB lookup"""
+    return {"user_id": claims["sub"], "full_name": claims["name"], "role": claims["role"], "expires_at": claims["exp"]}
@@ -0,0 +1,72 @@
+# backend/schedule_conflicts.py
+# Whole-timetable clash audit. The per-insert check (/schedule/add) is
+# BusyIndex.find() in substitute_index.py, over the same index the
+# substitute recommendations use.
+import heapq
+
+from sqlalchemy.orm import Session
+
+from .substitute_index import SCHEDULE_COLUMNS, busy_rows, day_key, hhmm, room_key, to_minutes
+
+
+# --- WHOLE-TIMETABLE AUDIT ---
+
+def audit(db: Session):
+    """
+    Every teacher, room and availability clash in one sort-and-sweep pass.
+    Each booking becomes (resource, start, end); after a single sort, a heap
+    of intervals still open on the current resource yields every overlapping
+    pair in O(n log n + conflicts).
+    """
+    entries = []
+    schedules = 0
+    for s in db.query(*SCHEDULE_COLUMNS):
+        schedules += 1
+        start, end = to_minutes(s.start_time), to_minutes(s.end_time)
+        if end <= start:
+            continue
+        item = {"kind": "class", "id": s.id, "teacher_id": s.teacher_id, "subject": s.subject, "room": s.room}
+        if s.teacher_id is not None:
+            entries.append(((day_key(s.day_of_week), "teacher", str(s.teacher_id)), start, end, item))
+        if room_key(s.room):
+            entries.append(((day_key(s.day_of_week), "room", room_key(s.room)), start, end, item))
+
+    busy_blocks = 0
+    for a in busy_rows(db):
+        busy_blocks += 1
+        start, end = to_minutes(a.start_time), to_minutes(a.end_time)
+        if end <= start:
+            continue
+        item = {"kind": "busy", "id": a.id, "teacher_id": a.teacher_id, "subject": None, "room": None}
+        entries.append(((day_key(a.day_of_week), "teacher", str(a.teacher_id)), start, end, item))
+
+    entries.sort(key=lambda e: (e[0], e[1], e[2]))
+    conflicts = []
+    counts = {"teacher": 0, "room": 0, "availability": 0}
+    current, active = None, []        # active: heap of (end, seq, start, item) on `current`
+    for seq, (key, start, end, item) in enumerate(entries):
+        if key != current:
+            current, active = key, []
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        day, resource, _ = key
+        for other_end, _, other_start, other in active:
+            if item["kind"] == "busy" and other["kind"] == "busy":
+                continue          # two BUSY blocks overlapping is not a clash
+            if resource == "room":
+                kind = "room"
+            else:
+                kind = "availability" if "busy" in (item["kind"], other["kind"]) else "teacher"
+            counts[kind] += 1
+            conflicts.append({
+                "type": kind,
+                "day": day,
+                "teacher_id": item["teacher_id"] if resource == "teacher" else None,
+                "room": item["room"] if resource == "room" else None,
+                "start": hhmm(max(start, other_start)),
+                "end": hhmm(min(end, other_end)),
+                "bookings": [other, item],
+            })
+        heapq.heappush(active, (end, seq, start, item))
+
+    return {"conflicts": conflicts, "counts": counts, "checked": {"schedules": schedules, "busy_blocks": busy_blocks}}
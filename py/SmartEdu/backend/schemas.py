@@ -1,13 +1,24 @@
 from pydantic import BaseModel
-from typing import Optional # You might need this later, good to have
+from typing import Dict, List, Optional # You might need this later, good to have
 
 # --- DATA SCHEMAS (Pydantic Models) ---
 
 class ClockInRequest(BaseModel):
     teacher_id: int
+    idempotency_key: Optional[str] = None   # Or send an Idempotency-Key header
 
 class ClockOutRequest(BaseModel):
     teacher_id: int
+    idempotency_key: Optional[str] = None
+
+class RollCallEntry(BaseModel):
+    student_id: int
+    is_present: bool
+
+class RollCallRequest(BaseModel):
+    class_name: str
+    date: str          # "YYYY-MM-DD"
+    entries: List[RollCallEntry]
 
 class UserCreate(BaseModel):
     username: str
@@ -32,6 +43,10 @@ class SubstitutionRequest(BaseModel):
     start_time: str    # "09:00"
     end_time: str      # "10:00"
     subject_needed: str # "Mathematics"
+    limit: int = 10    # best N free teachers
+
+class SubstitutePlanRequest(BaseModel):
+    date: str          # "YYYY-MM-DD" - plans every APPROVED leave on this day
 
 # --- SCHEMAS FOR MODULE B (SCHEDULING) ---
 class ScheduleCreate(BaseModel):
@@ -41,6 +56,7 @@ class ScheduleCreate(BaseModel):
     end_time: str     # e.g., "10:00"
     subject: str
     room: str
+    class_name: Optional[str] = None  # e.g., "1 A"
 
 class AvailabilityCreate(BaseModel):
     teacher_id: int
@@ -49,6 +65,22 @@ class AvailabilityCreate(BaseModel):
     end_time: str
     status: str       # "BUSY" or "PREFERRED"
 
+class TimetableRequest(BaseModel):
+    # All optional: by default classes take the subjects they are graded in and
+    # teachers their saved subjects (PUT /users/{id}/subjects), or failing that
+    # what they teach in the current timetable. `apply` saves teacher_subjects.
+    classes: Optional[Dict[str, Dict[str, int]]] = None      # class -> {subject: lessons per week}
+    teacher_subjects: Optional[Dict[int, List[str]]] = None
+    subject_rooms: Optional[Dict[str, List[str]]] = None     # e.g. {"Science": ["Lab 1", "Lab 2"]}
+    home_rooms: Optional[Dict[str, str]] = None              # class -> room, default "Room <class>"
+    max_periods_per_teacher: Optional[int] = None
+    time_limit: float = 30.0                                 # seconds
+    seed: int = 0
+    apply: bool = False                                      # replace the schedules table with the result
+
+class TeacherSubjectsUpdate(BaseModel):
+    subjects: List[str]
+
 class LoginRequest(BaseModel):
     username: str
     password: str
\ No newline at end of file
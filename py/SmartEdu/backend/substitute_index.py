@@ -0,0 +1,318 @@
+# backend/substitute_index.py
+import random
+import threading
+from bisect import bisect_left, insort
+from datetime import time
+
+from sqlalchemy.orm import Session
+
+from . import models
+
+# --- HELPERS ---
+
+def to_minutes(value):
+    """Convert a time / "HH:MM" / "HH:MM:SS" value to minutes since midnight"""
+    if isinstance(value, str):
+        value = time.fromisoformat(value)
+    return value.hour * 60 + value.minute
+
+
+def hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def day_key(day):
+    """Canonical day name as strftime("%A") writes it, so "monday " and "MONDAY" both key as Monday"""
+    return (day or "").strip().capitalize()
+
+
+def room_key(room):
+    return (room or "").strip().lower()
+
+
+SCHEDULE_COLUMNS = (models.Schedule.id, models.Schedule.teacher_id, models.Schedule.day_of_week,
+                    models.Schedule.start_time, models.Schedule.end_time, models.Schedule.subject, models.Schedule.room)
+BUSY_COLUMNS = (models.TeacherAvailability.id, models.TeacherAvailability.teacher_id, models.TeacherAvailability.day_of_week,
+                models.TeacherAvailability.start_time, models.TeacherAvailability.end_time)
+
+
+def busy_rows(db):
+    return db.query(*BUSY_COLUMNS).filter(models.TeacherAvailability.status == "BUSY")
+
+
+# --- INTERVAL TREE ---
+
+class _Node:
+    __slots__ = ("start", "end", "item", "priority", "left", "right", "max_end")
+
+    def __init__(self, start, end, item):
+        self.start, self.end, self.item = start, end, item
+        self.priority = random.random()
+        self.left = self.right = None
+        self.max_end = end
+
+
+def _update(node):
+    node.max_end = max(node.end,
+                       node.left.max_end if node.left else node.end,
+                       node.right.max_end if node.right else node.end)
+
+
+class IntervalTree:
+    """
+    Treap of [start, end) intervals ordered by start. Each node also keeps the
+    largest end in its subtree, so an overlap query skips every subtree that
+    finishes before the probe starts: O(log n + hits). Overlapping intervals
+    are allowed, so existing double bookings can still be indexed and found.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def insert(self, start, end, item):
+        self.root = self._insert(self.root, _Node(start, end, item))
+        self.size += 1
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.start < node.start:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                node = self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                node = self._rotate_left(node)
+        _update(node)
+        return node
+
+    @staticmethod
+    def _rotate_right(node):
+        top = node.left
+        node.left, top.right = top.right, node
+        _update(node)
+        _update(top)
+        return top
+
+    @staticmethod
+    def _rotate_left(node):
+        top = node.right
+        node.right, top.left = top.left, node
+        _update(node)
+        _update(top)
+        return top
+
+    def overlapping(self, start, end):
+        """Items whose interval overlaps [start, end)"""
+        hits, stack = [], [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            if node.start < end and start < node.end:
+                hits.append(node.item)
+            stack.append(node.left)
+            # Everything to the right starts at or after node.start
+            if node.start < end:
+                stack.append(node.right)
+        return hits
+
+
+# --- SCHEDULE INDEX ---
+
+class BusyIndex:
+    """
+    In-memory index of the timetable, built once from `schedules` + BUSY
+    `teacher_availability` rows and kept up to date by the write routes, so
+    neither /ai/recommend-substitute nor the /schedule/add clash check scans
+    tables. Per (day, teacher_id) it keeps merged busy intervals (free/busy
+    and load) and an interval tree of the bookings themselves; per
+    (day, room) an interval tree of classes. Recommendations walk teachers
+    pre-ranked per day (by load, then name), so a top-N answer stops after
+    the first N free teachers instead of checking and sorting everyone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.busy = {}        # (day, teacher_id) -> sorted, non-overlapping [(start, end), ...]
+        self.load_minutes = {}  # (day, teacher_id) -> total busy minutes, used as a tie-breaker
+        self.subjects = {}    # teacher_id -> {"Mathematics", ...}
+        self.subject_teachers = {}  # "Mathematics" -> {teacher_id, ...}
+        self.teachers = {}    # teacher_id -> {"name": ..., "phone": ...}
+        self.bookings = {}    # (day, teacher_id) -> IntervalTree of classes + BUSY blocks
+        self.rooms = {}       # (day, room key) -> IntervalTree of classes
+        self._rankings = {}   # day -> {subject or None: [(load, name, teacher_id), ...]}, built on first use
+
+    # --- BUILD ---
+
+    def load(self, db: Session):
+        """(Re)build the whole index from the database"""
+        with self._lock:
+            self.busy, self.load_minutes, self.subjects, self.teachers = {}, {}, {}, {}
+            self.subject_teachers, self.bookings, self.rooms, self._rankings = {}, {}, {}, {}
+
+            for t in db.query(models.User).filter(models.User.role == "teacher"):
+                self.teachers[t.id] = {"name": t.full_name, "phone": t.phone_number}
+
+            # Plain column rows: no ORM identity map for the whole table
+            for s in db.query(*SCHEDULE_COLUMNS):
+                self._add_schedule(s)
+            for a in busy_rows(db):
+                self._add_availability(a)
+
+            self.loaded = True
+
+    def ensure_loaded(self, db: Session):
+        if not self.loaded:
+            self.load(db)
+
+    def reset(self):
+        """Drop everything; the next request rebuilds from the database"""
+        with self._lock:
+            self.loaded = False
+
+    # --- INCREMENTAL UPDATES (called by the write routes) ---
+
+    def add_teacher(self, teacher: models.User):
+        if not self.loaded or teacher.role != "teacher":
+            return
+        with self._lock:
+            self.teachers[teacher.id] = {"name": teacher.full_name, "phone": teacher.phone_number}
+            self._rankings = {}
+
+    def add_schedule(self, slot: models.Schedule):
+        if not self.loaded:
+            return
+        with self._lock:
+            self._add_schedule(slot)
+
+    def add_availability(self, avail: models.TeacherAvailability):
+        if not self.loaded or avail.status != "BUSY":
+            return
+        with self._lock:
+            self._add_availability(avail)
+
+    def _add_schedule(self, s):
+        day, start, end = day_key(s.day_of_week), to_minutes(s.start_time), to_minutes(s.end_time)
+        if end <= start:
+            return
+        self._add_interval(day, s.teacher_id, start, end)
+        if s.subject not in self.subjects.setdefault(s.teacher_id, set()):
+            self.subjects[s.teacher_id].add(s.subject)
+            self.subject_teachers.setdefault(s.subject, set()).add(s.teacher_id)
+            self._rankings = {}
+        item = {"kind": "class", "id": s.id, "teacher_id": s.teacher_id, "day": day,
+                "start": hhmm(start), "end": hhmm(end), "subject": s.subject, "room": s.room}
+        if s.teacher_id is not None:
+            self.bookings.setdefault((day, s.teacher_id), IntervalTree()).insert(start, end, item)
+        if room_key(s.room):
+            self.rooms.setdefault((day, room_key(s.room)), IntervalTree()).insert(start, end, item)
+
+    def _add_availability(self, a):
+        day, start, end = day_key(a.day_of_week), to_minutes(a.start_time), to_minutes(a.end_time)
+        if end <= start:
+            return
+        self._add_interval(day, a.teacher_id, start, end)
+        item = {"kind": "busy", "id": a.id, "teacher_id": a.teacher_id, "day": day,
+                "start": hhmm(start), "end": hhmm(end), "subject": None, "room": None}
+        self.bookings.setdefault((day, a.teacher_id), IntervalTree()).insert(start, end, item)
+
+    def _add_interval(self, day, teacher_id, start, end):
+        """Insert and merge so each key keeps a sorted list of disjoint intervals"""
+        intervals = self.busy.setdefault((day, teacher_id), [])
+        insort(intervals, (start, end))
+
+        merged = []
+        for s, e in intervals:
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        self.busy[(day, teacher_id)] = merged
+        self.load_minutes[(day, teacher_id)] = sum(e - s for s, e in merged)
+        self._rankings.pop(day, None)
+
+    def _ranking(self, day, subject=None):
+        """Teachers (only those who teach `subject`, if given) by lightest load that day; caller holds the lock"""
+        by_subject = self._rankings.setdefault(day, {})
+        ranked = by_subject.get(subject)
+        if ranked is None:
+            ids = self.teachers if subject is None else self.subject_teachers.get(subject, ())
+            ranked = sorted(
+                (self.load_minutes.get((day, t), 0), self.teachers[t]["name"] or "", t) for t in ids if t in self.teachers
+            )
+            if subject is None or ranked:      # no cache entry for subjects nobody teaches
+                by_subject[subject] = ranked
+        return ranked
+
+    # --- QUERIES ---
+
+    def is_free(self, day, teacher_id, start, end):
+        """True if the teacher has no busy interval overlapping [start, end)"""
+        intervals = self.busy.get((day_key(day), teacher_id))
+        if not intervals:
+            return True
+        # The only interval that can overlap is the last one starting before `end`
+        i = bisect_left(intervals, (end,))
+        return i == 0 or intervals[i - 1][1] <= start
+
+    def recommend(self, day, start, end, subject, limit=None):
+        """
+        The first `limit` (default: all) free teachers, ranked by subject
+        match, then by lightest load that day. Both rankings are pre-sorted,
+        so this stops as soon as it has `limit` free teachers.
+        """
+        day, start, end = day_key(day), to_minutes(start), to_minutes(end)
+        busy, teachers = self.busy, self.teachers
+        probe = (end,)
+        ranked = []
+
+        with self._lock:
+            teaches = self.subject_teachers.get(subject, ())
+            for not_match, candidates in ((False, self._ranking(day, subject)), (True, self._ranking(day))):
+                for load, _, teacher_id in candidates:
+                    if limit is not None and len(ranked) >= limit:
+                        break
+                    if not_match and teacher_id in teaches:
+                        continue
+                    intervals = busy.get((day, teacher_id))
+                    if intervals:
+                        # Same check as is_free(), inlined for the hot loop
+                        i = bisect_left(intervals, probe)
+                        if i and intervals[i - 1][1] > start:
+                            continue
+                    ranked.append((not_match, load, teacher_id, teachers[teacher_id]))
+
+        return [
+            {
+                "teacher_id": teacher_id,
+                "name": info["name"],
+                "phone": info["phone"],
+                "score": 10 if not_match else 20,
+                "reason": "Free at this time" if not_match else f"Also teaches {subject}",
+                "load_minutes": load,
+            }
+            for not_match, load, teacher_id, info in ranked
+        ]
+
+    def find(self, day, start, end, teacher_id=None, room=None):
+        """Bookings a new [start, end) class for this teacher / room would clash with"""
+        day, start, end = day_key(day), to_minutes(start), to_minutes(end)
+        conflicts = []
+        with self._lock:
+            tree = self.bookings.get((day, teacher_id))
+            if tree:
+                for item in tree.overlapping(start, end):
+                    conflicts.append(dict(item, type="availability" if item["kind"] == "busy" else "teacher"))
+            tree = self.rooms.get((day, room_key(room)))
+            if tree:
+                for item in tree.overlapping(start, end):
+                    conflicts.append(dict(item, type="room"))
+        return conflicts
+
+
+# Shared instance used by the routers
+busy_index = BusyIndex()
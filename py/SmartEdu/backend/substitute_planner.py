@@ -0,0 +1,145 @@
+# backend/substitute_planner.py
+import heapq
+
+from .substitute_index import to_minutes
+
+# --- COST WEIGHTS ---
+SUBJECT_MISMATCH_COST = 10   # Covering a subject you don't teach
+LOAD_COST = 2                # Per half hour already busy that day + per extra cover taken
+
+
+class MinCostFlow:
+    """Successive shortest paths with Dijkstra + potentials (all costs >= 0)"""
+
+    def __init__(self, n):
+        self.graph = [[] for _ in range(n)]
+
+    def add_edge(self, u, v, cap, cost):
+        # Edge layout: [to, cap, cost, index of reverse edge]
+        self.graph[u].append([v, cap, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return self.graph[u][-1]
+
+    def solve(self, source, sink):
+        n = len(self.graph)
+        potential = [0] * n
+        flow = cost = 0
+
+        while True:
+            dist = [None] * n
+            prev = [None] * n
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for i, (v, cap, c, _) in enumerate(self.graph[u]):
+                    if cap <= 0:
+                        continue
+                    nd = d + c + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = (u, i)
+                        heapq.heappush(heap, (nd, v))
+
+            if dist[sink] is None:
+                return flow, cost
+
+            for v in range(n):
+                if dist[v] is not None:
+                    potential[v] += dist[v]
+
+            # Every source edge has capacity 1, so each path carries one unit
+            v = sink
+            while v != source:
+                u, i = prev[v]
+                edge = self.graph[u][i]
+                edge[1] -= 1
+                self.graph[v][edge[3]][1] += 1
+                v = u
+            flow += 1
+            cost += potential[sink] - potential[source]
+
+
+def _overlap_groups(slots):
+    """
+    Split the day's slots into groups of (transitively) overlapping times.
+    A substitute can cover at most one slot per group.
+    """
+    order = sorted(range(len(slots)), key=lambda i: slots[i]["start"])
+    group_of, group, group_end = {}, -1, None
+    for i in order:
+        if group_end is None or slots[i]["start"] >= group_end:
+            group += 1
+            group_end = slots[i]["end"]
+        else:
+            group_end = max(group_end, slots[i]["end"])
+        group_of[i] = group
+    return group_of
+
+
+def plan_substitutes(slots, candidates, is_free):
+    """
+    Assign one substitute per slot as a min-cost flow.
+
+    slots:      [{"id", "subject", "start", "end"}]   (start/end as time or "HH:MM")
+    candidates: {teacher_id: {"subjects": set, "load_minutes": int}}
+    is_free:    callable(teacher_id, start_minutes, end_minutes) -> bool
+
+    Returns ({slot_id: teacher_id}, [unfilled slot_id, ...]).
+    """
+    slots = [dict(s, start=to_minutes(s["start"]), end=to_minutes(s["end"])) for s in slots]
+    group_of = _overlap_groups(slots)
+    n_groups = len(set(group_of.values()))
+
+    # Node numbering: source, slots, (teacher, group) pairs, teachers, sink
+    source = 0
+    slot_node = {i: 1 + i for i in range(len(slots))}
+    next_node = 1 + len(slots)
+    teacher_node = {}
+    pair_node = {}
+    edges = []   # (u, v, cost) for slot -> (teacher, group)
+
+    for i, slot in enumerate(slots):
+        for teacher_id, info in candidates.items():
+            if not is_free(teacher_id, slot["start"], slot["end"]):
+                continue
+            key = (teacher_id, group_of[i])
+            if key not in pair_node:
+                pair_node[key] = next_node
+                next_node += 1
+            teacher_node.setdefault(teacher_id, None)
+            cost = 0 if slot["subject"] in info["subjects"] else SUBJECT_MISMATCH_COST
+            edges.append((slot_node[i], pair_node[key], cost, teacher_id))
+
+    for teacher_id in teacher_node:
+        teacher_node[teacher_id] = next_node
+        next_node += 1
+    sink = next_node
+
+    mcf = MinCostFlow(sink + 1)
+    for i in range(len(slots)):
+        mcf.add_edge(source, slot_node[i], 1, 0)
+
+    slot_edges = []
+    for u, v, cost, teacher_id in edges:
+        slot_edges.append((u, teacher_id, mcf.add_edge(u, v, 1, cost)))
+    for (teacher_id, _), node in pair_node.items():
+        mcf.add_edge(node, teacher_node[teacher_id], 1, 0)
+
+    # Convex load cost: each extra cover is dearer than the last, which spreads the work
+    for teacher_id, node in teacher_node.items():
+        base = candidates[teacher_id]["load_minutes"] // 30
+        for k in range(n_groups):
+            mcf.add_edge(node, sink, 1, LOAD_COST * (base + k))
+
+    mcf.solve(source, sink)
+
+    node_to_slot = {node: slots[i]["id"] for i, node in slot_node.items()}
+    assignment = {}
+    for u, teacher_id, edge in slot_edges:
+        if edge[1] == 0:
+            assignment[node_to_slot[u]] = teacher_id
+    unfilled = [s["id"] for s in slots if s["id"] not in assignment]
+    return assignment, unfilled
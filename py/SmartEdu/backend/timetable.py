@@ -0,0 +1,56 @@
+# backend/timetable.py
+from bisect import bisect_right
+
+from .substitute_index import to_minutes
+
+# --- SCHOOL DAY LAYOUT ---
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+# (start, end, is_break)
+PERIODS = [
+    ("08:00", "09:00", False),
+    ("09:00", "10:00", False),
+    ("10:00", "10:30", True),
+    ("10:30", "11:20", False),
+    ("11:20", "12:10", False),
+    ("12:10", "13:00", False),
+]
+
+_PERIOD_STARTS = [to_minutes(start) for start, _, _ in PERIODS]
+
+
+def period_index(start):
+    """Index of the period containing `start`, or None if it falls outside the school day"""
+    minutes = to_minutes(start)
+    i = bisect_right(_PERIOD_STARTS, minutes) - 1
+    if i < 0 or minutes >= to_minutes(PERIODS[i][1]):
+        return None
+    return i
+
+
+def build_grid(rows):
+    """
+    Bucket (day, start, teacher, subject, room) rows into a (period, day) grid.
+    Classes that start in a break or outside the day go to `unslotted`.
+    """
+    slots = [
+        {
+            "label": f"{start} - {end}",
+            "start": start,
+            "end": end,
+            "is_break": is_break,
+            "cells": {day: [] for day in DAYS},
+        }
+        for start, end, is_break in PERIODS
+    ]
+    unslotted = []
+
+    for day, start, teacher, subject, room in rows:
+        item = {"teacher": teacher or "Unassigned", "subject": subject, "room": room}
+        i = period_index(start)
+        if i is None or PERIODS[i][2] or day not in DAYS:
+            unslotted.append(dict(item, day=day, start=str(start)))
+        else:
+            slots[i]["cells"][day].append(item)
+
+    return {"days": DAYS, "slots": slots, "unslotted": unslotted}
@@ -0,0 +1,656 @@
+# backend/timetable_solver.py
+# Constraint-based timetable generation:
+#   python -m backend.timetable_solver                # dry run against the database, lists unfilled lessons
+#   python -m backend.timetable_solver --apply        # replace `schedules` with the generated timetable
+import argparse
+import math
+import random
+import time as clock
+from datetime import date, time
+
+from sqlalchemy import func, insert, update
+
+from . import models
+from .substitute_index import to_minutes
+from .timetable import DAYS, PERIODS
+
+HARD = 1000              # one clash outweighs any amount of soft cost
+TIME_LIMIT = 50.0        # seconds of local search at most
+PATIENCE = 20000         # iterations without improvement before giving up
+TABU_TENURE = 8
+NOISE = 0.02             # chance of taking a random move instead of the best one
+
+
+class ScheduleInUse(Exception):
+    """Upcoming substitute cover points at the current timetable; becomes an HTTP 409"""
+
+
+# --- PROBLEM HELPERS ---
+
+def teaching_slots(days=DAYS, periods=PERIODS):
+    """[(day, start, end), ...] for every non-break period of the week"""
+    return [(day, start, end) for day in days for start, end, is_break in periods if not is_break]
+
+
+def unavailable_slots(slots, busy):
+    """[(teacher_id, day, start, end), ...] BUSY blocks -> {teacher_id: {overlapping slot index, ...}}"""
+    spans = [(day, to_minutes(start), to_minutes(end)) for day, start, end in slots]
+    blocked = {}
+    for teacher_id, day, start, end in busy:
+        start, end = to_minutes(start), to_minutes(end)
+        for i, (slot_day, slot_start, slot_end) in enumerate(spans):
+            if slot_day == day and slot_start < end and start < slot_end:
+                blocked.setdefault(teacher_id, set()).add(i)
+    return blocked
+
+
+def split_hours(subjects, periods):
+    """Spread `periods` weekly lessons as evenly as possible over `subjects`"""
+    base, extra = divmod(periods, len(subjects))
+    return {s: base + (1 if i < extra else 0) for i, s in enumerate(subjects)}
+
+
+class _IndexedSet:
+    """Set with O(1) add / discard / random pick"""
+
+    def __init__(self):
+        self.items, self.pos = [], {}
+
+    def add(self, x):
+        if x not in self.pos:
+            self.pos[x] = len(self.items)
+            self.items.append(x)
+
+    def discard(self, x):
+        i = self.pos.pop(x, None)
+        if i is not None:
+            last = self.items.pop()
+            if i < len(self.items):
+                self.items[i] = last
+                self.pos[last] = i
+
+    def pick(self, rng):
+        return self.items[rng.randrange(len(self.items))]
+
+    def __len__(self):
+        return len(self.items)
+
+
+# --- SOLVER ---
+
+class TimetableSolver:
+    """
+    Weekly timetable as a constraint problem.
+
+    Hard: a class, a teacher and a room each hold at most one lesson per slot;
+    lessons only go to slots their teacher is available for, and are taught by
+    someone who teaches the subject (one teacher per class and subject).
+    Soft: a subject is spread over the week (at most ceil(lessons / days) per day).
+
+    Greedy most-constrained-first construction, then tabu search over three
+    moves: move a lesson, swap two lessons of the same class, or hand a class's
+    subject to another qualified teacher. Lessons still clashing at the end
+    are dropped and reported as unfilled.
+    """
+
+    def __init__(self, slots, classes, teacher_subjects, unavailable=None, subject_rooms=None,
+                 home_rooms=None, max_load=None, seed=0):
+        """
+        slots: [(day, "HH:MM", "HH:MM"), ...]       classes: {class_name: {subject: lessons per week}}
+        teacher_subjects: {teacher_id: [subject]}   unavailable: {teacher_id: {slot index}}
+        subject_rooms: {subject: [room]} for subjects that need a special room (labs, hall);
+        everything else is taught in the class's home room (home_rooms, default "Room <class>").
+        """
+        self.slots = slots
+        self.rng = random.Random(seed)
+        self.max_load = max_load
+        unavailable = unavailable or {}
+        subject_rooms = subject_rooms or {}
+        home_rooms = home_rooms or {}
+
+        n = self.n = len(slots)
+        day_names = list(dict.fromkeys(day for day, _, _ in slots))
+        self.n_days = len(day_names)
+        self.slot_day = [day_names.index(day) for day, _, _ in slots]
+
+        self.class_names = list(classes)
+        self.teacher_subjects = teacher_subjects
+        self.teacher_ids = list(teacher_subjects)
+        self.free = [[s for s in range(n) if s not in unavailable.get(tid, ())] for tid in self.teacher_ids]
+        self.free_set = [set(f) for f in self.free]
+        qualified = {}
+        for t, tid in enumerate(self.teacher_ids):
+            for subject in dict.fromkeys(teacher_subjects[tid]):
+                qualified.setdefault(subject, []).append(t)
+
+        self.room_names, room_index = [], {}
+
+        def room(name):
+            if name not in room_index:
+                room_index[name] = len(self.room_names)
+                self.room_names.append(name)
+            return room_index[name]
+
+        # One group per (class, subject); one lesson per weekly period of it
+        self.g_class, self.g_subject, self.g_pool, self.g_cap, self.g_candidates, self.g_lessons = [], [], [], [], [], []
+        self.l_group = []
+        for c, class_name in enumerate(self.class_names):
+            home = room(home_rooms.get(class_name, f"Room {class_name}"))
+            for subject, hours in classes[class_name].items():
+                if hours <= 0:
+                    continue
+                g = len(self.g_class)
+                self.g_class.append(c)
+                self.g_subject.append(subject)
+                pool = subject_rooms.get(subject)
+                self.g_pool.append([room(r) for r in pool] if pool else [home])
+                self.g_cap.append(math.ceil(hours / self.n_days))
+                self.g_candidates.append(qualified.get(subject, []))
+                self.g_lessons.append(list(range(len(self.l_group), len(self.l_group) + hours)))
+                self.l_group.extend([g] * hours)
+
+        # Flat cell ids: class cells, then teacher cells, then room cells (each x slot)
+        self.t_base = len(self.class_names) * n
+        self.r_base = self.t_base + len(self.teacher_ids) * n
+        size = self.r_base + len(self.room_names) * n
+        self.occ = [0] * size
+        self.members = [[] for _ in range(size)]
+        self.hot = _IndexedSet()           # cells holding more than one lesson
+        self.day_count = [0] * (len(self.g_class) * self.n_days)
+        self.over = _IndexedSet()          # (group, day) cells over the per-day cap
+        self.hard = self.soft = 0
+
+        self.l_slot = [-1] * len(self.l_group)
+        self.l_room = [-1] * len(self.l_group)
+        self.g_teacher = [-1] * len(self.g_class)
+        self.load = [0] * len(self.teacher_ids)
+        self.reasons = {}                  # group -> why it has no teacher
+
+    # --- STATE UPDATES ---
+
+    def _cells(self, l, s, r):
+        g = self.l_group[l]
+        return (self.g_class[g] * self.n + s, self.t_base + self.g_teacher[g] * self.n + s, self.r_base + r * self.n + s)
+
+    def _place(self, l, s, r):
+        occ, members = self.occ, self.members
+        for cell in self._cells(l, s, r):
+            if occ[cell]:
+                self.hard += 1
+                if occ[cell] == 1:
+                    self.hot.add(cell)
+            occ[cell] += 1
+            members[cell].append(l)
+        g = self.l_group[l]
+        key = g * self.n_days + self.slot_day[s]
+        if self.day_count[key] >= self.g_cap[g]:
+            self.soft += 1
+            self.over.add(key)
+        self.day_count[key] += 1
+        self.l_slot[l], self.l_room[l] = s, r
+
+    def _remove(self, l):
+        occ, members = self.occ, self.members
+        s = self.l_slot[l]
+        for cell in self._cells(l, s, self.l_room[l]):
+            occ[cell] -= 1
+            members[cell].remove(l)
+            if occ[cell]:
+                self.hard -= 1
+                if occ[cell] == 1:
+                    self.hot.discard(cell)
+        g = self.l_group[l]
+        key = g * self.n_days + self.slot_day[s]
+        self.day_count[key] -= 1
+        if self.day_count[key] >= self.g_cap[g]:
+            self.soft -= 1
+            if self.day_count[key] == self.g_cap[g]:
+                self.over.discard(key)
+        self.l_slot[l] = self.l_room[l] = -1
+
+    def _set_teacher(self, g, t):
+        placed = [(l, self.l_slot[l], self.l_room[l]) for l in self.g_lessons[g] if self.l_slot[l] >= 0]
+        for l, _, _ in placed:
+            self._remove(l)
+        if self.g_teacher[g] >= 0:
+            self.load[self.g_teacher[g]] -= len(self.g_lessons[g])
+        self.g_teacher[g] = t
+        self.load[t] += len(self.g_lessons[g])
+        for l, s, r in placed:
+            self._place(l, s, r)
+
+    def _best_room(self, g, s, exclude=-1):
+        occ, base, n = self.occ, self.r_base, self.n
+        return min(self.g_pool[g], key=lambda r: occ[base + r * n + s] - (r == exclude))
+
+    # --- MOVE EVALUATION (cost deltas without touching the state) ---
+
+    def _move_delta(self, l, s):
+        """Move l from its slot to s (different slot); returns (delta, room)"""
+        occ, n, g = self.occ, self.n, self.l_group[l]
+        a, c, t = self.l_slot[l], self.g_class[g], self.g_teacher[g]
+        r = self._best_room(g, s)
+        ct, tb, rb = c * n, self.t_base + t * n, self.r_base
+        hard = ((occ[ct + s] > 0) + (occ[tb + s] > 0) + (occ[rb + r * n + s] > 0)
+                - (occ[ct + a] > 1) - (occ[tb + a] > 1) - (occ[rb + self.l_room[l] * n + a] > 1))
+        return hard * HARD + self._day_delta(g, a, s), r
+
+    def _day_delta(self, g, a, s):
+        da, ds = self.slot_day[a], self.slot_day[s]
+        if da == ds:
+            return 0
+        base, cap = g * self.n_days, self.g_cap[g]
+        return (self.day_count[base + ds] >= cap) - (self.day_count[base + da] > cap)
+
+    def _swap_delta(self, l1, l2):
+        """Swap two lessons of the same class; the class cells are unchanged"""
+        occ, n = self.occ, self.n
+        g1, g2 = self.l_group[l1], self.l_group[l2]
+        a, b = self.l_slot[l1], self.l_slot[l2]
+        t1, t2 = self.g_teacher[g1], self.g_teacher[g2]
+        hard = 0
+        if t1 != t2:
+            t1b, t2b = self.t_base + t1 * n, self.t_base + t2 * n
+            hard = (occ[t1b + b] > 0) + (occ[t2b + a] > 0) - (occ[t1b + a] > 1) - (occ[t2b + b] > 1)
+        r1, r2 = self.l_room[l1], self.l_room[l2]
+        new_r1, new_r2 = self._best_room(g1, b, exclude=r2), self._best_room(g2, a, exclude=r1)
+        adjust = {}
+        for r, s in ((r1, a), (r2, b)):
+            cell = self.r_base + r * n + s
+            count = occ[cell] + adjust.get(cell, 0)
+            hard -= count > 1
+            adjust[cell] = adjust.get(cell, 0) - 1
+        for r, s in ((new_r1, b), (new_r2, a)):
+            cell = self.r_base + r * n + s
+            count = occ[cell] + adjust.get(cell, 0)
+            hard += count > 0
+            adjust[cell] = adjust.get(cell, 0) + 1
+        return hard * HARD + self._day_delta(g1, a, b) + self._day_delta(g2, b, a), new_r1, new_r2
+
+    def _teacher_delta(self, g, t):
+        """Hand group g to teacher t; None if t can't take every placed lesson"""
+        old = self.g_teacher[g]
+        if self.max_load is not None and self.load[t] + len(self.g_lessons[g]) > self.max_load:
+            return None
+        occ, n, free = self.occ, self.n, self.free_set[t]
+        adjust, hard = {}, 0
+        for l in self.g_lessons[g]:
+            s = self.l_slot[l]
+            if s < 0:
+                continue
+            if s not in free:
+                return None
+            out_cell, in_cell = self.t_base + old * n + s, self.t_base + t * n + s
+            hard -= occ[out_cell] + adjust.get(out_cell, 0) > 1
+            adjust[out_cell] = adjust.get(out_cell, 0) - 1
+            hard += occ[in_cell] + adjust.get(in_cell, 0) > 0
+            adjust[in_cell] = adjust.get(in_cell, 0) + 1
+        return hard * HARD
+
+    # --- CONSTRUCTION ---
+
+    def _assign_teachers(self):
+        """Most constrained subject first, each to the qualified teacher with the most spare periods"""
+        order = sorted(range(len(self.g_class)), key=lambda g: (len(self.g_candidates[g]), -len(self.g_lessons[g])))
+        for g in order:
+            hours = len(self.g_lessons[g])
+            candidates = self.g_candidates[g]
+            if not candidates:
+                self.reasons[g] = "no teacher teaches this subject"
+                continue
+            if self.max_load is not None:
+                candidates = [t for t in candidates if self.load[t] + hours <= self.max_load]
+                if not candidates:
+                    self.reasons[g] = "no qualified teacher has periods left"
+                    continue
+            t = max(candidates, key=lambda t: (len(self.free[t]) - self.load[t] - hours, -self.load[t]))
+            if not self.free[t]:
+                self.reasons[g] = "no qualified teacher is available"
+                continue
+            self.g_teacher[g] = t
+            self.load[t] += hours
+
+    def _place_cost(self, g, s):
+        occ, n = self.occ, self.n
+        r = self._best_room(g, s)
+        hard = (occ[self.g_class[g] * n + s] > 0) + (occ[self.t_base + self.g_teacher[g] * n + s] > 0) \
+            + (occ[self.r_base + r * n + s] > 0)
+        soft = self.day_count[g * self.n_days + self.slot_day[s]] >= self.g_cap[g]
+        return hard * HARD + soft, r
+
+    def _construct(self):
+        groups = [g for g in range(len(self.g_class)) if self.g_teacher[g] >= 0]
+        groups.sort(key=lambda g: (len(self.free[self.g_teacher[g]]) - self.load[self.g_teacher[g]], -len(self.g_lessons[g])))
+        for g in groups:
+            for l in self.g_lessons[g]:
+                best, choices = None, []
+                for s in self.free[self.g_teacher[g]]:
+                    cost, r = self._place_cost(g, s)
+                    if best is None or cost < best:
+                        best, choices = cost, [(s, r)]
+                    elif cost == best:
+                        choices.append((s, r))
+                self._place(l, *self.rng.choice(choices))
+
+    # --- LOCAL SEARCH ---
+
+    def _snapshot(self):
+        return self.l_slot[:], self.l_room[:], self.g_teacher[:]
+
+    def _restore(self, snapshot):
+        slots, rooms, teachers = snapshot
+        for l in range(len(self.l_group)):
+            if self.l_slot[l] >= 0:
+                self._remove(l)
+        self.load = [0] * len(self.teacher_ids)
+        self.g_teacher = teachers[:]
+        for g, t in enumerate(teachers):
+            if t >= 0:
+                self.load[t] += len(self.g_lessons[g])
+        for l, (s, r) in enumerate(zip(slots, rooms)):
+            if s >= 0:
+                self._place(l, s, r)
+
+    def _pick_lesson(self):
+        rng = self.rng
+        if self.hard:
+            cell = self.hot.pick(rng)
+            return rng.choice(self.members[cell]), cell >= self.t_base and cell < self.r_base
+        key = self.over.pick(rng)
+        g, d = divmod(key, self.n_days)
+        return rng.choice([l for l in self.g_lessons[g] if self.slot_day[self.l_slot[l]] == d]), False
+
+    def _step(self, it, tabu, best_cost):
+        rng, n = self.rng, self.n
+        l, teacher_clash = self._pick_lesson()
+        g = self.l_group[l]
+        a, c, t = self.l_slot[l], self.g_class[g], self.g_teacher[g]
+        cost = self.hard * HARD + self.soft
+
+        moves = []
+        for s in self.free[t]:
+            if s == a:
+                continue
+            delta, r = self._move_delta(l, s)
+            moves.append((delta, ("move", l, s, r), (l, s)))
+            # Same class busy there with one lesson: try trading places with it
+            cell = c * n + s
+            if self.occ[cell] == 1:
+                other = self.members[cell][0]
+                og = self.l_group[other]
+                if og != g and a in self.free_set[self.g_teacher[og]]:
+                    delta, r1, r2 = self._swap_delta(l, other)
+                    moves.append((delta, ("swap", l, other, r1, r2), (l, s)))
+        if teacher_clash or not moves:
+            for other_t in self.g_candidates[g]:
+                if other_t != t:
+                    delta = self._teacher_delta(g, other_t)
+                    if delta is not None:
+                        moves.append((delta, ("teacher", g, other_t), ("teacher", g, other_t)))
+        if not moves:
+            return
+
+        if rng.random() < NOISE:
+            _, move, key = rng.choice(moves)
+        else:
+            best, choices = None, []
+            for delta, move, key in moves:
+                # Tabu unless it beats the best solution seen so far
+                if tabu.get(key, -1) > it and cost + delta >= best_cost:
+                    continue
+                if best is None or delta < best:
+                    best, choices = delta, [(move, key)]
+                elif delta == best:
+                    choices.append((move, key))
+            if not choices:
+                return
+            move, key = rng.choice(choices)
+
+        tenure = it + TABU_TENURE + rng.randrange(TABU_TENURE)
+        if move[0] == "move":
+            _, l, s, r = move
+            self._remove(l)
+            self._place(l, s, r)
+            tabu[(l, a)] = tenure
+        elif move[0] == "swap":
+            _, l1, l2, r1, r2 = move
+            b = self.l_slot[l2]
+            self._remove(l1)
+            self._remove(l2)
+            self._place(l1, b, r1)
+            self._place(l2, a, r2)
+            tabu[(l1, a)] = tabu[(l2, b)] = tenure
+        else:
+            _, g, new_t = move
+            self._set_teacher(g, new_t)
+            tabu[("teacher", g, t)] = tenure
+
+    # --- REPAIR ---
+
+    def _conflicts(self, l):
+        return sum(self.occ[cell] - 1 for cell in self._cells(l, self.l_slot[l], self.l_room[l]))
+
+    def _repair(self):
+        """Drop the most-clashing lesson until clash-free, then re-seat what still fits cleanly"""
+        dropped = []
+        while self.hard:
+            cell = self.hot.items[0]
+            l = max(self.members[cell], key=self._conflicts)
+            self._remove(l)
+            dropped.append(l)
+        unplaced = []
+        for l in dropped:
+            g = self.l_group[l]
+            options = [(cost, s, r) for s in self.free[self.g_teacher[g]] for cost, r in [self._place_cost(g, s)] if cost < HARD]
+            if options:
+                cost, s, r = min(options)
+                self._place(l, s, r)
+            else:
+                unplaced.append(l)
+        return unplaced
+
+    def solve(self, time_limit=TIME_LIMIT, max_iterations=None, patience=PATIENCE):
+        started = clock.perf_counter()
+        deadline = started + time_limit
+        self._assign_teachers()
+        self._construct()
+
+        tabu = {}
+        best_cost = self.hard * HARD + self.soft
+        best = self._snapshot()
+        it = stall = 0
+        while self.hard or self.soft:
+            if max_iterations is not None and it >= max_iterations:
+                break
+            if stall > patience or (it & 63 == 0 and clock.perf_counter() > deadline):
+                break
+            it += 1
+            self._step(it, tabu, best_cost)
+            cost = self.hard * HARD + self.soft
+            if cost < best_cost:
+                best_cost, best, stall = cost, self._snapshot(), 0
+            else:
+                stall += 1
+        if self.hard * HARD + self.soft > best_cost:
+            self._restore(best)
+
+        unplaced = self._repair()
+        return self._result(unplaced, it, clock.perf_counter() - started)
+
+    # --- OUTPUT ---
+
+    def _result(self, unplaced, iterations, seconds):
+        lessons = []
+        for l, s in enumerate(self.l_slot):
+            if s < 0:
+                continue
+            g = self.l_group[l]
+            day, start, end = self.slots[s]
+            lessons.append({
+                "class_name": self.class_names[self.g_class[g]],
+                "subject": self.g_subject[g],
+                "teacher_id": self.teacher_ids[self.g_teacher[g]],
+                "day_of_week": day,
+                "start_time": start,
+                "end_time": end,
+                "room": self.room_names[self.l_room[l]],
+            })
+
+        missing = {}
+        for g, reason in self.reasons.items():
+            missing[(g, reason)] = len(self.g_lessons[g])
+        for l in unplaced:
+            key = (self.l_group[l], "no clash-free period left")
+            missing[key] = missing.get(key, 0) + 1
+        unfilled = [
+            {"class_name": self.class_names[self.g_class[g]], "subject": self.g_subject[g], "lessons": count, "reason": reason}
+            for (g, reason), count in sorted(missing.items())
+        ]
+
+        # Periods each short class still has empty, for filling by hand
+        empty_slots = {}
+        for class_name in dict.fromkeys(item["class_name"] for item in unfilled):
+            c = self.class_names.index(class_name)
+            empty_slots[class_name] = [
+                f"{day} {start}-{end}" for s, (day, start, end) in enumerate(self.slots) if not self.occ[c * self.n + s]
+            ]
+
+        return {
+            "lessons": lessons,
+            "unfilled": unfilled,
+            "empty_slots": empty_slots,
+            "stats": {
+                "lessons_requested": len(self.l_group),
+                "lessons_placed": len(lessons),
+                "lessons_unfilled": len(self.l_group) - len(lessons),
+                "soft_violations": self.soft,
+                "iterations": iterations,
+                "seconds": round(seconds, 2),
+            },
+        }
+
+
+# --- DATABASE ---
+
+def problem_from_db(db, slots=None):
+    """
+    Default inputs from what the school already has: each class takes the
+    subjects its students are graded in, spread evenly over the week; each
+    teacher teaches their `teacher_subjects` rows (teachers without any fall
+    back to what they teach in the current timetable); BUSY availability
+    blocks make slots unavailable.
+    """
+    slots = slots or teaching_slots()
+    class_subjects = {}
+    for class_name, subject in (
+        db.query(models.Student.class_name, models.Grade.subject)
+        .join(models.Grade, models.Grade.student_id == models.Student.id)
+        .distinct()
+    ):
+        class_subjects.setdefault(class_name, set()).add(subject)
+
+    teacher_subjects = {}
+    for source in (models.TeacherSubject, models.Schedule):
+        current = {}
+        for teacher_id, subject in (
+            db.query(source.teacher_id, source.subject)
+            .join(models.User, models.User.id == source.teacher_id)
+            .filter(models.User.role == "teacher")
+            .distinct()
+        ):
+            if teacher_id not in teacher_subjects:
+                current.setdefault(teacher_id, []).append(subject)
+        teacher_subjects.update(current)
+
+    avail = models.TeacherAvailability
+    busy = db.query(avail.teacher_id, avail.day_of_week, avail.start_time, avail.end_time).filter(avail.status == "BUSY")
+    return {
+        "slots": slots,
+        "classes": {c: split_hours(sorted(subjects), len(slots)) for c, subjects in sorted(class_subjects.items())},
+        "teacher_subjects": teacher_subjects,
+        "unavailable": unavailable_slots(slots, busy),
+    }
+
+
+def save_teacher_subjects(db, teacher_subjects):
+    """Replace the qualifications of the given teachers (the caller commits)"""
+    if not teacher_subjects:
+        return
+    db.query(models.TeacherSubject).filter(
+        models.TeacherSubject.teacher_id.in_(list(teacher_subjects))
+    ).delete(synchronize_session=False)
+    rows = [{"teacher_id": tid, "subject": subject}
+            for tid, subjects in teacher_subjects.items() for subject in dict.fromkeys(subjects)]
+    if rows:
+        db.execute(insert(models.TeacherSubject), rows)
+
+
+def replace_schedule(db, lessons, teacher_subjects=None, today=None):
+    """
+    Swap the whole `schedules` table for the generated lessons (the caller
+    commits). Refuses while cover is planned for today or later; past cover
+    is kept but detached from the lessons being removed. `teacher_subjects`
+    (what the solve was given) is saved first, so teachers left without
+    lessons stay eligible for the next run.
+    """
+    cover = models.SubstituteAssignment
+    today = today or date.today()
+    upcoming = [d for (d,) in db.query(cover.date).filter(cover.date >= today).distinct().order_by(cover.date).limit(5)]
+    if upcoming:
+        dates = ", ".join(d.isoformat() for d in upcoming)
+        raise ScheduleInUse(f"Substitute cover is planned on {dates} against the current timetable; "
+                            f"clear it with DELETE /leave/substitutes/{{date}} before replacing the schedule.")
+    db.execute(update(cover).where(cover.date < today, cover.schedule_id.is_not(None)).values(schedule_id=None))
+    save_teacher_subjects(db, teacher_subjects)
+    # New ids continue past the old ones so schedule_version() fingerprints still change
+    first_id = (db.query(func.max(models.Schedule.id)).scalar() or 0) + 1
+    db.query(models.Schedule).delete(synchronize_session=False)
+    rows = [
+        {
+            "id": first_id + i,
+            "teacher_id": lesson["teacher_id"],
+            "day_of_week": lesson["day_of_week"],
+            "start_time": time.fromisoformat(lesson["start_time"]),
+            "end_time": time.fromisoformat(lesson["end_time"]),
+            "subject": lesson["subject"],
+            "room": lesson["room"],
+            "class_name": lesson["class_name"],
+        }
+        for i, lesson in enumerate(lessons)
+    ]
+    if rows:
+        db.execute(insert(models.Schedule), rows)
+    return len(rows)
+
+
+def main():
+    from sqlalchemy.orm import Session
+    from .database import engine, make_engine
+
+    parser = argparse.ArgumentParser(description="Generate a clash-free weekly timetable")
+    parser.add_argument("--apply", action="store_true", help="replace the schedules table with the result")
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT)
+    parser.add_argument("--max-load", type=int, help="most periods per teacher per week")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / sqlite:///./school.db")
+    args = parser.parse_args()
+
+    db_engine = make_engine(args.database_url) if args.database_url else engine
+    with Session(db_engine) as db:
+        problem = problem_from_db(db)
+        solver = TimetableSolver(problem["slots"], problem["classes"], problem["teacher_subjects"],
+                                 problem["unavailable"], max_load=args.max_load, seed=args.seed)
+        result = solver.solve(time_limit=args.time_limit)
+        stats = result["stats"]
+        print(f"📅 {stats['lessons_placed']:,}/{stats['lessons_requested']:,} lessons placed in {stats['seconds']}s "
+              f"({stats['iterations']:,} iterations, {stats['soft_violations']} soft violations)")
+        for item in result["unfilled"]:
+            print(f"   ⚠️  {item['class_name']} / {item['subject']}: {item['lessons']} unfilled ({item['reason']})")
+        if args.apply:
+            count = replace_schedule(db, result["lessons"], problem["teacher_subjects"])
+            db.commit()
+            print(f"✅ schedules replaced ({count:,} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/async_load.py
+# Run from py/SmartEdu:  python -m benchmarks.async_load --concurrency 200
+# Fires a burst of clock-ins while slow class-analytics requests are in flight,
+# once with the sync threadpool routers and once with ASYNC_DB=1.
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def seed(database_url, n_teachers, n_students, rng):
+    from sqlalchemy import insert
+    from backend.database import make_engine, Base
+    from backend import models
+
+    engine = make_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"username": f"t{i}", "full_name": f"Teacher {i}", "password_hash": "x", "role": "teacher"} for i in range(n_teachers)
+        ])
+        conn.execute(insert(models.Student), [
+            {"full_name": f"Student {i}", "class_name": f"Class {i % 10}"} for i in range(n_students)
+        ])
+        conn.execute(insert(models.Grade), [
+            {"student_id": rng.randint(1, n_students), "subject": f"S{rng.randint(1, 8)}", "score": rng.uniform(0, 100), "term": "Finals"}
+            for _ in range(n_students * 8)
+        ])
+    engine.dispose()
+
+
+async def child(args):
+    """Runs inside a fresh interpreter so ASYNC_DB is read before the app is imported"""
+    import httpx
+    from backend.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        clock_latencies = []
+
+        async def analytics(i):
+            await client.get(f"/grades/analytics/Class {i % 10}")
+
+        async def clock_in(i):
+            t0 = time.perf_counter()
+            r = await client.post("/attendance/clock-in", json={"teacher_id": i + 1})
+            clock_latencies.append(time.perf_counter() - t0)
+            return r.status_code
+
+        slow = [analytics(i) for i in range(args.slow)]
+        fast = [clock_in(i) for i in range(args.concurrency)]
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*slow, *fast)
+        elapsed = time.perf_counter() - t0
+
+    clock_latencies.sort()
+    ok = sum(1 for r in results if r == 200)
+    p = lambda q: clock_latencies[min(len(clock_latencies) - 1, int(q * len(clock_latencies)))] * 1000
+    print(json.dumps({
+        "requests": args.slow + args.concurrency,
+        "req_per_s": (args.slow + args.concurrency) / elapsed,
+        "clock_in_ok": ok,
+        "clock_in_p50_ms": p(0.5),
+        "clock_in_p99_ms": p(0.99),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Threadpool vs async routers under concurrent load")
+    parser.add_argument("--concurrency", type=int, default=200, help="concurrent clock-in requests")
+    parser.add_argument("--slow", type=int, default=40, help="concurrent analytics requests")
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child(args))
+        return
+
+    print(f"{args.slow} analytics + {args.concurrency} clock-ins in flight at once")
+    print(f"{'mode':<12} {'req/s':>8} {'ok':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for label, async_db in (("threadpool", "0"), ("async", "1")):
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+        try:
+            seed(url, args.concurrency, args.students, random.Random(1))
+            env = dict(os.environ, DATABASE_URL=url, ASYNC_DB=async_db, DB_POOL_SIZE="100", DB_MAX_OVERFLOW="100")
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.async_load", "--child",
+                 "--concurrency", str(args.concurrency), "--slow", str(args.slow)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{label:<12} {r['req_per_s']:>8.0f} {r['clock_in_ok']:>6} {r['clock_in_p50_ms']:>9.1f} {r['clock_in_p99_ms']:>9.1f}")
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# benchmarks/endpoints.py
+# Run from py/SmartEdu:  python -m benchmarks.endpoints --sizes small,medium --iterations 200
+# Seeds a temp database per size with ../seed_data.py, drives every route of
+# backend.main in-process and writes throughput, latency percentiles and SQL
+# statements per request to benchmarks/results/endpoints-<commit>.json.
+# Diff two runs with:  python -m benchmarks.endpoints --compare old.json new.json
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))     # py/SmartEdu
+SEED_SCRIPT = os.path.join(ROOT, "..", "seed_data.py")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# seed_data.py arguments per dataset size
+SIZES = {
+    "small":  ["--teachers", "13",  "--classes", "3",   "--students", "60",   "--days", "20",  "--terms", "1"],
+    "medium": ["--teachers", "100", "--classes", "40",  "--students", "1500", "--days", "60",  "--terms", "2"],
+    "large":  ["--teachers", "300", "--classes", "150", "--students", "6000", "--days", "160", "--terms", "4"],
+}
+
+
+# --- ROUTES ---
+# name -> (call(client, ctx, i), max iterations or None). Run in this order, so
+# clock-out always finds the shift clock-in opened.
+
+def _csv(ctx, i):
+    rows = [f"{ctx['students'][(i * 100 + k) % len(ctx['students'])]},Mathematics,{k % 100},Finals" for k in range(100)]
+    return "student_id,subject,score,term\n" + "\n".join(rows) + "\n"
+
+def _roll_call(ctx, i):
+    class_name = ctx["classes"][i % len(ctx["classes"])]
+    entries = [{"student_id": sid, "is_present": ctx["rng"].random() < 0.95} for sid in ctx["class_students"][class_name]]
+    return {"class_name": class_name, "date": "2026-02-02", "entries": entries}
+
+def _free_slot(ctx, i):
+    """Saturday slots that never clash: a new 10-minute block per round of teachers, one room each"""
+    teacher = ctx["teachers"][i % len(ctx["teachers"])]
+    start = 7 * 60 + (i // len(ctx["teachers"])) * 10
+    return {"teacher_id": teacher, "day_of_week": "Saturday", "start_time": f"{start // 60:02d}:{start % 60:02d}",
+            "end_time": f"{(start + 10) // 60:02d}:{(start + 10) % 60:02d}", "subject": "Mathematics", "room": f"Hall {i}"}
+
+ROUTES = {
+    "POST /users/login": (lambda c, ctx, i: c.post("/users/login", json={"username": ctx["usernames"][i % len(ctx["usernames"])], "password": "123"}), None),
+    "POST /attendance/clock-in": (lambda c, ctx, i: c.post("/attendance/clock-in", json={"teacher_id": ctx["teachers"][i]}), "teachers"),
+    "POST /attendance/clock-out": (lambda c, ctx, i: c.post("/attendance/clock-out", json={"teacher_id": ctx["teachers"][i]}), "teachers"),
+    "POST /attendance/roll-call": (lambda c, ctx, i: c.post("/attendance/roll-call", json=_roll_call(ctx, i)), None),
+    "GET /attendance/roll-call/{class}": (lambda c, ctx, i: c.get(f"/attendance/roll-call/{ctx['rng'].choice(ctx['classes'])}", params={"date": "2026-02-02"}), None),
+    "GET /attendance/view/{id}": (lambda c, ctx, i: c.get(f"/attendance/view/{ctx['rng'].choice(ctx['teachers'])}"), None),
+    "GET /attendance/hours?by=month": (lambda c, ctx, i: c.get("/attendance/hours", params={"start": (date.today() - timedelta(days=90)).isoformat(), "end": date.today().isoformat()}), None),
+    "GET /attendance/hours?teacher_id": (lambda c, ctx, i: c.get("/attendance/hours", params={"start": (date.today() - timedelta(days=365)).isoformat(), "end": date.today().isoformat(), "by": "total", "teacher_id": ctx["rng"].choice(ctx["teachers"])}), None),
+    "POST /attendance/rollup/rebuild": (lambda c, ctx, i: c.post("/attendance/rollup/rebuild"), 3),
+    "POST /students/add": (lambda c, ctx, i: c.post("/students/add", json={"full_name": f"Bench {i}", "class_name": ctx["classes"][0]}), None),
+    "GET /students/all": (lambda c, ctx, i: c.get("/students/all", params={"class_name": ctx["rng"].choice(ctx["classes"]), "limit": 100}), None),
+    "GET /students/classes": (lambda c, ctx, i: c.get("/students/classes"), None),
+    "POST /grades/add": (lambda c, ctx, i: c.post("/grades/add", json={"student_id": ctx["rng"].choice(ctx["students"]), "subject": "Mathematics", "score": ctx["rng"].randint(0, 100), "term": "Finals"}), None),
+    "POST /grades/bulk (100 rows)": (lambda c, ctx, i: c.post("/grades/bulk", content=_csv(ctx, i), headers={"content-type": "text/csv"}), 20),
+    "GET /grades/student/{id}": (lambda c, ctx, i: c.get(f"/grades/student/{ctx['rng'].choice(ctx['students'])}"), None),
+    "GET /grades/analytics/{class}": (lambda c, ctx, i: c.get(f"/grades/analytics/{ctx['rng'].choice(ctx['classes'])}"), None),
+    "GET /grades/analytics/{class}?use_summary": (lambda c, ctx, i: c.get(f"/grades/analytics/{ctx['rng'].choice(ctx['classes'])}", params={"use_summary": "true"}), None),
+    "GET /grades/terms": (lambda c, ctx, i: c.get("/grades/terms"), None),
+    "GET /grades/analytics/{class}/distribution": (lambda c, ctx, i: c.get(f"/grades/analytics/{ctx['rng'].choice(ctx['classes'])}/distribution", params={"term": "Mid-Term"}), None),
+    "POST /grades/summary/rebuild": (lambda c, ctx, i: c.post("/grades/summary/rebuild"), 5),
+    "POST /schedule/add": (lambda c, ctx, i: c.post("/schedule/add", json=_free_slot(ctx, i)), None),
+    "GET /schedule/conflicts": (lambda c, ctx, i: c.get("/schedule/conflicts"), 20),
+    "POST /schedule/generate (dry run)": (lambda c, ctx, i: c.post("/schedule/generate", json={"time_limit": 10, "seed": i}), 3),
+    "GET /schedule/view/{id}": (lambda c, ctx, i: c.get(f"/schedule/view/{ctx['rng'].choice(ctx['teachers'])}"), None),
+    "POST /availability/set": (lambda c, ctx, i: c.post("/availability/set", json={"teacher_id": ctx["rng"].choice(ctx["teachers"]), "day_of_week": "Friday", "start_time": "14:00", "end_time": "15:00", "status": "BUSY"}), None),
+    "GET /schedule/master": (lambda c, ctx, i: c.get("/schedule/master"), None),
+    "GET /schedule/master/grid": (lambda c, ctx, i: c.get("/schedule/master/grid"), None),
+    "GET /users/teachers": (lambda c, ctx, i: c.get("/users/teachers"), None),
+    "POST /ai/recommend-substitute": (lambda c, ctx, i: c.post("/ai/recommend-substitute", json={"date": "2024-01-01", "day_of_week": ctx["rng"].choice(["Monday", "Tuesday", "Wednesday"]), "start_time": "09:00", "end_time": "10:00", "subject_needed": "Mathematics"}), None),
+    "POST /leave/plan-substitutes": (lambda c, ctx, i: c.post("/leave/plan-substitutes", json={"date": date.today().isoformat()}), None),
+}
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def run_child(args):
+    """Runs in a fresh interpreter with DATABASE_URL already pointing at the seeded file"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, text
+    from backend.database import engine
+    from backend.main import app
+    from backend.response_cache import response_cache
+
+    statements = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    with engine.connect() as conn:
+        teachers = conn.execute(text("SELECT id, username FROM users WHERE role = 'teacher' ORDER BY id")).all()
+        ctx = {
+            "rng": random.Random(args.seed),
+            "teachers": [t.id for t in teachers],
+            "usernames": [t.username for t in teachers],
+            "students": conn.scalars(text("SELECT id FROM students ORDER BY id")).all(),
+            "classes": conn.scalars(text("SELECT DISTINCT class_name FROM students ORDER BY class_name")).all(),
+        }
+        ctx["class_students"] = {}
+        for sid, class_name in conn.execute(text("SELECT id, class_name FROM students ORDER BY id")):
+            ctx["class_students"].setdefault(class_name, []).append(sid)
+        rows = {
+            t: conn.scalar(text(f"SELECT COUNT(*) FROM {t}"))
+            for t in ("users", "students", "schedules", "grades", "teacher_attendance", "student_attendance")
+        }
+
+    results = {}
+    with TestClient(app) as client:
+        for name, (call, cap) in ROUTES.items():
+            if args.routes and not any(r in name for r in args.routes):
+                continue
+            n = args.iterations
+            if cap == "teachers":
+                n = min(n, len(ctx["teachers"]))
+            elif cap:
+                n = min(n, cap)
+
+            latencies, counts, errors = [], [], 0
+            started = time.perf_counter()
+            for i in range(n):
+                if args.no_cache:
+                    response_cache.clear()
+                statements[0] = 0
+                t0 = time.perf_counter()
+                response = call(client, ctx, i)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                counts.append(statements[0])
+                if response.status_code >= 400:
+                    errors += 1
+            elapsed = time.perf_counter() - started
+
+            latencies.sort()
+            results[name] = {
+                "requests": n,
+                "errors": errors,
+                "req_per_s": round(n / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 0.50), 3),
+                "p95_ms": round(percentile(latencies, 0.95), 3),
+                "p99_ms": round(percentile(latencies, 0.99), 3),
+                "sql_per_req": round(sum(counts) / n, 2),
+                "sql_max": max(counts),
+            }
+
+    print(json.dumps({"rows": rows, "routes": results}))
+
+
+def git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_size(size, args):
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "bench.db")
+    url = f"sqlite:///{path}"
+    env = dict(os.environ, DATABASE_URL=url, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    try:
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, SEED_SCRIPT, "--database-url", url, "--seed", str(args.seed), "--end-date", "2026-01-30", *SIZES[size]],
+                       cwd=ROOT, env=env, capture_output=True, check=True)
+        seed_seconds = time.perf_counter() - t0
+
+        cmd = [sys.executable, "-m", "benchmarks.endpoints", "--child", "--iterations", str(args.iterations), "--seed", str(args.seed)]
+        if args.no_cache:
+            cmd.append("--no-cache")
+        if args.routes:
+            cmd += ["--routes", *args.routes]
+        out = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        result["seed_seconds"] = round(seed_seconds, 2)
+        return result
+    finally:
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+        os.rmdir(tmp)
+
+
+def print_table(size, result):
+    print(f"\n[{size}] " + ", ".join(f"{t}={n:,}" for t, n in result["rows"].items()))
+    print(f"{'route':<44} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/req':>8} {'err':>4}")
+    for name, r in result["routes"].items():
+        print(f"{name:<44} {r['req_per_s']:>8.0f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['sql_per_req']:>8.1f} {r['errors']:>4}")
+
+
+def compare(old_path, new_path):
+    """Print p50/p99/sql-per-request changes between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}")
+    for size, result in new["sizes"].items():
+        before = old["sizes"].get(size, {}).get("routes", {})
+        print(f"\n[{size}]")
+        print(f"{'route':<44} {'p50 ms':>16} {'p99 ms':>16} {'sql/req':>12}")
+        for name, r in result["routes"].items():
+            b = before.get(name)
+            if b is None:
+                print(f"{name:<44} {'(new)':>16}")
+                continue
+            print(f"{name:<44} {b['p50_ms']:>7.2f}->{r['p50_ms']:<8.2f} {b['p99_ms']:>7.2f}->{r['p99_ms']:<8.2f} "
+                  f"{b['sql_per_req']:>5.1f}->{r['sql_per_req']:<5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of every backend route")
+    parser.add_argument("--sizes", default="small,medium", help=f"comma separated, from {', '.join(SIZES)}")
+    parser.add_argument("--iterations", type=int, default=200, help="requests per route")
+    parser.add_argument("--routes", nargs="*", help="only routes whose name contains one of these")
+    parser.add_argument("--no-cache", action="store_true", help="clear the response cache before every request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="result file (default benchmarks/results/endpoints-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two result files and exit")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "database": "sqlite",
+        "iterations": args.iterations,
+        "no_cache": args.no_cache,
+        "sizes": {},
+    }
+    for size in args.sizes.split(","):
+        result = run_size(size, args)
+        report["sizes"][size] = result
+        print_table(size, result)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"endpoints-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nSaved {out}")
+
+
+if __name__ == "__main__":
+    main()
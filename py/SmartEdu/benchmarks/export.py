@@ -0,0 +1,102 @@
+# benchmarks/export.py
+# Run from py/SmartEdu:  python -m benchmarks.export --marks 3000000
+# Peak memory of a columnar export: streamed row groups (backend/export.py)
+# vs loading the table into pandas first. Each run gets a fresh process so
+# the peak RSS belongs to that export alone, and an untuned engine: the
+# 256 MB mmap / 64 MB page cache of SQLITE_PRAGMAS would otherwise show up
+# as RSS that grows with the database file, whichever way it is read.
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+from backend.database import make_engine, Base
+from backend import models
+
+CHUNK = 100_000
+
+
+def seed(engine, n_marks, rng):
+    Base.metadata.create_all(bind=engine)
+    n_students = 20_000
+    with engine.begin() as conn:
+        conn.execute(insert(models.Student), [
+            {"id": i + 1, "full_name": f"Student {i}", "class_name": f"{i % 5 + 1} A"} for i in range(n_students)
+        ])
+        start = date(2020, 1, 1)
+        for k in range(0, n_marks, CHUNK):
+            conn.execute(insert(models.StudentAttendance), [
+                {"student_id": n % n_students + 1, "date": start + timedelta(days=n // n_students),
+                 "is_present": rng.random() > 0.08}
+                for n in range(k, min(k + CHUNK, n_marks))
+            ])
+
+
+def _peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(mode, url, out, fmt):
+    """Child process: export student_attendance one way, return (rows, seconds, baseline MB, peak MB)"""
+    import pandas as pd
+    from backend import export
+
+    engine = make_engine(url, tuned=False)
+    baseline = _peak_mb()
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        if mode == "streamed":
+            with open(out, "wb") as f:
+                rows = export.write(conn, "student_attendance", f, fmt)
+        else:
+            df = pd.read_sql_table("student_attendance", conn)
+            df.to_parquet(out) if fmt == "parquet" else df.to_feather(out)
+            rows = len(df)
+    return rows, time.perf_counter() - started, baseline, _peak_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamed columnar export vs pandas load-then-write")
+    parser.add_argument("--marks", type=int, default=3_000_000, help="student_attendance rows")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    out_dir = tempfile.mkdtemp()
+    engine = make_engine(url)
+    results = []
+    try:
+        t0 = time.perf_counter()
+        seed(engine, args.marks, random.Random(args.seed))
+        engine.dispose()
+        print(f"Seeded {args.marks:,} attendance marks in {time.perf_counter() - t0:.1f}s")
+
+        ctx = multiprocessing.get_context("spawn")
+        for fmt in ("parquet", "arrow"):
+            for mode in ("pandas", "streamed"):
+                out = os.path.join(out_dir, f"{mode}.{fmt}")
+                with ctx.Pool(1) as pool:
+                    rows, seconds, baseline, peak = pool.apply(run, (mode, url, out, fmt))
+                results.append((fmt, mode, rows, seconds, peak - baseline, os.path.getsize(out)))
+                os.remove(out)
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.rmdir(out_dir)
+
+    for fmt, mode, rows, seconds, grown, size in results:
+        print(f"{fmt:8} {mode:9} {rows:>11,} rows  {seconds:6.1f} s  peak +{grown:7.0f} MB  file {size / 2**20:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
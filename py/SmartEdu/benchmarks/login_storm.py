@@ -0,0 +1,176 @@
+# benchmarks/login_storm.py
+# Run from py/SmartEdu:  python -m benchmarks.login_storm --concurrency 100
+# Fires a burst of logins while a probe keeps hitting GET /, once with the
+# hash computed inline on the event loop and once per hash-pool setting,
+# then times authenticated-request checks (token cache vs signature vs DB).
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def seed(database_url, n_users):
+    from sqlalchemy import insert
+    from backend.database import make_engine, Base
+    from backend import models
+    from backend.auth import hash_password
+
+    engine = make_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    password_hash = hash_password("123")
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"username": f"t{i}", "full_name": f"Teacher {i}", "password_hash": password_hash, "role": "teacher"}
+            for i in range(n_users)
+        ])
+    engine.dispose()
+
+
+class InlinePool:
+    """The naive version: hash right on the event loop"""
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+
+async def child(args):
+    """Runs inside a fresh interpreter so the AUTH_* settings are read before the app is imported"""
+    import httpx
+    from backend import auth
+    from backend.main import app
+
+    if args.inline:
+        auth.hash_pool = InlinePool()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up: first request builds the app / connection pool
+        await client.get("/")
+        login_latencies, probe_latencies = [], []
+        done = asyncio.Event()
+
+        async def login(i):
+            t0 = time.perf_counter()
+            r = await client.post("/users/login", json={"username": f"t{i % args.users}", "password": "123"})
+            if r.status_code == 200:
+                login_latencies.append(time.perf_counter() - t0)
+            return r.status_code
+
+        async def probe():
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.005)
+
+        prober = asyncio.create_task(probe())
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(login(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await prober
+
+    print(json.dumps({
+        "logins_per_s": results.count(200) / elapsed,
+        "ok": results.count(200),
+        "shed": results.count(503),
+        "login_p50_ms": percentile(login_latencies, 0.5),
+        "login_p99_ms": percentile(login_latencies, 0.99),
+        "probe_p99_ms": percentile(probe_latencies, 0.99),
+        "probe_max_ms": percentile(probe_latencies, 1.0),
+    }))
+
+
+def token_checks(n):
+    """Per-request cost of authenticating: cached token, fresh signature check, DB lookup by id"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from backend.database import Base
+    from backend import models
+    from backend.auth import TokenVerifier, issue_token
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user = models.User(username="t", full_name="Teacher", password_hash="x", role="teacher")
+        db.add(user)
+        db.commit()
+        token = issue_token(user)
+
+        timings = {}
+        cached = TokenVerifier()
+        t0 = time.perf_counter()
+        for _ in range(n):
+            cached.verify(token)
+        timings["token (cached)"] = time.perf_counter() - t0
+
+        uncached = TokenVerifier(size=0)
+        t0 = time.perf_counter()
+        for _ in range(n):
+            uncached.verify(token)
+        timings["token (HMAC)"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            db.query(models.User).filter(models.User.id == user.id).populate_existing().first()
+        timings["DB session lookup"] = time.perf_counter() - t0
+    return {k: v / n * 1e6 for k, v in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent logins: inline hashing vs the bounded hash pool")
+    parser.add_argument("--concurrency", type=int, default=100, help="logins fired at once")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--inline", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(child(args))
+        return
+
+    modes = [("inline", ["--inline"], args.workers, 10 ** 6), ("pool x1", [], 1, 10 ** 6)]
+    if args.workers > 1:
+        modes.append((f"pool x{args.workers}", [], args.workers, 10 ** 6))
+    modes.append((f"pool x{args.workers}, max {args.max_pending}", [], args.workers, args.max_pending))
+    print(f"{args.concurrency} logins at once while GET / is probed every 5 ms")
+    print(f"{'mode':<20} {'logins/s':>9} {'ok':>5} {'503':>5} {'p50 ms':>8} {'p99 ms':>8} {'GET / p99':>10} {'max':>8}")
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    try:
+        seed(url, args.users)
+        for label, flags, workers, max_pending in modes:
+            env = dict(os.environ, DATABASE_URL=url, AUTH_HASH_WORKERS=str(workers),
+                       AUTH_HASH_MAX_PENDING=str(max_pending), DB_POOL_SIZE="100", DB_MAX_OVERFLOW="100")
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.login_storm", "--child", *flags,
+                 "--concurrency", str(args.concurrency), "--users", str(args.users)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{label:<20} {r['logins_per_s']:>9.1f} {r['ok']:>5} {r['shed']:>5} {r['login_p50_ms']:>8.0f} "
+                  f"{r['login_p99_ms']:>8.0f} {r['probe_p99_ms']:>10.1f} {r['probe_max_ms']:>8.1f}")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    print("\nAuthenticating one request (µs)")
+    for label, us in token_checks(20000).items():
+        print(f"  {label:<18} {us:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/risk_scores.py
+# Run from py/SmartEdu:  python -m benchmarks.risk_scores --students 50000
+# "Top N at risk" from the stored, incrementally updated scores vs
+# recomputing from raw grades + attendance, plus what the upkeep costs the
+# roll-call and grade writes.
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+
+from backend.database import make_engine, Base
+from backend import models
+from backend.grade_summary import PASS_MARK, apply_grade_summary_rows
+from backend.risk_scores import rebuild, score_student, top_at_risk
+from backend.routers.attendance import upsert_student_attendance
+from backend.routers.grades import rebuild_grade_summaries
+
+SUBJECTS = ["Mathematics", "Science", "English", "Bahasa Melayu", "History",
+            "Geography", "Art", "Computer Science", "P.E.", "Moral"]
+
+
+def seed(engine, n_students, n_classes, n_days, rng):
+    Base.metadata.create_all(bind=engine)
+    classes = [f"{i % 5 + 1} {chr(65 + i // 5 % 26)}{i // 130 or ''}" for i in range(n_classes)]
+    start = date(2026, 1, 5)
+    days = [d for d in (start + timedelta(days=k) for k in range(n_days * 7 // 5 + 7)) if d.weekday() < 5][:n_days]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Student), [
+            {"id": i + 1, "full_name": f"Student {i}", "class_name": classes[i % n_classes]} for i in range(n_students)
+        ])
+        # A few students struggle: lower marks and more absences
+        ability = [rng.gauss(62, 14) for _ in range(n_students)]
+        absence = [0.02 if a > 45 else 0.2 for a in ability]
+        grades = [{"student_id": sid, "subject": s, "score": round(min(100, max(0, rng.gauss(ability[sid - 1], 12)))), "term": t}
+                  for sid in range(1, n_students + 1) for s in SUBJECTS for t in ("Mid-Term", "Finals")]
+        for k in range(0, len(grades), 50000):
+            conn.execute(insert(models.Grade), grades[k:k + 50000])
+        for day in days:
+            conn.execute(insert(models.StudentAttendance), [
+                {"student_id": sid, "date": day, "is_present": rng.random() > absence[sid - 1]} for sid in range(1, n_students + 1)
+            ])
+    return classes, days
+
+
+def from_scratch(db, class_name, limit):
+    """What a per-click list costs without stored scores: aggregate the class's raw rows"""
+    failed = models.Grade.score < PASS_MARK
+    grades = (
+        db.query(models.Grade.student_id, func.avg(models.Grade.score),
+                 func.count(func.distinct(case((failed, models.Grade.subject)))))
+        .join(models.Student, models.Student.id == models.Grade.student_id)
+        .filter(models.Student.class_name == class_name)
+        .group_by(models.Grade.student_id)
+        .all()
+    )
+    attendance = dict(
+        (sid, (n, absent)) for sid, n, absent in
+        db.query(models.StudentAttendance.student_id, func.count(), func.sum(case((models.StudentAttendance.is_present, 0), else_=1)))
+        .join(models.Student, models.Student.id == models.StudentAttendance.student_id)
+        .filter(models.Student.class_name == class_name)
+        .group_by(models.StudentAttendance.student_id)
+    )
+    scored = [(score_student(avg, failed, *attendance.get(sid, (0, 0)))[0], sid) for sid, avg, failed in grades]
+    return sorted(scored, reverse=True)[:limit]
+
+
+def timed(fn, repeat):
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stored at-risk scores vs recomputing per request")
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--classes", type=int, default=1500)
+    parser.add_argument("--days", type=int, default=40, help="school days of attendance")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = make_engine(f"sqlite:///{path}")
+    try:
+        t0 = time.perf_counter()
+        classes, days = seed(engine, args.students, args.classes, args.days, rng)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        print(f"Seeded {args.students:,} students, {args.students * len(SUBJECTS) * 2:,} grades, "
+              f"{args.students * len(days):,} attendance marks in {time.perf_counter() - t0:.1f}s")
+
+        with Session(engine) as db:
+            rebuild_grade_summaries(db)
+            t0 = time.perf_counter()
+            scored = rebuild(db.connection())
+            db.commit()
+            rebuild_s = time.perf_counter() - t0
+
+            sample = [rng.choice(classes) for _ in range(20)]
+            scratch_class = timed(lambda i: from_scratch(db, sample[i], args.top), len(sample))
+            stored_class = timed(lambda i: top_at_risk(db, sample[i], args.top), len(sample))
+            stored_school = timed(lambda i: top_at_risk(db, None, args.top), 20)
+
+            # Write costs: one class roll call and one grade, with the risk upkeep included
+            members = {c: [sid for (sid,) in db.query(models.Student.id).filter(models.Student.class_name == c)] for c in sample}
+            new_day = days[-1] + timedelta(days=7)
+
+            def roll_call(i):
+                marks = {sid: rng.random() > 0.1 for sid in members[sample[i]]}
+                upsert_student_attendance(db, new_day, marks)
+                db.commit()
+
+            def add_grade(i):
+                sid = rng.randint(1, args.students)
+                row = {"student_id": sid, "subject": "Mathematics", "score": rng.randint(0, 100), "term": "Finals"}
+                db.add(models.Grade(**row))
+                apply_grade_summary_rows(db, [row], {sid: classes[(sid - 1) % args.classes]})
+                db.commit()
+
+            roll_call_ms = timed(roll_call, len(sample))
+            grade_ms = timed(add_grade, 50)
+
+            incremental = {r.student_id: (r.score, r.days_recorded, r.days_absent) for r in db.query(models.StudentRiskScore)}
+            rebuild(db.connection())
+            db.commit()
+            db.expire_all()
+            rebuilt = {r.student_id: (r.score, r.days_recorded, r.days_absent) for r in db.query(models.StudentRiskScore)}
+            assert incremental == rebuilt, "incremental scores drifted from a full rebuild"
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    print(f"Incremental scores after {len(sample)} roll calls + 50 grades match a full rebuild ✅")
+    print(f"Full rebuild ({scored:,} students):        {rebuild_s * 1000:8.0f} ms (once)")
+    print(f"Top {args.top} of a class, from raw rows:      {scratch_class:8.2f} ms")
+    print(f"Top {args.top} of a class, stored scores:      {stored_class:8.2f} ms")
+    print(f"Top {args.top} of the school, stored scores:   {stored_school:8.2f} ms")
+    print(f"Roll call of a class (+ risk upkeep):  {roll_call_ms:8.2f} ms")
+    print(f"One grade (+ summary and risk upkeep): {grade_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/sqlite_tuning.py
+# Run from py/SmartEdu:  python -m benchmarks.sqlite_tuning --threads 16 --seconds 5
+# Mixed read/write traffic against a temp SQLite file, default pragmas vs the tuned engine.
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from backend.database import Base, make_engine
+from backend import models
+
+CLASSES = [f"Class {i}" for i in range(20)]
+SUBJECTS = ["Mathematics", "Science", "English", "History", "Art"]
+
+
+def seed(engine, n_students, rng):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Student), [
+            {"full_name": f"Student {i}", "class_name": rng.choice(CLASSES)} for i in range(n_students)
+        ])
+        conn.execute(insert(models.Grade), [
+            {"student_id": rng.randint(1, n_students), "subject": rng.choice(SUBJECTS), "score": rng.uniform(0, 100), "term": "Mid-Term"}
+            for _ in range(n_students * 5)
+        ])
+
+
+def worker(engine, n_students, write_ratio, deadline, seed_value, out):
+    rng = random.Random(seed_value)
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            with Session(engine) as db:
+                if rng.random() < write_ratio:
+                    # Like /attendance/clock-in or /grades/add: one small insert + commit
+                    db.add(models.Grade(student_id=rng.randint(1, n_students), subject=rng.choice(SUBJECTS), score=50, term="Finals"))
+                    db.commit()
+                else:
+                    # Like /grades/analytics: one aggregate over a class
+                    db.query(models.Student.id, func.avg(models.Grade.score)) \
+                        .join(models.Grade, models.Grade.student_id == models.Student.id) \
+                        .filter(models.Student.class_name == rng.choice(CLASSES)) \
+                        .group_by(models.Student.id).all()
+        except OperationalError:
+            errors += 1     # "database is locked"
+        latencies.append(time.perf_counter() - t0)
+    out.append((latencies, errors))
+
+
+def run(label, tuned, args):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        engine = make_engine(f"sqlite:///{path}", tuned=tuned, pool_size=args.threads, max_overflow=0)
+        seed(engine, args.students, random.Random(args.seed))
+
+        results = []
+        deadline = time.perf_counter() + args.seconds
+        threads = [
+            threading.Thread(target=worker, args=(engine, args.students, args.write_ratio, deadline, args.seed + i, results))
+            for i in range(args.threads)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        engine.dispose()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    latencies = sorted(l for lat, _ in results for l in lat)
+    errors = sum(e for _, e in results)
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{label:<10} {len(latencies) / args.seconds:>10.0f} {p(0.50):>9.2f} {p(0.99):>9.2f} "
+          f"{statistics.mean(latencies) * 1000:>9.2f} {errors:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite default vs tuned engine under mixed load")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:g}s each")
+    print(f"{'engine':<10} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'errors':>7}")
+    run("default", False, args)
+    run("tuned", True, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/substitute_index.py
+# Run from py/SmartEdu:  python -m benchmarks.substitute_index --teachers 500
+import argparse
+import random
+import time as clock
+from datetime import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import Base
+from backend import models
+from backend.substitute_index import BusyIndex, to_minutes
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+SUBJECTS = ["Mathematics", "Science", "English", "History", "Bahasa Melayu", "Art", "Geography", "P.E."]
+SLOTS = [(time(8, 0), time(9, 0)), (time(9, 0), time(10, 0)), (time(10, 30), time(11, 20)),
+         (time(11, 20), time(12, 10)), (time(12, 10), time(13, 0))]
+
+
+def build_dataset(session, n_teachers, rng):
+    """Random teachers, each with a few classes and BUSY blocks per day"""
+    teachers = [models.User(username=f"t{i}", full_name=f"Teacher {i}", password_hash="x", role="teacher", phone_number=None)
+                for i in range(n_teachers)]
+    session.add_all(teachers)
+    session.flush()
+
+    rows = []
+    for t in teachers:
+        subject = rng.choice(SUBJECTS)
+        for day in DAYS:
+            for start, end in rng.sample(SLOTS, rng.randint(1, 4)):
+                rows.append(models.Schedule(teacher_id=t.id, day_of_week=day, start_time=start, end_time=end, subject=subject, room="Class 1"))
+            if rng.random() < 0.3:
+                h = rng.randint(8, 12)
+                rows.append(models.TeacherAvailability(teacher_id=t.id, day_of_week=day, start_time=time(h, 0), end_time=time(h, 45), status="BUSY"))
+    session.add_all(rows)
+    session.commit()
+
+
+def brute_force(session, day, start, end, subject):
+    """The naive approach: pull every schedule and busy row, then check each teacher"""
+    start, end = to_minutes(start), to_minutes(end)
+    rows_by_teacher = {}
+    for s in session.query(models.Schedule):
+        rows_by_teacher.setdefault(s.teacher_id, []).append((s.day_of_week, s.start_time, s.end_time, s.subject))
+    for a in session.query(models.TeacherAvailability).filter(models.TeacherAvailability.status == "BUSY"):
+        rows_by_teacher.setdefault(a.teacher_id, []).append((a.day_of_week, a.start_time, a.end_time, None))
+
+    result = {}
+    for t in session.query(models.User).filter(models.User.role == "teacher"):
+        busy, teaches = False, False
+        for row_day, row_start, row_end, row_subject in rows_by_teacher.get(t.id, []):
+            teaches = teaches or row_subject == subject
+            if row_day == day and to_minutes(row_start) < end and start < to_minutes(row_end):
+                busy = True
+        if not busy:
+            result[t.id] = teaches
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busy-interval index vs brute-force scan")
+    parser.add_argument("--teachers", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top", type=int, default=10, help="candidates per answer, as /ai/recommend-substitute returns")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as session:
+        build_dataset(session, args.teachers, rng)
+
+        t0 = clock.perf_counter()
+        index = BusyIndex()
+        index.load(session)
+        build_ms = (clock.perf_counter() - t0) * 1000
+
+        queries = []
+        for _ in range(args.queries):
+            h = rng.randint(8, 12)
+            m = rng.choice([0, 20, 30])
+            queries.append((rng.choice(DAYS), f"{h:02d}:{m:02d}", f"{h + 1:02d}:{m:02d}", rng.choice(SUBJECTS)))
+
+        brute_total = index_total = top_total = cold_total = 0.0
+        anyone = session.query(models.User).first()
+        for day, start, end, subject in queries:
+            session.expire_all()
+            t0 = clock.perf_counter()
+            expected = brute_force(session, day, start, end, subject)
+            brute_total += clock.perf_counter() - t0
+
+            t0 = clock.perf_counter()
+            ranked = index.recommend(day, start, end, subject)
+            index_total += clock.perf_counter() - t0
+
+            got = {r["teacher_id"]: r["score"] > 10 for r in ranked}
+            assert got == expected, f"Mismatch for {day} {start}-{end} {subject}"
+            # Subject matches must always be ranked first
+            scores = [r["score"] for r in ranked]
+            assert scores == sorted(scores, reverse=True)
+
+            # What the route does: top N, from warm rankings and right after a write dropped them
+            t0 = clock.perf_counter()
+            top = index.recommend(day, start, end, subject, args.top)
+            top_total += clock.perf_counter() - t0
+            assert top == ranked[:args.top]
+
+            index.add_teacher(anyone)
+            t0 = clock.perf_counter()
+            index.recommend(day, start, end, subject, args.top)
+            cold_total += clock.perf_counter() - t0
+
+    n = len(queries)
+    print(f"Teachers: {args.teachers} | Queries: {n} | All results match brute force ✅")
+    print(f"Index build:      {build_ms:8.2f} ms (once)")
+    print(f"Brute-force scan: {brute_total / n * 1000:8.3f} ms/query")
+    print(f"Busy index, all:  {index_total / n * 1000:8.3f} ms/query")
+    print(f"Busy index, top {args.top}: {top_total / n * 1000:7.3f} ms/query")
+    print(f"  after a write:  {cold_total / n * 1000:8.3f} ms/query (rankings rebuilt)")
+
+
+if __name__ == "__main__":
+    main()
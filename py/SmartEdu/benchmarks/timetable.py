@@ -0,0 +1,129 @@
+# benchmarks/timetable.py
+# Run from py/SmartEdu:  python -m benchmarks.timetable --classes 100 --periods 8
+import argparse
+import math
+import random
+from collections import Counter
+
+from backend.timetable_solver import TimetableSolver, unavailable_slots
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+# Weekly lessons per subject at 8 periods a day; scaled to --periods
+CURRICULUM = {"Mathematics": 6, "Science": 5, "English": 5, "Bahasa Melayu": 5, "History": 4,
+              "Geography": 4, "Art": 3, "Computer Science": 4, "P.E.": 4}
+SPECIAL_ROOMS = {"Science": "Lab", "Computer Science": "Computer Room", "P.E.": "Field"}
+
+
+def make_slots(periods):
+    slots = []
+    for day in DAYS:
+        for p in range(periods):
+            start = 8 * 60 + p * 50
+            slots.append((day, f"{start // 60:02d}:{start % 60:02d}", f"{(start + 45) // 60:02d}:{(start + 45) % 60:02d}"))
+    return slots
+
+
+def make_problem(n_classes, periods, rng, load=30, busy_share=0.2):
+    """`load`: periods a week each teacher is staffed for; `busy_share`: teachers with a BUSY block"""
+    slots = make_slots(periods)
+    scale = len(slots) / sum(CURRICULUM.values())
+    hours = {s: max(1, round(h * scale)) for s, h in CURRICULUM.items()}
+    hours["Mathematics"] += len(slots) - sum(hours.values())      # every class fully booked
+    classes = {f"{form} {chr(65 + i // 5)}{i}": dict(hours) for i, form in zip(range(n_classes), [1, 2, 3, 4, 5] * n_classes)}
+
+    teacher_subjects, tid = {}, 1
+    for subject, h in hours.items():
+        per_teacher = max(1, load // h)             # classes one teacher can take
+        for _ in range(math.ceil(n_classes / per_teacher) + 1):
+            teacher_subjects[tid] = [subject]
+            tid += 1
+
+    busy = []
+    for t in teacher_subjects:
+        if rng.random() < busy_share:
+            day, start, end = rng.choice(slots)
+            busy.append((t, day, start, end))
+
+    subject_rooms = {}
+    for subject, prefix in SPECIAL_ROOMS.items():
+        needed = math.ceil(n_classes * hours[subject] / len(slots) * 1.2)
+        subject_rooms[subject] = [f"{prefix} {i + 1}" for i in range(needed)]
+    return slots, classes, teacher_subjects, unavailable_slots(slots, busy), subject_rooms
+
+
+def greedy(slots, classes, teacher_subjects, unavailable, subject_rooms):
+    """
+    First-fit under the same hard rules: each class/subject gets one teacher
+    round-robin, then every period each class takes its first remaining
+    lesson whose teacher and room are free; a period nobody fits stays empty
+    """
+    by_subject = {}
+    for t, subjects in teacher_subjects.items():
+        for s in subjects:
+            by_subject.setdefault(s, []).append(t)
+    next_pick = Counter()
+    todo = {}
+    for c, hours in classes.items():
+        todo[c] = []
+        for subject, h in hours.items():
+            pool = by_subject.get(subject)
+            if pool:
+                teacher = pool[next_pick[subject] % len(pool)]
+                next_pick[subject] += 1
+                todo[c] += [(subject, teacher)] * h
+    placed = 0
+    for s, _ in enumerate(slots):
+        busy = set()
+        for c, lessons in todo.items():
+            for k, (subject, teacher) in enumerate(lessons):
+                room = next((r for r in subject_rooms.get(subject, [c]) if r not in busy), None)
+                if teacher not in busy and room is not None and s not in unavailable.get(teacher, ()):
+                    busy.update((teacher, room))
+                    del lessons[k]
+                    placed += 1
+                    break
+    return placed
+
+
+def check(result, slots, unavailable):
+    """Independent clash check of the generated lessons"""
+    index = {(day, start): i for i, (day, start, _) in enumerate(slots)}
+    seen = Counter()
+    for lesson in result["lessons"]:
+        s = index[(lesson["day_of_week"], lesson["start_time"])]
+        for key in (("class", lesson["class_name"]), ("teacher", lesson["teacher_id"]), ("room", lesson["room"])):
+            seen[key + (s,)] += 1
+        assert s not in unavailable.get(lesson["teacher_id"], ()), "lesson in a BUSY block"
+    clashes = {k: v for k, v in seen.items() if v > 1}
+    assert not clashes, f"clashes: {list(clashes)[:5]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timetable solver at school scale")
+    parser.add_argument("--classes", type=int, default=100)
+    parser.add_argument("--periods", type=int, default=8, help="teaching periods per day (x5 days)")
+    parser.add_argument("--load", type=int, default=30, help="periods a week each teacher is staffed for")
+    parser.add_argument("--busy", type=float, default=0.2, help="share of teachers with a BUSY block")
+    parser.add_argument("--time-limit", type=float, default=55.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    slots, classes, teacher_subjects, unavailable, subject_rooms = make_problem(args.classes, args.periods, rng, args.load, args.busy)
+    solver = TimetableSolver(slots, classes, teacher_subjects, unavailable, subject_rooms, seed=args.seed)
+    result = solver.solve(time_limit=args.time_limit)
+    check(result, slots, unavailable)
+
+    stats = result["stats"]
+    requested = stats["lessons_requested"]
+    print(f"Classes: {args.classes} x {len(slots)} periods | Teachers: {len(teacher_subjects)} | "
+          f"Special rooms: {sum(len(r) for r in subject_rooms.values())} | No clashes ✅")
+    print(f"Greedy first-fit: {greedy(slots, classes, teacher_subjects, unavailable, subject_rooms):>6,}/{requested:,} lessons placed")
+    print(f"Solver:           {stats['lessons_placed']:>6,}/{requested:,} lessons placed in {stats['seconds']}s "
+          f"({stats['iterations']:,} iterations, {stats['soft_violations']} soft violations)")
+    for item in result["unfilled"][:10]:
+        print(f"   unfilled: {item['class_name']} / {item['subject']} x{item['lessons']} ({item['reason']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# frontend/api_client.py
+# Shared HTTP layer for the Streamlit views: one keep-alive session, timeouts,
+# st.cache_data per endpoint (cleared after writes) and parallel fetches.
+import contextvars
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.environ.get("EDUSMART_API_URL", "http://127.0.0.1:8000")
+TIMEOUT = (3.05, 15)   # (connect, read) seconds
+PAGE_SIZE = 1000       # server MAX_PAGE_SIZE
+PICKER_LIMIT = 200     # students offered in one selectbox; search narrows the rest
+ETAG_STORE_MAX = 512   # revalidation entries kept per Streamlit process
+
+
+class ApiError(Exception):
+    """Raised for non-2xx responses so failures are never cached"""
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        try:
+            self.detail = response.json().get("detail", response.text)
+        except ValueError:
+            self.detail = response.text
+        super().__init__(f"{response.status_code}: {self.detail}")
+
+
+# --- CONNECTION POOL ---
+
+@st.cache_resource
+def get_session():
+    """One pooled keep-alive session per Streamlit server process"""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Bearer token of the session whose script is running (set by app.py each run)
+_token = contextvars.ContextVar("api_token", default=None)
+
+
+def use_token(token):
+    _token.set(token)
+
+
+def _auth_headers(headers=None):
+    token = _token.get()
+    if not token:
+        return headers
+    return {**(headers or {}), "Authorization": f"Bearer {token}"}
+
+
+class EtagStore:
+    """
+    Bounded LRU of the last (etag, data, next_cursor) per request, so an
+    expired st.cache_data entry can revalidate with a cheap 304. Keys carry
+    the caller's identity: one user's body is never served on another's 304.
+    """
+
+    def __init__(self, max_entries=ETAG_STORE_MAX):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def _etag_store():
+    return EtagStore()
+
+
+def _identity():
+    """Digest of the bearer token (not the token itself) for cache keys"""
+    token = _token.get()
+    return hashlib.sha256(token.encode()).hexdigest()[:16] if token else None
+
+
+def get(path, params=None):
+    return get_session().get(f"{API_URL}{path}", params=params, headers=_auth_headers(), timeout=TIMEOUT)
+
+
+def post(path, json=None, data=None, params=None, timeout=TIMEOUT):
+    """POST, then drop any cached reads the write may have changed"""
+    res = get_session().post(f"{API_URL}{path}", json=json, data=data, params=params,
+                             headers=_auth_headers(), timeout=timeout)
+    if res.ok:
+        for prefix, fetchers in WRITE_INVALIDATES.items():
+            if path.startswith(prefix):
+                for fetcher in fetchers:
+                    fetcher.clear()
+    return res
+
+
+def get_page(path, params=None):
+    """(data, next_cursor); next_cursor is the X-Next-Cursor of a keyset-paged list, else None"""
+    store = _etag_store()
+    key = (_identity(), path, tuple(sorted((params or {}).items())))
+    cached = store.get(key)
+
+    headers = {"If-None-Match": cached[0]} if cached else None
+    res = get_session().get(f"{API_URL}{path}", params=params, headers=_auth_headers(headers), timeout=TIMEOUT)
+    if res.status_code == 304 and cached:
+        return cached[1], cached[2]
+    if not res.ok:
+        raise ApiError(res)
+
+    data, cursor = res.json(), res.headers.get("X-Next-Cursor")
+    if res.headers.get("ETag"):
+        store.put(key, (res.headers["ETag"], data, cursor))
+    return data, cursor
+
+
+def get_json(path, params=None):
+    return get_page(path, params)[0]
+
+
+def get_all_pages(path, params=None, page_size=PAGE_SIZE):
+    """Follow X-Next-Cursor to the end (for small reference lists like staff)"""
+    rows, cursor = [], 0
+    while cursor is not None:
+        page, cursor = get_page(path, dict(params or {}, limit=page_size, after_id=cursor))
+        rows.extend(page)
+    return rows
+
+
+# --- CACHED READS ---
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_teachers():
+    # Staff lists are small, but the server pages them: walk the cursor
+    return get_all_pages("/users/teachers", {"fields": "id,full_name"})
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_students(class_name, search=None, limit=PICKER_LIMIT):
+    """One class (optionally name-filtered), never the whole school"""
+    params = {"class_name": class_name, "fields": "id,full_name", "limit": limit}
+    if search:
+        params["q"] = search
+    return get_json("/students/all", params)
+
+
+@st.cache_data(ttl=120, show_spinner=False)
+def fetch_master_grid():
+    """Timetable already bucketed by (period, day) on the server"""
+    return get_json("/schedule/master/grid")
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_classes():
+    return get_json("/students/classes")
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_attendance(teacher_id):
+    return get_json(f"/attendance/view/{teacher_id}")
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_roll_call(class_name, day):
+    return get_json(f"/attendance/roll-call/{class_name}", {"date": day})
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_attendance_hours(start, end, by="month", teacher_id=None):
+    params = {"start": start, "end": end, "by": by}
+    if teacher_id is not None:
+        params["teacher_id"] = teacher_id
+    return get_json("/attendance/hours", params)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_terms():
+    return get_json("/grades/terms")
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_grade_distribution(class_name, term):
+    return get_json(f"/grades/analytics/{class_name}/distribution", {"term": term})
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def fetch_at_risk(class_name=None, limit=20):
+    params = {"limit": limit}
+    if class_name:
+        params["class_name"] = class_name
+    return get_json("/students/at-risk", params)
+
+
+# Write path prefix -> cached reads to clear when it succeeds
+WRITE_INVALIDATES = {
+    "/users/register": [fetch_teachers],
+    "/students/add": [fetch_students, fetch_classes],
+    "/grades/": [fetch_terms, fetch_grade_distribution, fetch_at_risk],     # add + bulk
+    "/schedule/": [fetch_master_grid],      # add + generate
+    "/attendance/": [fetch_attendance, fetch_roll_call, fetch_attendance_hours, fetch_at_risk],
+}
+
+
+# --- FAN-OUT ---
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api")
+
+
+def fetch_many(*calls):
+    """
+    Run several (fn, *args) fetches concurrently so a page pays ~one round trip.
+    Returns results in order; a failed call returns its exception instead of raising.
+    """
+    # Each worker runs in a copy of the caller's context so it sends the same token
+    futures = [_executor.submit(contextvars.copy_context().run, fn, *args) for fn, *args in calls]
+    results = []
+    for f in futures:
+        try:
+            results.append(f.result())
+        except Exception as e:
+            results.append(e)
+    return results
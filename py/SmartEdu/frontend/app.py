@@ -1,10 +1,14 @@
 import streamlit as st
+import api_client
 # Import the new views
-from views import auth_view, attendance_view, grades_view, schedule_view, admin_view
+from views import auth_view, attendance_view, roll_call_view, grades_view, schedule_view, admin_view
 
 st.set_page_config(page_title="EduSmart School System", layout="wide")
 st.title("🏫 EduSmart School Management")
 
+# Every API call this run carries the logged-in user's bearer token
+api_client.use_token(st.session_state.get('token'))
+
 # --- GLOBAL HELPER ---
 def require_login():
     if 'logged_in' not in st.session_state or not st.session_state['logged_in']:
@@ -17,6 +21,7 @@ menu = st.sidebar.selectbox(
     [
         "Home", 
         "Teacher Attendance", 
+        "Student Roll Call",
         "Student Grades", 
         "Schedule & Availability",
         "Admin Panel"
@@ -31,6 +36,10 @@ elif menu == "Teacher Attendance":
     require_login()
     attendance_view.show_attendance_page()
 
+elif menu == "Student Roll Call":
+    require_login()
+    roll_call_view.show_roll_call_page()
+
 elif menu == "Student Grades":
     require_login()
     grades_view.show_grades_page()
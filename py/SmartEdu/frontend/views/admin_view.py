@@ -1,7 +1,5 @@
 import streamlit as st
-import requests
-
-API_URL = "http://127.0.0.1:8000"
+import api_client
 
 def show_admin_page():
     # Only check for admin here if you want double security
@@ -13,14 +11,15 @@ def show_admin_page():
     st.write("Welcome, Admin. You have full control.")
 
     # Fetch teachers for Assign Schedule Tab
-    teachers_res = requests.get(f"{API_URL}/users/teachers")
     teacher_options = {}
-    if teachers_res.status_code == 200:
-        teachers = teachers_res.json()
+    try:
+        teachers = api_client.fetch_teachers()
         teacher_options = {t['full_name']: t['id'] for t in teachers}
+    except Exception:
+        pass
     
-    # 3 Tabs: Register Teacher, Add Student, Assign Schedule
-    tab1, tab2, tab3 = st.tabs(["Register Teacher", "Add Student", "Assign Class Schedule"])
+    # 4 Tabs: Register Teacher, Add Student, Assign Schedule, Generate Timetable
+    tab1, tab2, tab3, tab4 = st.tabs(["Register Teacher", "Add Student", "Assign Class Schedule", "Generate Timetable"])
     
     with tab1:
         with st.form("reg_teacher"):
@@ -31,7 +30,7 @@ def show_admin_page():
             
             if st.form_submit_button("Register"):
                 payload = {"username": new_user, "password": new_pass, "full_name": new_name, "role": "teacher", "phone_number": new_phone}
-                res = requests.post(f"{API_URL}/users/register", json=payload)
+                res = api_client.post("/users/register", json=payload)
                 if res.status_code == 200:
                     st.success("Teacher Created!")
                 else:
@@ -43,7 +42,7 @@ def show_admin_page():
             stu_class = st.text_input("Class Name")
             if st.form_submit_button("Add Student"):
                 payload = {"full_name": stu_name, "class_name": stu_class}
-                res = requests.post(f"{API_URL}/students/add", json=payload)
+                res = api_client.post("/students/add", json=payload)
                 if res.status_code == 200:
                     st.success("Student Added!")
                 else:
@@ -81,12 +80,71 @@ def show_admin_page():
                 }
                 
                 try:
-                    res = requests.post(f"{API_URL}/schedule/add", json=payload)
+                    res = api_client.post("/schedule/add", json=payload)
                     if res.status_code == 200:
                         st.success(f"✅ Assigned {subj_a} to {t_name} on {day_a}!")
+                    elif res.status_code == 409:
+                        detail = res.json()["detail"]
+                        st.error(f"⛔ {detail['message']}")
+                        st.dataframe(
+                            [{"clash": c["type"], "day": c["day"], "time": f"{c['start']} - {c['end']}",
+                              "subject": c["subject"] or "BUSY", "room": c["room"]} for c in detail["conflicts"]],
+                            width="stretch", hide_index=True,
+                        )
                     else:
-                        st.error("Failed to assign class.")
+                        st.error(res.json().get("detail", "Failed to assign class."))
                 except Exception as e:
                     st.error(f"Error: {e}")
+
+        st.divider()
+        if st.button("🔍 Check whole timetable for clashes"):
+            try:
+                report = api_client.get_json("/schedule/conflicts")
+                counts = report["counts"]
+                if not report["conflicts"]:
+                    st.success(f"✅ No clashes in {report['checked']['schedules']} class slots.")
+                else:
+                    st.warning(f"{counts['teacher']} teacher, {counts['room']} room and "
+                               f"{counts['availability']} availability clashes.")
+                    st.dataframe(
+                        [{"clash": c["type"], "day": c["day"], "time": f"{c['start']} - {c['end']}",
+                          "teacher_id": c["teacher_id"], "room": c["room"],
+                          "slots": ", ".join(f"{b['kind']} #{b['id']}" for b in c["bookings"])}
+                         for c in report["conflicts"]],
+                        width="stretch", hide_index=True,
+                    )
+            except Exception as e:
+                st.error(f"Error: {e}")
+    
+    with tab4:
+        st.subheader("Generate Whole-School Timetable")
+        st.caption("Classes take the subjects they are graded in; teachers keep the subjects they teach now. "
+                   "BUSY availability is respected.")
+        with st.form("generate_timetable_form"):
+            time_limit = st.slider("Search time (seconds)", 5, 120, 30)
+            max_load = st.number_input("Max periods per teacher (0 = no limit)", min_value=0, value=0)
+            apply = st.checkbox("Replace the current timetable with the result")
+            submitted = st.form_submit_button("🧩 Generate")
+
+        if submitted:
+            payload = {"time_limit": time_limit, "max_periods_per_teacher": max_load or None, "apply": apply}
+            try:
+                with st.spinner("Solving..."):
+                    res = api_client.post("/schedule/generate", json=payload, timeout=time_limit + 30)
+                if res.status_code == 200:
+                    result = res.json()
+                    stats = result["stats"]
+                    msg = f"{stats['lessons_placed']}/{stats['lessons_requested']} lessons placed in {stats['seconds']}s"
+                    if result["applied"] is not None:
+                        st.success(f"✅ Timetable replaced: {msg}.")
+                    else:
+                        st.info(f"Dry run: {msg}. Tick 'Replace' to apply it.")
+                    if result["unfilled"]:
+                        st.warning("These lessons could not be placed:")
+                        st.dataframe(result["unfilled"], width="stretch", hide_index=True)
+                else:
+                    st.error(res.json()["detail"])
+            except Exception as e:
+                st.error(f"Error: {e}")
     
     # ... (Copy the rest of the logic here) ...
\ No newline at end of file
@@ -1,16 +1,20 @@
 import streamlit as st
-import requests
 import pandas as pd
-
-API_URL = "http://127.0.0.1:8000"
+from datetime import date, timedelta
+import api_client
 
 def show_attendance_page():
     st.header("🕒 Teacher Clock-In / Clock-Out")
 
     try:
-        response = requests.get(f"{API_URL}/users/teachers")
-        if response.status_code == 200:
-            teachers = response.json()
+        # Teacher list + the logged-in user's history in one parallel round trip
+        my_id = st.session_state.get('user_id')
+        teachers, my_logs = api_client.fetch_many(
+            (api_client.fetch_teachers,),
+            (api_client.fetch_attendance, my_id),
+        ) if my_id else (api_client.fetch_teachers(), None)
+
+        if not isinstance(teachers, Exception):
             teacher_options = {t['full_name']: t['id'] for t in teachers}
             
             # Default to logged-in user if possible
@@ -23,10 +27,12 @@ def show_attendance_page():
             selected_id = teacher_options[selected_name]
 
             col1, col2 = st.columns(2)
+            wrote = False
             
             with col1:
                 if st.button("🟢 Clock In", width="stretch"):
-                    res = requests.post(f"{API_URL}/attendance/clock-in", json={"teacher_id": selected_id})
+                    res = api_client.post("/attendance/clock-in", json={"teacher_id": selected_id})
+                    wrote = True
                     if res.status_code == 200:
                         st.success(f"Success: {res.json()['message']}")
                     else:
@@ -34,7 +40,8 @@ def show_attendance_page():
 
             with col2:
                 if st.button("🔴 Clock Out", width="stretch"):
-                    res = requests.post(f"{API_URL}/attendance/clock-out", json={"teacher_id": selected_id})
+                    res = api_client.post("/attendance/clock-out", json={"teacher_id": selected_id})
+                    wrote = True
                     if res.status_code == 200:
                         st.warning(f"Success: {res.json()['message']}")
                     else:
@@ -42,15 +49,41 @@ def show_attendance_page():
 
             st.divider()
             st.subheader("📜 Your Attendance History")
-            history_res = requests.get(f"{API_URL}/attendance/view/{selected_id}")
-            if history_res.status_code == 200:
-                logs = history_res.json()
+            # The prefetched history is stale if we just clocked in/out (post() cleared the cache)
+            logs = my_logs if selected_id == my_id and not wrote else api_client.fetch_attendance(selected_id)
+            if not isinstance(logs, Exception):
                 if logs:
                     df = pd.DataFrame(logs)
                     df = df[["clock_in_time", "clock_out_time"]]
                     st.dataframe(df, width="stretch")
                 else:
                     st.info("No attendance records found.")
+
+            st.divider()
+            st.subheader("📊 Hours Worked")
+            today = date.today()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                start = st.date_input("From", value=today.replace(day=1) - timedelta(days=60))
+            with col2:
+                end = st.date_input("To", value=today)
+            with col3:
+                scope = st.radio("Show", ["Me", "All teachers"], horizontal=True)
+            if start > end:
+                st.warning("'From' must be on or before 'To'.")
+            else:
+                hours = api_client.fetch_attendance_hours(
+                    start.isoformat(), end.isoformat(),
+                    teacher_id=selected_id if scope == "Me" else None,
+                )
+                if hours:
+                    df = pd.DataFrame(hours)
+                    st.dataframe(
+                        df[["period", "name", "days_worked", "hours_worked", "avg_hours_per_day", "late_days", "missing_clock_outs"]],
+                        width="stretch", hide_index=True,
+                    )
+                else:
+                    st.info("No hours recorded in this range.")
         else:
             st.error("Could not load teachers list.")
     except Exception as e:
@@ -1,7 +1,5 @@
 import streamlit as st
-import requests
-
-API_URL = "http://127.0.0.1:8000"
+import api_client
 
 def show_login_page():
     st.image("https://img.freepik.com/free-vector/school-building-with-students_107791-12249.jpg", width=400)
@@ -12,6 +10,8 @@ def show_login_page():
         st.success(f"✅ You are logged in as {st.session_state['full_name']} ({st.session_state['role']})")
         if st.button("Logout"):
             st.session_state['logged_in'] = False
+            st.session_state.pop('token', None)
+            api_client.use_token(None)
             st.rerun()
     
     # If NOT logged in, show Login Form
@@ -23,7 +23,7 @@ def show_login_page():
         if st.button("Login"):
             try:
                 payload = {"username": username, "password": password}
-                res = requests.post(f"{API_URL}/users/login", json=payload)
+                res = api_client.post("/users/login", json=payload)
                 
                 if res.status_code == 200:
                     data = res.json()
@@ -31,8 +31,11 @@ def show_login_page():
                     st.session_state['role'] = data['role']
                     st.session_state['user_id'] = data['user_id']
                     st.session_state['full_name'] = data['full_name']
+                    st.session_state['token'] = data.get('access_token')
                     st.success("Login Successful!")
                     st.rerun() 
+                elif res.status_code == 503:
+                    st.warning("Server is busy, please try again in a moment.")
                 else:
                     st.error("Invalid Username or Password")
             except Exception as e:
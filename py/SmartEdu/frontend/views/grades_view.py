@@ -1,8 +1,6 @@
 import streamlit as st
-import requests
 import pandas as pd
-
-API_URL = "http://127.0.0.1:8000"
+import api_client
 
 def show_grades_page():
     st.header("📊 Student Performance Tracker")
@@ -15,12 +13,26 @@ def show_grades_page():
 
     # --- TAB 1: INDIVIDUAL (Your Old Code Moved Here) ---
     with tab1:
+        # Pick a class (and optionally search a name) first: the student list
+        # is one class, fetched once per rerun and shared by both forms below
+        try:
+            student_classes = api_client.fetch_classes()
+        except Exception:
+            student_classes = []
+        pick_class, pick_name = st.columns(2)
+        student_class = pick_class.selectbox("Class", student_classes, key="student_class")
+        name_search = pick_name.text_input("Search name", key="student_search").strip()
+        try:
+            students = api_client.fetch_students(student_class, name_search or None) if student_class else []
+        except Exception:
+            students = None
+        if students and len(students) >= api_client.PICKER_LIMIT:
+            st.caption(f"Showing the first {api_client.PICKER_LIMIT} students, search to narrow the list.")
+
         # A. Add New Grade
         with st.expander("➕ Add New Grade"):
             try:
-                stu_res = requests.get(f"{API_URL}/students/all")
-                if stu_res.status_code == 200:
-                    students = stu_res.json()
+                if students is not None:
                     if students:
                         stu_options = {s['full_name']: s['id'] for s in students}
                         
@@ -38,7 +50,7 @@ def show_grades_page():
                                     "score": score,
                                     "term": term
                                 }
-                                res = requests.post(f"{API_URL}/grades/add", json=payload)
+                                res = api_client.post("/grades/add", json=payload)
                                 if res.status_code == 200:
                                     st.success("Grade Added!")
                                 else:
@@ -50,20 +62,37 @@ def show_grades_page():
             except:
                 st.error("Backend offline.")
 
+        # A2. Bulk Upload (end of term)
+        with st.expander("📤 Bulk Upload Grades (CSV / NDJSON)"):
+            st.caption("CSV header: student_id,subject,score,term")
+            upload = st.file_uploader("Grades file", type=["csv", "ndjson", "jsonl"])
+            if upload and st.button("Upload Grades"):
+                fmt = "csv" if upload.name.endswith(".csv") else "ndjson"
+                try:
+                    res = api_client.post("/grades/bulk", params={"format": fmt}, data=upload.getvalue())
+                    if res.status_code == 200:
+                        report = res.json()
+                        st.success(f"✅ Imported {report['inserted']} grades.")
+                        if report["failed"]:
+                            st.warning(f"⚠️ {report['failed']} rows were rejected.")
+                            st.dataframe(report["errors"], width="stretch")
+                    else:
+                        st.error(res.text)
+                except Exception as e:
+                    st.error(f"Connection Error: {e}")
+
         st.divider()
 
         # B. View Individual Report
         st.subheader("🔎 View Student Report")
         try:
-            stu_res = requests.get(f"{API_URL}/students/all")
-            if stu_res.status_code == 200:
-                students = stu_res.json()
+            if students is not None:
                 stu_options = {s['full_name']: s['id'] for s in students}
                 
                 report_student_name = st.selectbox("Select Student to View", list(stu_options.keys()), key="report_select")
                 
                 if st.button("Get Report"):
-                    report_res = requests.get(f"{API_URL}/grades/student/{stu_options[report_student_name]}")
+                    report_res = api_client.get(f"/grades/student/{stu_options[report_student_name]}")
                     if report_res.status_code == 200:
                         grades_data = report_res.json()
                         df = pd.DataFrame(grades_data)
@@ -92,13 +121,16 @@ def show_grades_page():
         st.info("Identify students who are struggling across the class.")
         
         # Select Class
-        class_options = ["5 Science A", "4 Arts B", "3 Junior C"]
+        try:
+            class_options = api_client.fetch_classes() or ["5 Science A", "4 Arts B", "3 Junior C"]
+        except Exception:
+            class_options = ["5 Science A", "4 Arts B", "3 Junior C"]
         selected_class = st.selectbox("Select Class to Analyze", class_options)
         
         if st.button("📊 Analyze Class"):
             try:
                 # Call the NEW endpoint we added to main.py
-                res = requests.get(f"{API_URL}/grades/analytics/{selected_class}")
+                res = api_client.get(f"/grades/analytics/{selected_class}")
                 
                 if res.status_code == 200:
                     data = res.json()
@@ -116,20 +148,20 @@ def show_grades_page():
                         
                         st.divider()
                         
-                        # 2. "AT RISK" TABLE (Highlighted Red)
+                        # 2. "AT RISK" TABLE (stored scores: grades + attendance)
                         st.write("### 🚨 Intervention Needed (At-Risk Students)")
-                        st.caption("Students failing 1 or more subjects (< 40 marks).")
-                        
-                        at_risk_df = df[df["failed_count"] > 0].copy()
-                        
-                        if not at_risk_df.empty:
-                            # Simple styling: Show data
+                        st.caption("Risk score 0-100 from failing subjects, low averages and absences, highest first.")
+
+                        at_risk = api_client.fetch_at_risk(selected_class)
+                        if at_risk:
+                            at_risk_df = pd.DataFrame(at_risk)
+                            at_risk_df["reasons"] = at_risk_df["reasons"].str.join("; ")
                             st.dataframe(
-                                at_risk_df[["name", "average", "failed_subjects", "failed_count"]],
-                                width="stretch"
+                                at_risk_df[["name", "score", "reasons", "grade_average", "attendance_rate"]],
+                                width="stretch", hide_index=True
                             )
                         else:
-                            st.success("🎉 Amazing! No students are failing in this class.")
+                            st.success("🎉 Amazing! No students are at risk in this class.")
 
                         st.divider()
 
@@ -145,3 +177,66 @@ def show_grades_page():
                     st.error("Error fetching analytics.")
             except Exception as e:
                 st.error(f"Connection Error: {e}")
+
+        st.divider()
+
+        # 4. DISTRIBUTION & RANKS (per term, against the rest of the form)
+        st.write("### 📐 Score Distribution & Rankings")
+        try:
+            terms = api_client.fetch_terms()
+        except Exception:
+            terms = []
+        if terms:
+            term = st.selectbox("Term", terms, index=len(terms) - 1, key="dist_term")
+            try:
+                dist = api_client.fetch_grade_distribution(selected_class, term)
+            except api_client.ApiError as e:
+                dist = None
+                if e.status_code == 404:
+                    st.info(f"No {term} grades for this class.")
+                else:
+                    st.error(e.detail)
+            except Exception as e:
+                dist = None
+                st.error(f"Connection Error: {e}")
+
+            if dist:
+                st.caption(f"{dist['class_size']} students in class, {dist['cohort_size']} in Form {dist['cohort']}.")
+                subjects_df = pd.DataFrame(dist["subjects"])
+                subjects_df["form_median"] = [s["cohort"]["p50"] for s in dist["subjects"]]
+                st.dataframe(
+                    subjects_df[["subject", "count", "mean", "p25", "p50", "p75", "p90", "form_median", "pass_rate"]],
+                    width="stretch", hide_index=True
+                )
+
+                subject = st.selectbox("Histogram", subjects_df["subject"], key="dist_subject")
+                row = next(s for s in dist["subjects"] if s["subject"] == subject)
+                edges = dist["histogram_edges"]
+                st.bar_chart(pd.DataFrame(
+                    {"students": row["histogram"]},
+                    index=[f"{lo}-{hi - 1 if hi < 100 else 100}" for lo, hi in zip(edges, edges[1:])]
+                ))
+
+                ranks = pd.DataFrame([
+                    {"name": s["name"], "average": s["average"], "class rank": s["class_rank"],
+                     "form rank": s["cohort_rank"], "percentile": s["percentile"],
+                     f"{subject} rank": s["subjects"].get(subject, {}).get("class_rank")}
+                    for s in dist["students"]
+                ])
+                st.dataframe(ranks, width="stretch", hide_index=True)
+        else:
+            st.info("No grades recorded yet.")
+
+        st.divider()
+
+        # 5. REPORT CARDS (one zip for the class, built server-side)
+        if st.button("🗂️ Prepare Report Cards"):
+            try:
+                res = api_client.get("/grades/report-cards", params={"class_name": selected_class})
+                if res.status_code == 200:
+                    st.download_button("⬇️ Download Report Cards (.zip)", res.content,
+                                       file_name=f"report-cards-{selected_class}.zip", mime="application/zip")
+                else:
+                    st.error(res.text)
+            except Exception as e:
+                st.error(f"Connection Error: {e}")
@@ -0,0 +1,69 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+import api_client
+
+def show_roll_call_page():
+    st.header("🙋 Student Roll Call")
+
+    try:
+        classes = api_client.fetch_classes()
+    except Exception as e:
+        st.error(f"Connection Error: {e}")
+        return
+    if not classes:
+        st.info("No classes yet. Add students first.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        class_name = st.selectbox("Class", classes)
+    with col2:
+        day = st.date_input("Date", value=date.today())
+
+    try:
+        roll = api_client.fetch_roll_call(class_name, day.isoformat())
+    except Exception as e:
+        st.error(f"Connection Error: {e}")
+        return
+    if not roll["students"]:
+        st.info("No students in this class.")
+        return
+
+    # Whole class in one editable grid; unmarked students default to present
+    df = pd.DataFrame(roll["students"])
+    taken = df["is_present"].notna().any()
+    df["is_present"] = df["is_present"].fillna(True).astype(bool)
+    if taken:
+        st.caption("Roll call already taken for this day. Saving again overwrites it.")
+
+    with st.form("roll_call_form"):
+        edited = st.data_editor(
+            df[["student_id", "full_name", "is_present"]],
+            column_config={
+                "student_id": st.column_config.NumberColumn("ID", disabled=True),
+                "full_name": st.column_config.TextColumn("Student", disabled=True),
+                "is_present": st.column_config.CheckboxColumn("Present"),
+            },
+            hide_index=True,
+            width="stretch",
+            key=f"roll_{class_name}_{day}",
+        )
+        submitted = st.form_submit_button("💾 Save Roll Call")
+
+    if submitted:
+        entries = [
+            {"student_id": int(r.student_id), "is_present": bool(r.is_present)}
+            for r in edited.itertuples()
+        ]
+        try:
+            res = api_client.post("/attendance/roll-call", json={
+                "class_name": class_name, "date": day.isoformat(), "entries": entries
+            })
+            if res.status_code == 200:
+                result = res.json()
+                st.success(f"✅ Saved: {result['present']} present, {result['absent']} absent.")
+            else:
+                st.error(res.json()["detail"])
+        except Exception as e:
+            st.error(f"Connection Error: {e}")
@@ -1,16 +1,83 @@
 import streamlit as st
-import requests
 import urllib.parse
 import textwrap
-
-API_URL = "http://127.0.0.1:8000"
+import api_client
+
+COLOR_MAP = {
+    "Mathematics": "#e3f2fd", 
+    "Science":     "#e8f5e9", 
+    "English":     "#fff3e0", 
+    "History":     "#fff9c4", 
+    "Physics":     "#f3e5f5", 
+    "Default":     "#f5f5f5"
+}
+
+# 🔥 FIX: Added 'color: #000000;' to .badge to force black text
+HTML_START = textwrap.dedent("""
+<style>
+    table {width: 100%; border-collapse: collapse; font-family: sans-serif; font-size: 12px;}
+    th {background-color: #424242; color: white; padding: 10px; text-align: center;}
+    td {border: 1px solid #ddd; padding: 5px; vertical-align: top; height: 100px;}
+    .badge {
+        display: block; 
+        padding: 4px; 
+        margin-bottom: 4px; 
+        border-radius: 4px; 
+        border-left: 4px solid #555; 
+        box-shadow: 1px 1px 3px rgba(0,0,0,0.1);
+        color: #000000 !important; /* <--- FORCES BLACK TEXT */
+    }
+    .teacher-name {font-weight: bold; font-size: 11px; color: #000000 !important;}
+    .room-name {font-size: 10px; color: #333333 !important;}
+</style>
+<table>
+    <thead>
+        <tr>
+            <th style="width:10%;">Time</th>
+            <th style="width:18%;">Monday</th>
+            <th style="width:18%;">Tuesday</th>
+            <th style="width:18%;">Wednesday</th>
+            <th style="width:18%;">Thursday</th>
+            <th style="width:18%;">Friday</th>
+        </tr>
+    </thead>
+    <tbody>
+""")
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def render_grid_html(version, _grid):
+    """Build the timetable HTML once per schedule version (the grid itself is not hashed)"""
+    parts = [HTML_START]
+    for slot in _grid["slots"]:
+        if slot["is_break"]:
+            parts.append(f"<tr style='background-color: #eee;'><td style='font-weight:bold; text-align:center; color:#000;'>{slot['label']} (BREAK)</td><td colspan='5' style='text-align:center; color:#555; font-style:italic;'>☕ LUNCH BREAK</td></tr>")
+            continue
+
+        # Make the time column explicitly black too for visibility
+        parts.append(f"<tr><td style='font-weight:bold; text-align:center; color: #e0e0e0;'>{slot['label']}</td>")
+        for day in _grid["days"]:
+            parts.append("<td>")
+            for c in slot["cells"][day]:
+                bg_color = COLOR_MAP.get(c['subject'], COLOR_MAP["Default"])
+                parts.append(f"""<div class="badge" style="background-color: {bg_color};">
+<div class="teacher-name">👤 {c['teacher']}</div>
+<div>📘 {c['subject']}</div>
+<div class="room-name">📍 {c['room']}</div>
+</div>""")
+            parts.append("</td>")
+        parts.append("</tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
 
 def show_schedule_page():
     st.header("📅 Schedule & Substitution Center")
 
-    teachers_res = requests.get(f"{API_URL}/users/teachers")
-    if teachers_res.status_code == 200:
-        teachers = teachers_res.json()
+    try:
+        teachers = api_client.fetch_teachers()
+    except Exception:
+        teachers = None
+
+    if teachers is not None:
         teacher_options = {t['full_name']: t['id'] for t in teachers}
         
         current_user = st.session_state.get('full_name', list(teacher_options.keys())[0])
@@ -31,108 +98,12 @@ def show_schedule_page():
 
             if st.button("🔄 Refresh Master Schedule"):
                 try:
-                    res = requests.get(f"{API_URL}/schedule/master")
-                    if res.status_code == 200:
-                        data = res.json()
-                        
-                        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-                        time_map = {
-                            "08:00": "08:00 - 09:00",
-                            "09:00": "09:00 - 10:00",
-                            "10:00": "10:00 - 10:30 (BREAK)",
-                            "10:30": "10:30 - 11:20",
-                            "11:20": "11:20 - 12:10",
-                            "12:10": "12:10 - 01:00"
-                        }
-                        
-                        schedule_grid = {t: {d: [] for d in days} for t in time_map.values()}
-                        
-                        for item in data:
-                            d = item['day']
-                            s = item['start']
-                            
-                            slot_key = None
-                            if s.startswith("08"): slot_key = time_map["08:00"]
-                            elif s.startswith("09"): slot_key = time_map["09:00"]
-                            elif s.startswith("10") and int(s[3:5]) >= 30: slot_key = time_map["10:30"]
-                            elif s.startswith("11"): slot_key = time_map["11:20"]
-                            elif s.startswith("12"): slot_key = time_map["12:10"]
-                            
-                            if slot_key and d in days:
-                                schedule_grid[slot_key][d].append(item)
-
-                        color_map = {
-                            "Mathematics": "#e3f2fd", 
-                            "Science":     "#e8f5e9", 
-                            "English":     "#fff3e0", 
-                            "History":     "#fff9c4", 
-                            "Physics":     "#f3e5f5", 
-                            "Default":     "#f5f5f5"
-                        }
-
-                        # 🔥 FIX: Added 'color: #000000;' to .badge to force black text
-                        html_start = textwrap.dedent("""
-                        <style>
-                            table {width: 100%; border-collapse: collapse; font-family: sans-serif; font-size: 12px;}
-                            th {background-color: #424242; color: white; padding: 10px; text-align: center;}
-                            td {border: 1px solid #ddd; padding: 5px; vertical-align: top; height: 100px;}
-                            .badge {
-                                display: block; 
-                                padding: 4px; 
-                                margin-bottom: 4px; 
-                                border-radius: 4px; 
-                                border-left: 4px solid #555; 
-                                box-shadow: 1px 1px 3px rgba(0,0,0,0.1);
-                                color: #000000 !important; /* <--- FORCES BLACK TEXT */
-                            }
-                            .teacher-name {font-weight: bold; font-size: 11px; color: #000000 !important;}
-                            .room-name {font-size: 10px; color: #333333 !important;}
-                        </style>
-                        <table>
-                            <thead>
-                                <tr>
-                                    <th style="width:10%;">Time</th>
-                                    <th style="width:18%;">Monday</th>
-                                    <th style="width:18%;">Tuesday</th>
-                                    <th style="width:18%;">Wednesday</th>
-                                    <th style="width:18%;">Thursday</th>
-                                    <th style="width:18%;">Friday</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                        """)
-                        
-                        html_body = ""
-                        for time_slot, row_data in schedule_grid.items():
-                            if "BREAK" in time_slot:
-                                html_body += f"<tr style='background-color: #eee;'><td style='font-weight:bold; text-align:center; color:#000;'>{time_slot}</td><td colspan='5' style='text-align:center; color:#555; font-style:italic;'>☕ LUNCH BREAK</td></tr>"
-                                continue
-
-                            # Make the time column explicitly black too for visibility
-                            html_body += f"<tr><td style='font-weight:bold; text-align:center; color: #e0e0e0;'>{time_slot}</td>"
-                            
-                            for day in days:
-                                classes = row_data[day]
-                                cell_content = ""
-                                for c in classes:
-                                    bg_color = color_map.get(c['subject'], color_map["Default"])
-                                    card_html = f"""<div class="badge" style="background-color: {bg_color};">
-<div class="teacher-name">👤 {c['teacher']}</div>
-<div>📘 {c['subject']}</div>
-<div class="room-name">📍 {c['room']}</div>
-</div>"""
-                                    cell_content += card_html
-                                    
-                                html_body += f"<td>{cell_content}</td>"
-                            html_body += "</tr>"
-                        
-                        html_end = "</tbody></table>"
-                        
-                        full_html = html_start + html_body + html_end
-                        st.markdown(full_html, unsafe_allow_html=True)
-
-                    else:
-                        st.error("Could not fetch Master Schedule.")
+                    # Explicit refresh: drop the TTL copy; the ETag makes an unchanged timetable a cheap 304
+                    api_client.fetch_master_grid.clear()
+                    grid = api_client.fetch_master_grid()
+                    st.markdown(render_grid_html(grid["version"], grid), unsafe_allow_html=True)
+                    if grid["unslotted"]:
+                        st.caption(f"⚠️ {len(grid['unslotted'])} classes start outside the regular periods and are not shown.")
                 except Exception as e:
                     st.error(f"Error: {e}")
 
@@ -155,7 +126,7 @@ def show_schedule_page():
                         "end_time": str(end),
                         "status": "BUSY"
                     }
-                    res = requests.post(f"{API_URL}/availability/set", json=payload)
+                    res = api_client.post("/availability/set", json=payload)
                     if res.status_code == 200:
                         st.success("Availability updated!")
                     else:
@@ -193,12 +164,12 @@ def show_schedule_page():
 
                 try:
                     with st.spinner("🤖 AI is checking everyone's schedule..."):
-                        res = requests.post(f"{API_URL}/ai/recommend-substitute", json=payload)
+                        res = api_client.post("/ai/recommend-substitute", json=payload)
                     
                     if res.status_code == 200:
                         candidates = res.json()
                         if candidates:
-                            st.success(f"✅ Found {len(candidates)} available teachers!")
+                            st.success(f"✅ Top {len(candidates)} available teachers!")
                             
                             for t in candidates:
                                 # LOGIC: High Score (>10) means they teach the same subject
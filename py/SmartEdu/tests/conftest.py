@@ -0,0 +1,27 @@
+# tests/conftest.py
+# Run from py/SmartEdu:  python -m pytest -q
+# The backend reads its settings at import time, so they are pinned here,
+# before any test module imports it: a throwaway SQLite file, the sync
+# routers and STRICT_LOADING (every relationship lazy="raise").
+import os
+import sys
+import tempfile
+
+_fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(_fd)
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{DB_PATH}",
+    "STRICT_LOADING": "1",
+    "ASYNC_DB": "0",
+    "AUTH_REQUIRED": "0",
+    "METRICS_ENABLED": "0",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    from backend.database import engine
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
@@ -0,0 +1,41 @@
+# tests/test_attendance_writer.py
+# The write-behind writer is a single thread: a failure while committing
+# a batch must reach that batch's callers and leave the thread running.
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from backend.attendance_writer import GroupCommitWriter
+from backend.database import Base, SessionLocal, engine
+from backend import models
+
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(insert(models.User), [{"id": 1, "username": "teacher1", "full_name": "Teacher 1", "role": "teacher"}])
+
+
+def clock_in(teacher_id=1):
+    return {"action": "in", "teacher_id": teacher_id, "at": datetime(2026, 1, 5, 8), "key": None}
+
+
+def test_writer_survives_a_failing_session_factory():
+    seed()
+    broken = True
+
+    def session_factory():
+        if broken:
+            raise RuntimeError("database unavailable")
+        return SessionLocal()
+
+    writer = GroupCommitWriter(session_factory)
+    with pytest.raises(RuntimeError, match="database unavailable"):
+        writer.submit(clock_in()).result(timeout=5)
+
+    broken = False
+    result = writer.submit(clock_in()).result(timeout=5)
+    assert result["message"] and writer._thread.is_alive()
@@ -0,0 +1,65 @@
+# tests/test_auth.py
+# AUTH_REQUIRED is off for the rest of the suite, so the middleware is
+# exercised here on its own around a stub app.
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient as AppClient
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+from backend import auth
+from backend.main import app
+
+
+def guarded_client():
+    return TestClient(auth.AuthMiddleware(PlainTextResponse("ok")))
+
+
+def test_slow_query_log_needs_a_token():
+    client = guarded_client()
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics/slow-queries").status_code == 401
+
+
+def test_token_opens_protected_paths():
+    class User:
+        id, full_name, role = 1, "Teacher 1", "teacher"
+
+    token = auth.issue_token(User())
+    response = guarded_client().get("/metrics/slow-queries", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+def test_unverifiable_hashes_fail_the_login():
+    for stored in ("scrypt$16384$8$1$only-five", "scrypt$16384$8$1$%%%$%%%", "scrypt$0$8$1$AAAA$AAAA",
+                   "$2b$12$" + "x" * 53, "$argon2id$v=19$m=65536,t=3,p=4$abc$def"):
+        assert auth.verify_password(stored, "secret") is False
+        assert asyncio.run(auth.check_login(stored, "secret")) == (False, None)
+
+
+def test_register_hashes_on_the_pool(monkeypatch):
+    threads = []
+    hash_password = auth.hash_password
+
+    def recording_hash(password):
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+
+    monkeypatch.setattr(auth, "hash_password", recording_hash)
+    client = AppClient(app)
+    user = {"username": "register-test", "password": "secret", "full_name": "R", "phone_number": "1"}
+    assert client.post("/users/register", json=user).status_code == 200
+    assert threads and all(name.startswith("auth-hash") for name in threads)
+    assert client.post("/users/register", json=user).status_code == 400
+    assert client.post("/users/login", json={"username": "register-test", "password": "secret"}).status_code == 200
+
+
+def test_register_is_503_when_the_pool_is_full(monkeypatch):
+    async def overloaded(fn, *args):
+        raise auth.Overloaded("busy")
+
+    monkeypatch.setattr(auth.hash_pool, "run", overloaded)
+    user = {"username": "register-busy", "password": "secret", "full_name": "R", "phone_number": "1"}
+    response = AppClient(app).post("/users/register", json=user)
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
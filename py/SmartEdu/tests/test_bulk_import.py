@@ -0,0 +1,54 @@
+# tests/test_bulk_import.py
+# A line that can't be decoded or parsed is reported against its row and
+# skipped; the rest of the body is still imported.
+import csv
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from backend.database import Base, engine
+from backend.main import app
+from backend import models
+from backend.response_cache import response_cache
+
+client = TestClient(app)
+
+HEADER = b"student_id,subject,score,term\n"
+
+
+def seed():
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(insert(models.Student), [{"id": 1, "full_name": "Student 1", "class_name": "1 A"}])
+    response_cache.clear()
+
+
+def bulk(body, content_type="text/csv"):
+    response = client.post("/grades/bulk", content=body, headers={"content-type": content_type})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_invalid_utf8_is_a_row_error():
+    seed()
+    report = bulk(HEADER + b"1,Art,70,Finals\n1,Art\xff\xfe,70,Finals\n1,Music,80,Finals\n")
+    assert report["inserted"] == 2 and report["failed"] == 1
+    assert report["errors"][0]["row"] == 3 and "utf-8" in report["errors"][0]["error"]
+
+    report = bulk(b'{"student_id": 1, "subject": "\xff", "score": 1, "term": "Finals"}\n', "application/x-ndjson")
+    assert report["inserted"] == 0 and report["failed"] == 1
+
+
+def test_csv_error_is_a_row_error():
+    seed()
+    oversized = b"1," + b"x" * (csv.field_size_limit() + 1) + b",70,Finals\n"
+    report = bulk(HEADER + oversized + b"1,Music,80,Finals\n")
+    assert report["inserted"] == 1 and report["failed"] == 1
+    assert report["errors"][0]["row"] == 2
+
+
+def test_unreadable_header_is_400():
+    seed()
+    response = client.post("/grades/bulk", content=b"student_id,\xff\n1,Art,70,Finals\n", headers={"content-type": "text/csv"})
+    assert response.status_code == 400
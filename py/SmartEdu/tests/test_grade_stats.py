@@ -0,0 +1,79 @@
+# tests/test_grade_stats.py
+# Only real (class, term) reports are cached: a junk term or class is a 404
+# that leaves the cached terms alone, and terms build independently.
+import threading
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from backend import grade_stats as grade_stats_module
+from backend.database import Base, SessionLocal, engine
+from backend.grade_stats import GradeStatsCache, grade_stats
+from backend.main import app
+from backend import models
+from backend.response_cache import response_cache
+
+client = TestClient(app)
+
+TERMS = ("Term 1", "Term 2")
+
+
+def seed():
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(insert(models.Student), [
+            {"id": s, "full_name": f"Student {s}", "class_name": "1 A"} for s in (1, 2)
+        ])
+        conn.execute(insert(models.Grade), [
+            {"student_id": s, "subject": "Art", "score": 50 + s, "term": term} for s in (1, 2) for term in TERMS
+        ])
+    grade_stats.invalidate()
+    response_cache.clear()
+
+
+def distribution(class_name, term):
+    return client.get(f"/grades/analytics/{class_name}/distribution", params={"term": term})
+
+
+def test_unknown_terms_and_classes_are_not_cached():
+    seed()
+    grade_stats.max_terms = 1
+    try:
+        assert distribution("1 A", "Term 1").status_code == 200
+        for junk in ("Term 9", "x", "y"):
+            assert distribution("1 A", junk).status_code == 404
+        assert distribution("9 Z", "Term 1").status_code == 404
+        snapshot = grade_stats.snapshot()
+        assert snapshot["terms"] == ["Term 1"] and snapshot["reports"] == 1
+        assert set(grade_stats._build_locks) == {"Term 1"}
+    finally:
+        grade_stats.max_terms = grade_stats_module.MAX_TERMS
+
+
+def test_terms_build_under_their_own_lock(monkeypatch):
+    seed()
+    cache = GradeStatsCache()
+    load_term = grade_stats_module.load_term
+    term_1_started, term_2_built = threading.Event(), threading.Event()
+
+    def slow_load(db, term):
+        if term == "Term 1":
+            term_1_started.set()
+            assert term_2_built.wait(5), "Term 2 waited for Term 1's build"
+        return load_term(db, term)
+
+    monkeypatch.setattr(grade_stats_module, "load_term", slow_load)
+
+    def build(term, done=None):
+        with SessionLocal() as db:
+            assert cache.report(db, "1 A", term) is not None
+        if done:
+            done.set()
+
+    first = threading.Thread(target=build, args=("Term 1",))
+    first.start()
+    assert term_1_started.wait(5)
+    build("Term 2", term_2_built)
+    first.join(5)
+    assert not first.is_alive() and cache.stats["term_builds"] == 2
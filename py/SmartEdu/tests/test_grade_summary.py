@@ -0,0 +1,63 @@
+# tests/test_grade_summary.py
+# Summary counters are moved in SQL, so a write from a session holding an
+# older copy of the row still adds to what is committed, and the running
+# totals always agree with a rebuild from the raw grades.
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from backend.database import Base, SessionLocal, engine
+from backend.grade_summary import apply_grade_summary_rows
+from backend.main import app
+from backend import models
+from backend.response_cache import response_cache
+
+client = TestClient(app)
+
+
+def seed():
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(insert(models.Student), [
+            {"id": s, "full_name": f"Student {s}", "class_name": "1 A"} for s in (1, 2)
+        ])
+    response_cache.clear()
+
+
+def summaries():
+    with SessionLocal() as db:
+        return {
+            s.student_id: (s.grade_count, s.score_total, s.failed_count, set(filter(None, s.failed_subjects.split(","))))
+            for s in db.query(models.StudentGradeSummary)
+        }
+
+
+def add(db, sid, subject, score):
+    db.add(models.Grade(student_id=sid, subject=subject, score=score, term="Finals"))
+    apply_grade_summary_rows(db, [{"student_id": sid, "subject": subject, "score": score}], {sid: "1 A"})
+    db.commit()
+
+
+def test_stale_session_does_not_lose_an_update():
+    seed()
+    with SessionLocal() as first, SessionLocal() as second:
+        add(first, 1, "Art", 30)
+        held = second.query(models.StudentGradeSummary).one()     # second now holds grade_count=1
+        add(first, 1, "Music", 80)
+        add(second, 1, "History", 20)
+        assert held.grade_count == 3
+    assert summaries()[1] == (3, 130.0, 2, {"Art", "History"})
+
+
+def test_incremental_totals_match_a_rebuild():
+    seed()
+    grades = [(1, "Art", 30), (1, "Art", 35), (1, "Music", 90), (2, "History", 10), (2, "Art", 39), (2, "Art", 100)]
+    with SessionLocal() as db:
+        add(db, *grades[0])
+    body = "student_id,subject,score,term\n" + "".join(f"{sid},{subject},{score},Finals\n" for sid, subject, score in grades[1:])
+    assert client.post("/grades/bulk", content=body, headers={"content-type": "text/csv"}).json()["inserted"] == 5
+
+    incremental = summaries()
+    assert incremental[1] == (3, 155.0, 2, {"Art"})
+    assert client.post("/grades/summary/rebuild").status_code == 200
+    assert summaries() == incremental
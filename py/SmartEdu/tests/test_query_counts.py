@@ -0,0 +1,101 @@
+# tests/test_query_counts.py
+# The list endpoints must cost the same number of SQL statements however
+# many rows they return (no N+1), and STRICT_LOADING must turn a stray
+# lazy load into an error instead of a hidden query per row.
+from contextlib import contextmanager
+from datetime import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from backend.database import Base, STRICT_LOADING, engine
+from backend.main import app
+from backend import models
+from backend.response_cache import response_cache
+
+SMALL, LARGE = 3, 60
+SUBJECTS = ["Mathematics", "Science", "English", "History"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+client = TestClient(app)
+
+
+def seed(size):
+    """`size` teachers with a lesson a day each, `size` students in "1 A" with a grade per subject"""
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(insert(models.User), [
+            {"id": t, "username": f"teacher{t}", "full_name": f"Teacher {t}", "role": "teacher"} for t in range(1, size + 1)
+        ])
+        conn.execute(insert(models.Schedule), [
+            {"teacher_id": t, "day_of_week": day, "start_time": time(8), "end_time": time(9),
+             "subject": SUBJECTS[t % len(SUBJECTS)], "room": f"Room {t}"}
+            for t in range(1, size + 1) for day in DAYS
+        ])
+        conn.execute(insert(models.Student), [
+            {"id": s, "full_name": f"Student {s}", "class_name": "1 A"} for s in range(1, size + 1)
+        ])
+        conn.execute(insert(models.Grade), [
+            {"student_id": s, "subject": subject, "score": (s * 7 + k * 13) % 100, "term": "Finals"}
+            for s in range(1, size + 1) for k, subject in enumerate(SUBJECTS)
+        ])
+    response_cache.clear()
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def queries_for(path, size, expected_rows, params=None):
+    seed(size)
+    with count_queries() as statements:
+        response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == expected_rows
+    return len(statements)
+
+
+@pytest.mark.parametrize("path, rows", [
+    ("/schedule/master", lambda n: n * len(DAYS)),
+    ("/grades/student/1", lambda n: len(SUBJECTS)),
+    ("/grades/analytics/1 A", lambda n: n),
+])
+def test_query_count_is_constant(path, rows):
+    small = queries_for(path, SMALL, rows(SMALL))
+    large = queries_for(path, LARGE, rows(LARGE))
+    assert small == large, f"{path}: {small} statements for {SMALL} rows, {large} for {LARGE}"
+
+
+def test_summary_analytics_query_count_is_constant():
+    counts = []
+    for size in (SMALL, LARGE):
+        seed(size)
+        assert client.post("/grades/summary/rebuild").status_code == 200
+        with count_queries() as statements:
+            response = client.get("/grades/analytics/1 A", params={"use_summary": True})
+        assert response.status_code == 200 and len(response.json()) == size
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
+
+
+def test_strict_loading_raises_on_lazy_load():
+    assert STRICT_LOADING
+    seed(SMALL)
+    with Session(engine) as db:
+        slot = db.query(models.Schedule).first()
+        with pytest.raises(InvalidRequestError):
+            slot.teacher
@@ -0,0 +1,78 @@
+# tests/test_schedule_writes.py
+# Write routes must answer bad input with a 4xx, never let it reach the
+# database as a constraint failure (FOREIGN KEY enforcement is on).
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+from backend.database import Base, engine
+from backend.main import app
+from backend import models
+from backend.response_cache import response_cache
+from backend.substitute_index import busy_index
+
+client = TestClient(app)
+
+SLOT = {"day_of_week": "Monday", "start_time": "08:00", "end_time": "09:00"}
+
+
+def reset():
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(insert(models.User), [
+            {"id": 1, "username": "teacher1", "full_name": "Teacher 1", "role": "teacher"},
+            {"id": 2, "username": "admin", "full_name": "Admin", "role": "admin"},
+            {"id": 3, "username": "teacher3", "full_name": "Teacher 3", "role": "teacher"},
+        ])
+    busy_index.reset()
+    response_cache.clear()
+
+
+def test_foreign_keys_are_enforced():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+
+def test_schedule_add_unknown_teacher_is_404():
+    reset()
+    for teacher_id in (99, 2):
+        response = client.post("/schedule/add", json={**SLOT, "teacher_id": teacher_id, "subject": "Art", "room": "R1"})
+        assert response.status_code == 404, response.text
+    response = client.post("/schedule/add", json={**SLOT, "teacher_id": 1, "subject": "Art", "room": "R1"})
+    assert response.status_code == 200, response.text
+
+
+def test_availability_set_unknown_teacher_is_404():
+    reset()
+    response = client.post("/availability/set", json={**SLOT, "teacher_id": 99, "status": "BUSY"})
+    assert response.status_code == 404, response.text
+    response = client.post("/availability/set", json={**SLOT, "teacher_id": 1, "status": "BUSY"})
+    assert response.status_code == 200, response.text
+
+
+def test_day_and_room_spelling_do_not_dodge_the_clash_check():
+    reset()
+    first = {**SLOT, "teacher_id": 1, "subject": "Art", "room": "Room 1"}
+    assert client.post("/schedule/add", json=first).status_code == 200
+
+    response = client.post("/schedule/add", json={**first, "day_of_week": " monday", "room": "Room 2"})
+    assert response.status_code == 409
+    assert [c["type"] for c in response.json()["detail"]["conflicts"]] == ["teacher"]
+
+    response = client.post("/schedule/add", json={**first, "teacher_id": 3, "day_of_week": "MONDAY", "room": "room 1 "})
+    assert response.status_code == 409
+    assert [c["type"] for c in response.json()["detail"]["conflicts"]] == ["room"]
+
+    free = client.post("/ai/recommend-substitute", json={**SLOT, "date": "2026-01-05", "day_of_week": "monday",
+                                                         "subject_needed": "Art"}).json()
+    assert [t["teacher_id"] for t in free] == [3]
+
+
+def test_recommend_returns_the_best_n():
+    reset()
+    ask = {**SLOT, "date": "2026-01-05", "subject_needed": "Art"}
+    assert client.post("/schedule/add", json={**SLOT, "day_of_week": "Tuesday", "teacher_id": 3,
+                                              "subject": "Art", "room": "Room 3"}).status_code == 200
+    assert [t["teacher_id"] for t in client.post("/ai/recommend-substitute", json=ask).json()] == [3, 1]
+    assert [t["teacher_id"] for t in client.post("/ai/recommend-substitute", json={**ask, "limit": 1}).json()] == [3]
+    assert client.post("/ai/recommend-substitute", json={**ask, "limit": 0}).status_code == 400
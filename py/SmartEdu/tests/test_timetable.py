@@ -0,0 +1,86 @@
+# tests/test_timetable.py
+# /schedule/generate?apply=true after substitute cover has been planned:
+# upcoming cover blocks the replace until it is cleared, past cover does not.
+from datetime import date, time, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from backend.database import Base, SessionLocal, engine
+from backend.main import app
+from backend import models
+from backend.response_cache import response_cache
+from backend.substitute_index import busy_index
+
+client = TestClient(app)
+
+GENERATE = {"apply": True, "time_limit": 1}
+
+
+def monday(weeks):
+    today = date.today()
+    return today - timedelta(days=today.weekday()) + timedelta(weeks=weeks)
+
+
+def seed(leave_dates):
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        conn.execute(insert(models.User), [
+            {"id": t, "username": f"teacher{t}", "full_name": f"Teacher {t}", "role": "teacher"} for t in (1, 2)
+        ])
+        conn.execute(insert(models.TeacherSubject), [{"teacher_id": t, "subject": "Mathematics"} for t in (1, 2)])
+        conn.execute(insert(models.Student), [{"id": 1, "full_name": "Student 1", "class_name": "1 A"}])
+        conn.execute(insert(models.Grade), [{"student_id": 1, "subject": "Mathematics", "score": 70, "term": "Finals"}])
+        conn.execute(insert(models.Schedule), [{"teacher_id": 1, "day_of_week": "Monday", "start_time": time(8),
+                                                "end_time": time(9), "subject": "Mathematics", "room": "Room 1 A"}])
+        for day in leave_dates:
+            conn.execute(insert(models.LeaveRequest).values(teacher_id=1, date=day, reason="Sick", status="APPROVED"))
+    busy_index.reset()
+    response_cache.clear()
+
+
+def plan(day):
+    response = client.post("/leave/plan-substitutes", json={"date": day.isoformat()})
+    assert response.status_code == 200, response.text
+    assert len(response.json()["assigned"]) == 1
+
+
+def test_upcoming_cover_blocks_apply_until_cleared():
+    upcoming = monday(1)
+    seed([upcoming])
+    plan(upcoming)
+
+    response = client.post("/schedule/generate", json=GENERATE)
+    assert response.status_code == 409
+    assert upcoming.isoformat() in response.json()["detail"]
+
+    assert client.delete(f"/leave/substitutes/{upcoming.isoformat()}").json()["cleared"] == 1
+    response = client.post("/schedule/generate", json=GENERATE)
+    assert response.status_code == 200, response.text
+    assert response.json()["applied"] > 0
+
+
+def test_past_cover_does_not_block_apply():
+    past = monday(-1)
+    seed([past])
+    plan(past)
+
+    response = client.post("/schedule/generate", json=GENERATE)
+    assert response.status_code == 200, response.text
+    with SessionLocal() as db:
+        cover = db.query(models.SubstituteAssignment).one()
+        assert cover.date == past and cover.schedule_id is None
+
+
+def test_applied_lessons_keep_their_class():
+    seed([])
+    response = client.post("/schedule/generate", json=GENERATE)
+    assert response.status_code == 200, response.text
+    placed = response.json()["stats"]["lessons_placed"]
+
+    grid = client.get("/schedule/class/1 A").json()
+    lessons = [item for slot in grid["slots"] for cells in slot["cells"].values() for item in cells]
+    assert len(lessons) + len(grid["unslotted"]) == placed > 0
+    with SessionLocal() as db:
+        assert {c for (c,) in db.query(models.Schedule.class_name).distinct()} == {"1 A"}
@@ -1,14 +1,41 @@
+import argparse
+import csv
+import json
+import os
 import sqlite3
+import sys
+import time
+
+# Applied once to the CLI's single connection (same settings as the backend engine)
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,
+}
 
 class SchoolManager:
     def __init__(self, db_name='school.db'):
         self.db_name = db_name
+        # One connection for the lifetime of the manager instead of one per call
+        self.conn = sqlite3.connect(self.db_name)
+        for name, value in PRAGMAS.items():
+            self.conn.execute(f"PRAGMA {name}={value}")
         self.init_database()
 
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def init_database(self):
         """Initialize database with Student and Grade tables"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
+        with self.conn:
+            cursor = self.conn.cursor()
 
             # 1. Students Table
             cursor.execute('''
@@ -36,9 +63,8 @@ class SchoolManager:
     def add_student(self, full_name, class_name):
         """Add a new student"""
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+            with self.conn:
+                cursor = self.conn.execute('''
                     INSERT INTO students (full_name, class_name)
                     VALUES (?, ?)
                 ''', (full_name, class_name))
@@ -50,9 +76,8 @@ class SchoolManager:
     def add_grade(self, student_id, subject, score, term="Finals"):
         """Add a grade for a specific student"""
         try:
-            with sqlite3.connect(self.db_name) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+            with self.conn:
+                cursor = self.conn.execute('''
                     INSERT INTO grades(student_id, subject, score, term)
                     VALUES (?, ?, ?, ?)
                 ''', (student_id, subject, score, term))
@@ -60,34 +85,78 @@ class SchoolManager:
         except sqlite3.Error as e:
             print(f"Error: {e}")
             return None
-        
+
+    def add_students(self, rows):
+        """Insert (full_name, class_name) tuples in one transaction, returns the new ids as a range"""
+        with self.conn:
+            before = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM students").fetchone()[0]
+            self.conn.executemany("INSERT INTO students (full_name, class_name) VALUES (?, ?)", rows)
+            after = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM students").fetchone()[0]
+        return range(before + 1, after + 1)
+
+    def add_grades(self, rows):
+        """Insert (student_id, subject, score, term) tuples in one transaction, returns the row count"""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO grades (student_id, subject, score, term) VALUES (?, ?, ?, ?)", rows
+            )
+        return cursor.rowcount
+
+    def student_ids(self):
+        return {row[0] for row in self.conn.execute("SELECT id FROM students")}
+
     def get_all_students(self):
         """View all students"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM students')
-            return cursor.fetchall()
-        
+        return self.conn.execute('SELECT * FROM students').fetchall()
+
     def get_student_report(self, student_id):
         """Get all grades for a specific student"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT g.subject, g.score, g.term
-                FROM grades g
-                WHERE g.student_id = ?
-                ORDER BY g.subject ASC
-            ''', (student_id,))
-            return cursor.fetchall()
-        
+        return self.conn.execute('''
+            SELECT g.subject, g.score, g.term
+            FROM grades g
+            WHERE g.student_id = ?
+            ORDER BY g.subject ASC
+        ''', (student_id,)).fetchall()
+
+    def get_reports(self, student_ids=None, class_name=None):
+        """(student_id, full_name, class_name, subject, score, term) rows for many students in one query"""
+        sql = '''
+            SELECT s.id, s.full_name, s.class_name, g.subject, g.score, g.term
+            FROM students s JOIN grades g ON g.student_id = s.id
+        '''
+        params = []
+        if student_ids:
+            sql += f" WHERE s.id IN ({','.join('?' * len(student_ids))})"
+            params = list(student_ids)
+        elif class_name:
+            sql += " WHERE s.class_name = ?"
+            params = [class_name]
+        return self.conn.execute(sql + " ORDER BY s.id, g.subject", params)
+
     def delete_student(self, student_id):
         """Delete a student and ALL their grades (Cascade)"""
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            # Note: We must enable foreign keys for ON DELETE CASCADE to work in SQLite
-            cursor.execute("PRAGMA foreign_keys = ON") 
-            cursor.execute('DELETE FROM students WHERE id = ?', (student_id,))
-            return cursor.rowcount > 0
+        return self.delete_students([student_id]) > 0
+
+    def delete_students(self, student_ids):
+        """Delete students and their grades in one transaction, returns how many students were removed"""
+        ids = [(sid,) for sid in student_ids]
+        with self.conn:
+            # Dependent rows first: the backend's tables (grades, attendance,
+            # grade summaries) reference students without ON DELETE CASCADE
+            for table, column in self.referencing("students"):
+                self.conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", ids)
+            cursor = self.conn.executemany("DELETE FROM students WHERE id = ?", ids)
+        return cursor.rowcount
+
+    def referencing(self, parent):
+        """(table, column) pairs with a foreign key to `parent`"""
+        tables = [r[0] for r in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return [
+            (table, fk[3])
+            for table in tables
+            for fk in self.conn.execute(f'PRAGMA foreign_key_list("{table}")')
+            if fk[2] == parent
+        ]
 
 # --- CLI INTERFACE ---
 
@@ -103,9 +172,7 @@ def display_menu():
     print("6. Exit")
     print("-"*40)
 
-def main():
-    db = SchoolManager()
-
+def interactive(db):
     while True:
         display_menu()
         choice = input("Enter selection (1-6): ").strip()
@@ -182,5 +249,140 @@ def main():
         else:
             print("Invalid option.")
 
+# --- BATCH MODE ---
+
+def read_records(path, fmt=None):
+    """
+    Yield dicts from a CSV (with header), JSON array or NDJSON file; '-' reads stdin.
+    The format comes from --format, else the file extension, else CSV.
+    """
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower()
+        fmt = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(ext, "csv")
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "json":
+            yield from json.load(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def student_rows(records, errors):
+    for n, r in enumerate(records, 1):
+        name, cls = (r.get("full_name") or "").strip(), (r.get("class_name") or "").strip()
+        if name and cls:
+            yield (name, cls)
+        else:
+            errors.append(f"record {n}: full_name and class_name are required")
+
+def grade_rows(records, known_students, errors):
+    for n, r in enumerate(records, 1):
+        try:
+            sid = int(r["student_id"])
+            subject = str(r["subject"]).strip()
+            score = float(r["score"])
+        except (KeyError, TypeError, ValueError):
+            errors.append(f"record {n}: student_id, subject and a numeric score are required")
+            continue
+        if sid not in known_students:
+            errors.append(f"record {n}: student {sid} does not exist")
+        elif not subject or not 0 <= score <= 100:
+            errors.append(f"record {n}: subject is required and score must be 0-100")
+        else:
+            yield (sid, subject, score, r.get("term") or "Finals")
+
+def report_errors(errors, limit=20):
+    for e in errors[:limit]:
+        print(f"⚠️  skipped {e}", file=sys.stderr)
+    if len(errors) > limit:
+        print(f"⚠️  ... and {len(errors) - limit} more", file=sys.stderr)
+
+def cmd_add_students(db, args):
+    errors = []
+    started = time.perf_counter()
+    ids = db.add_students(student_rows(read_records(args.file, args.format), errors))
+    report_errors(errors)
+    span = f" (IDs {ids.start}-{ids.stop - 1})" if ids else ""
+    print(f"✅ Added {len(ids)} students{span} in {time.perf_counter() - started:.2f}s")
+    return 1 if errors else 0
+
+def cmd_add_grades(db, args):
+    errors = []
+    started = time.perf_counter()
+    count = db.add_grades(grade_rows(read_records(args.file, args.format), db.student_ids(), errors))
+    report_errors(errors)
+    print(f"✅ Added {count} grades in {time.perf_counter() - started:.2f}s")
+    return 1 if errors else 0
+
+def cmd_report(db, args):
+    rows = db.get_reports(args.student_ids, args.class_name)
+    if args.format == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["student_id", "full_name", "class_name", "subject", "score", "term"])
+        writer.writerows(rows)
+    elif args.format == "json":
+        for sid, name, cls, subject, score, term in rows:
+            print(json.dumps({"student_id": sid, "full_name": name, "class_name": cls,
+                              "subject": subject, "score": score, "term": term}))
+    else:
+        current = None
+        for sid, name, cls, subject, score, term in rows:
+            if sid != current:
+                print(f"\nGrades for Student #{sid} {name} ({cls}):")
+                current = sid
+            status = "PASS" if score >= 40 else "FAIL"
+            print(f"• {subject}: {score}% ({status}) [{term}]")
+    return 0
+
+def cmd_delete(db, args):
+    ids = list(args.student_ids)
+    if args.file:
+        ids += [int(r["student_id"]) for r in read_records(args.file, args.format)]
+    deleted = db.delete_students(ids)
+    print(f"✅ Deleted {deleted} of {len(ids)} students (and their grades)")
+    return 0 if deleted == len(ids) else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="School management CLI. Run without a command for the interactive menu.")
+    parser.add_argument("--db", default="school.db", help="SQLite file (default: school.db)")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("add-students", help="bulk add students (full_name,class_name)")
+    p.add_argument("file", nargs="?", default="-", help="CSV / JSON / NDJSON file, '-' for stdin")
+    p.add_argument("--format", choices=["csv", "json", "ndjson"])
+    p.set_defaults(func=cmd_add_students)
+
+    p = sub.add_parser("add-grades", help="bulk add grades (student_id,subject,score[,term])")
+    p.add_argument("file", nargs="?", default="-", help="CSV / JSON / NDJSON file, '-' for stdin")
+    p.add_argument("--format", choices=["csv", "json", "ndjson"])
+    p.set_defaults(func=cmd_add_grades)
+
+    p = sub.add_parser("report", help="report cards for some students, a class, or everyone")
+    p.add_argument("student_ids", nargs="*", type=int)
+    p.add_argument("--class", dest="class_name")
+    p.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("delete", help="delete students and their grades")
+    p.add_argument("student_ids", nargs="*", type=int)
+    p.add_argument("--file", help="file with a student_id column/field ('-' for stdin)")
+    p.add_argument("--format", choices=["csv", "json", "ndjson"])
+    p.set_defaults(func=cmd_delete)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with SchoolManager(args.db) as db:
+        if args.command is None:
+            interactive(db)
+            return 0
+        return args.func(db, args)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,118 +1,257 @@
 # seed_data.py
-from sqlalchemy.orm import Session
-# 👇 FIXED IMPORTS: 
-from backend.database import engine, Base
-from backend.models import User, Student, Schedule, Grade
-from datetime import datetime, time
+# Synthetic school generator. Same data for the same arguments and --seed.
+#   python seed_data.py                                   # demo school (13 teachers, 3 classes)
+#   python seed_data.py --teachers 300 --classes 150 --students 6000 --days 180 --terms 4
+# Appends to the existing database unless --reset is given.
+import argparse
 import random
+import time as clock
+from datetime import date, datetime, time, timedelta
 
-# 1. CLEANUP & RESET
-print("♻️  Resetting Database for High-Traffic Simulation...")
-Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
-
-session = Session(bind=engine)
-
-# --- A. CREATE TEACHERS ---
-print("👨‍🏫 Hiring Teachers...")
-teachers_data = [
-    {"name": "Mr. John Smith",    "user": "math1", "subject": "Mathematics", "phone": "60123456780"},
-    {"name": "Ms. Ada Lovelace",  "user": "math2", "subject": "Mathematics", "phone": "60123456781"},
-    {"name": "Ms. Sarah Connor",  "user": "sci1",  "subject": "Science",     "phone": "60123456782"},
-    {"name": "Dr. Emmett Brown",  "user": "sci2",  "subject": "Science",     "phone": "60123456783"},
-    {"name": "Mrs. Ellen Ripley", "user": "eng1",  "subject": "English",     "phone": "60123456784"},
-    {"name": "Mr. Shakespeare",   "user": "eng2",  "subject": "English",     "phone": "60123456785"},
-    {"name": "Dr. Alan Grant",    "user": "hist1", "subject": "History",     "phone": "60123456786"},
-    {"name": "Cikgu Siti",        "user": "bm1",   "subject": "Bahasa Melayu", "phone": "60123456787"},
-    {"name": "Encik Razak",       "user": "bm2",   "subject": "Bahasa Melayu", "phone": "60123456788"},
-    {"name": "Ms. Lara Croft",    "user": "geo1",  "subject": "Geography",   "phone": "60123456789"},
-    {"name": "Mr. Bob Ross",      "user": "art1",  "subject": "Art",         "phone": "60123456790"},
-    {"name": "Mr. Neo Anderson",  "user": "it1",   "subject": "Computer Science", "phone": "60123456791"},
-    {"name": "Coach Carter",      "user": "pe1",   "subject": "P.E.",        "phone": "60123456792"},
-]
-
-all_teachers = []
-db_teachers_by_subj = {} 
-
-for t in teachers_data:
-    new_t = User(username=t["user"], full_name=t["name"], password_hash="123", role="teacher", phone_number=t["phone"])
-    session.add(new_t)
-    all_teachers.append(new_t)
-    # Commit partially to generate IDs so we can use them
-    session.commit() 
-    
-    if t["subject"] not in db_teachers_by_subj: db_teachers_by_subj[t["subject"]] = []
-    db_teachers_by_subj[t["subject"]].append(new_t)
-
-# --- B. CREATE STUDENTS ---
-print("🎓 Enrolling Students...")
-class_names = ["5 Science A", "4 Arts B", "3 Junior C"]
-first_names = ["Ali", "Chong", "Muthu", "Sarah", "David", "Amina", "Mei", "Raj", "Jessica", "Omar", "Jenny", "Kevin", "Siti", "Ah Meng", "Gopal", "Lisa", "Tom", "Nurul", "Ben", "Diana"]
-last_names = ["Tan", "Lee", "Wong", "Singh", "Abdullah", "Razak", "Lim", "Krishnan", "Smith", "Fernandez"]
-
-# Define subjects per class
-class_subjects_map = {
-    "5 Science A": ["Mathematics", "Science", "English", "Bahasa Melayu", "Computer Science"],
-    "4 Arts B":    ["Art", "Bahasa Melayu", "Mathematics", "Geography", "English"],
-    "3 Junior C":  ["P.E.", "History", "Science", "Art", "Mathematics"]
+from sqlalchemy import func, insert, select
+# 👇 FIXED IMPORTS:
+from backend.database import engine, make_engine, Base, create_missing_indexes
+from backend.models import User, Student, Schedule, Grade, TeacherAttendance, StudentAttendance, StudentGradeSummary
+from backend.grade_summary import PASS_MARK
+from backend.timetable_solver import TimetableSolver, split_hours, teaching_slots
+from backend.attendance_rollup import backfill
+from backend.auth import hash_password
+from backend.risk_scores import rebuild as rebuild_risk_scores
+
+CHUNK_SIZE = 20000
+
+FIRST_NAMES = ["Ali", "Chong", "Muthu", "Sarah", "David", "Amina", "Mei", "Raj", "Jessica", "Omar", "Jenny", "Kevin", "Siti", "Ah Meng", "Gopal", "Lisa", "Tom", "Nurul", "Ben", "Diana"]
+LAST_NAMES = ["Tan", "Lee", "Wong", "Singh", "Abdullah", "Razak", "Lim", "Krishnan", "Smith", "Fernandez"]
+TITLES = ["Mr.", "Ms.", "Mrs.", "Dr.", "Cikgu", "Encik"]
+SUBJECTS = ["Mathematics", "Science", "English", "Bahasa Melayu", "History", "Geography", "Art", "Computer Science", "P.E."]
+SUBJECTS_PER_CLASS = 5
+
+# Score range and attendance rate per kind of student
+STUDENT_TYPES = {
+    "Smart":      {"weight": 0.2, "score": (75, 100), "present": 0.98},
+    "Average":    {"weight": 0.6, "score": (40, 80),  "present": 0.94},
+    "Struggling": {"weight": 0.2, "score": (15, 55),  "present": 0.85},
 }
 
-all_students = []
-
-for class_name in class_names:
-    for i in range(20): 
-        fname = random.choice(first_names)
-        lname = random.choice(last_names)
-        new_s = Student(full_name=f"{fname} {lname}", class_name=class_name)
-        session.add(new_s)
-        all_students.append(new_s)
-
-session.commit()
-
-# --- C. GENERATE SCHEDULE ---
-print("📅 Generating Master Timetable...")
-days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-time_slots = [(time(8,0), time(9,0)), (time(9,0), time(10,0)), (time(10,30), time(11,20)), (time(11,20), time(12,10)), (time(12,10), time(13,0))]
-
-for day in days:
-    for slot_idx, (start_t, end_t) in enumerate(time_slots):
-        busy_teachers = []
-        for class_name, subjects in class_subjects_map.items():
-            subj_idx = (slot_idx + days.index(day)) % len(subjects)
-            subject = subjects[subj_idx]
-            candidates = db_teachers_by_subj.get(subject, [])
-            
-            # Find a teacher not busy in this slot
-            teacher = next((t for t in candidates if t.id not in busy_teachers), None)
-            
-            if teacher:
-                room = f"Class {class_name[0]}" # e.g. "Class 5"
-                session.add(Schedule(teacher_id=teacher.id, day_of_week=day, start_time=start_t, end_time=end_t, subject=subject, room=room))
-                busy_teachers.append(teacher.id)
-session.commit()
-
-# --- D. GENERATE GRADES ---
-print("📊 Grading Exams...")
-
-for student in all_students:
-    subjects = class_subjects_map[student.class_name]
-    student_type = random.choices(["Smart", "Average", "Struggling"], weights=[0.2, 0.6, 0.2])[0]
-    
-    for subj in subjects:
-        if student_type == "Smart":
-            score = random.randint(75, 100)
-        elif student_type == "Average":
-            score = random.randint(40, 80)
-        else:
-            score = random.randint(15, 55)
-            
-        session.add(Grade(student_id=student.id, subject=subj, score=score, term="Mid-Term"))
-
-session.commit()
-
-# --- E. ADMIN ---
-admin = User(username="admin", full_name="Principal Skinner", password_hash="admin123", role="admin", phone_number="60199999999")
-session.add(admin)
-session.commit()
-
-print("✅ DONE! Database populated.")
\ No newline at end of file
+
+def class_names(n):
+    """1 A, 2 A, ... 5 A, 1 B, ... (forms 1-5, then the next stream letter)"""
+    names = []
+    for i in range(n):
+        k = i // 5
+        names.append(f"{i % 5 + 1} {chr(65 + k % 26)}{k // 26 or ''}")
+    return names
+
+
+def term_names(n):
+    """Mid-Term, Finals, Mid-Term 2, Finals 2, ..."""
+    return [("Mid-Term", "Finals")[k % 2] + (f" {k // 2 + 1}" if k >= 2 else "") for k in range(n)]
+
+
+def school_days(end, n):
+    """The last `n` weekdays up to and including `end`, oldest first"""
+    days, d = [], end
+    while len(days) < n:
+        if d.weekday() < 5:
+            days.append(d)
+        d -= timedelta(days=1)
+    return days[::-1]
+
+
+def bulk_insert(conn, model, rows):
+    """Core executemany in CHUNK_SIZE batches; `rows` can be any iterable of dicts"""
+    stmt = insert(model)
+    count, chunk = 0, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            conn.execute(stmt, chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        conn.execute(stmt, chunk)
+        count += len(chunk)
+    return count
+
+
+# --- GENERATORS ---
+
+def gen_teachers(rng, n, first_id, password_hash):
+    """Teacher i teaches SUBJECTS[i % len(SUBJECTS)], so every subject is covered once n >= 9"""
+    teachers = []
+    for i in range(n):
+        uid = first_id + i
+        teachers.append({
+            "id": uid,
+            "username": f"teacher{uid}",
+            "full_name": f"{rng.choice(TITLES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "password_hash": password_hash,
+            "role": "teacher",
+            "phone_number": f"601{uid:08d}",
+            "subject": SUBJECTS[i % len(SUBJECTS)],
+        })
+    return teachers
+
+
+def gen_students(rng, n, classes, first_id):
+    types = list(STUDENT_TYPES)
+    weights = [STUDENT_TYPES[t]["weight"] for t in types]
+    return [
+        {
+            "id": first_id + i,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "class_name": classes[i % len(classes)],
+            "type": rng.choices(types, weights)[0],
+        }
+        for i in range(n)
+    ]
+
+
+def gen_timetable(rng, classes, teachers):
+    """
+    Every class gets SUBJECTS_PER_CLASS subjects spread evenly over the teaching
+    periods, timetabled by the constraint solver (no teacher or class is booked
+    twice in a period). Returns (rows, class_subjects, unfilled lesson count).
+    """
+    teacher_subjects = {t["id"]: [t["subject"]] for t in teachers}
+    offered = [s for s in SUBJECTS if any(t["subject"] == s for t in teachers)]
+    class_subjects = {c: rng.sample(offered, min(SUBJECTS_PER_CLASS, len(offered))) for c in classes}
+
+    slots = teaching_slots()
+    solver = TimetableSolver(
+        slots, {c: split_hours(subjects, len(slots)) for c, subjects in class_subjects.items()},
+        teacher_subjects, seed=rng.randrange(2 ** 32),
+    )
+    result = solver.solve()
+    rows = [
+        {
+            "teacher_id": lesson["teacher_id"], "day_of_week": lesson["day_of_week"],
+            "start_time": time.fromisoformat(lesson["start_time"]), "end_time": time.fromisoformat(lesson["end_time"]),
+            "subject": lesson["subject"], "room": lesson["room"],
+        }
+        for lesson in result["lessons"]
+    ]
+    return rows, class_subjects, result["stats"]["lessons_unfilled"]
+
+
+def gen_grades(rng, students, class_subjects, terms, summaries):
+    """Yields grade rows and fills `summaries` with the matching student_grade_summaries rows"""
+    for s in students:
+        low, high = STUDENT_TYPES[s["type"]]["score"]
+        count, total, failed_count, failed = 0, 0.0, 0, []
+        for term in terms:
+            for subject in class_subjects[s["class_name"]]:
+                score = rng.randint(low, high)
+                count += 1
+                total += score
+                if score < PASS_MARK:
+                    failed_count += 1
+                    if subject not in failed:
+                        failed.append(subject)
+                yield {"student_id": s["id"], "subject": subject, "score": score, "term": term}
+        summaries.append({
+            "student_id": s["id"], "class_name": s["class_name"], "grade_count": count,
+            "score_total": total, "failed_count": failed_count, "failed_subjects": ",".join(failed),
+        })
+
+
+def gen_teacher_attendance(rng, teachers, days):
+    for day in days:
+        for t in teachers:
+            if rng.random() < 0.03:       # on leave
+                continue
+            clock_in = datetime.combine(day, time(7, 15)) + timedelta(minutes=rng.randint(0, 45))
+            clock_out = datetime.combine(day, time(13, 0)) + timedelta(minutes=rng.randint(0, 120))
+            yield {"teacher_id": t["id"], "clock_in_time": clock_in, "clock_out_time": clock_out}
+
+
+def gen_student_attendance(rng, students, days):
+    for day in days:
+        for s in students:
+            yield {"student_id": s["id"], "date": day, "is_present": rng.random() < STUDENT_TYPES[s["type"]]["present"]}
+
+
+# --- MAIN ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate the EduSmart database with a synthetic school")
+    parser.add_argument("--teachers", type=int, default=13)
+    parser.add_argument("--classes", type=int, default=3)
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--terms", type=int, default=1, help="grade terms per student (Mid-Term, Finals, Mid-Term 2, ...)")
+    parser.add_argument("--days", type=int, default=20, help="school days of attendance history")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(), help="last attendance day (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL / sqlite:///./school.db")
+    parser.add_argument("--reset", action="store_true", help="DROP all tables before seeding")
+    args = parser.parse_args()
+
+    db_engine = make_engine(args.database_url) if args.database_url else engine
+    rng = random.Random(args.seed)
+    started = clock.perf_counter()
+
+    # 1. SCHEMA
+    if args.reset:
+        print("♻️  Dropping all tables...")
+        Base.metadata.drop_all(bind=db_engine)
+    Base.metadata.create_all(bind=db_engine)
+    if db_engine is engine:
+        create_missing_indexes()
+
+    with db_engine.connect() as conn:
+        first_user = (conn.scalar(select(func.max(User.id))) or 0) + 1
+        first_student = (conn.scalar(select(func.max(Student.id))) or 0) + 1
+        has_admin = conn.scalar(select(User.id).where(User.username == "admin")) is not None
+
+    # 2. GENERATE (in memory for the small tables, streamed for the big ones)
+    classes = class_names(args.classes)
+    terms = term_names(args.terms)
+    days = school_days(args.end_date, args.days)
+    # Demo password "123" for every teacher: hashed once, a slow hash per row would dominate seeding
+    teachers = gen_teachers(rng, args.teachers, first_user, hash_password("123"))
+    students = gen_students(rng, args.students, classes, first_student)
+    timetable, class_subjects, unfilled = gen_timetable(rng, classes, teachers)
+    summaries = []
+
+    counts = {}
+    with db_engine.begin() as conn:
+        print("👨‍🏫 Hiring Teachers...")
+        counts["users"] = bulk_insert(conn, User, ({k: v for k, v in t.items() if k != "subject"} for t in teachers))
+        if not has_admin:
+            counts["users"] += bulk_insert(conn, User, [{
+                "username": "admin", "full_name": "Principal Skinner", "password_hash": hash_password("admin123"),
+                "role": "admin", "phone_number": "60199999999",
+            }])
+
+        print("🎓 Enrolling Students...")
+        counts["students"] = bulk_insert(conn, Student, ({k: v for k, v in s.items() if k != "type"} for s in students))
+
+        print("📅 Generating Master Timetable...")
+        counts["schedules"] = bulk_insert(conn, Schedule, timetable)
+        if unfilled:
+            print(f"   ⚠️  {unfilled:,} lessons could not be timetabled (not enough teachers for their subject)")
+
+    with db_engine.begin() as conn:
+        print("📊 Grading Exams...")
+        counts["grades"] = bulk_insert(conn, Grade, gen_grades(rng, students, class_subjects, terms, summaries))
+        counts["student_grade_summaries"] = bulk_insert(conn, StudentGradeSummary, summaries)
+
+    with db_engine.begin() as conn:
+        print("🕒 Writing Attendance History...")
+        counts["teacher_attendance"] = bulk_insert(conn, TeacherAttendance, gen_teacher_attendance(rng, teachers, days))
+        counts["student_attendance"] = bulk_insert(conn, StudentAttendance, gen_student_attendance(rng, students, days))
+        counts["teacher_attendance_daily"] = backfill(conn, since=days[0] if days else None)
+
+    with db_engine.begin() as conn:
+        print("🚨 Scoring At-Risk Students...")
+        counts["student_risk_scores"] = rebuild_risk_scores(conn)
+
+    elapsed = clock.perf_counter() - started
+    total = sum(counts.values())
+    for table, n in counts.items():
+        print(f"   {table:<26} {n:>10,}")
+    print(f"✅ DONE! {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()